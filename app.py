@@ -1,8 +1,14 @@
+import sys
 import pyglet
+from time import perf_counter
 
-from .events import *
+from .events import (MOUSE_CLICK, MOUSE_RELEASE, MOUSE_DRAG, MOUSE_SCROLL, MOUSE_MOTION, KEY_PRESS,
+                     MouseClickEvent, MouseClickReleaseEvent, MouseDragEvent, MouseScrollEvent,
+                     MouseMotionEvent, KeyEvent)
+from .screen import Screen
 from .errors import ScreenAlreadyExistsError, ScreenDoesntExistError
 from .graphics.misc import clear
+from .lazy import gl
 
 #author Ryan Bailey
 
@@ -10,71 +16,477 @@ from .graphics.misc import clear
 #on_mouse_drag, on_mouse_motion and on_mouse_scroll
 #are overridden functions that are called by pyglet
 
-class App(pyglet.window.Window):
-    def __init__(self, title="Window!"):
-        super().__init__(caption=title, fullscreen=True)
+#the name asyncloop.py is imported as, to look it up in sys.modules
+ASYNCLOOP = __package__ + ".asyncloop"
+
+#redraw modes
+#the screen is cleared and drawn on every tick. use this for animated screens
+ALWAYS_REDRAW = "ALWAYS_REDRAW"
+#the screen is only cleared and drawn after it has been invalidated
+#(see Screen.invalidate), otherwise the last frame is left on the window
+REDRAW_WHEN_INVALID = "REDRAW_WHEN_INVALID"
+
+#the most times Screen.update is called in one tick, so that an app that can't keep
+#up doesn't spend longer and longer catching up
+MAX_UPDATES_PER_TICK = 5
 
-        self.__screens = []
+class App(pyglet.window.Window):
+    #clearColor should be an [r,g,b,a] list where every value is 8-bit
+    #if scissorDamage is True and redrawMode is REDRAW_WHEN_INVALID, only the part
+    #of the window covered by the rectangles the screen invalidated is repainted
+    #if coalesceMotion is True, the mouse motion and drag events that arrive between
+    #frames are merged into one event (see App.__coalesce)
+    #metrics is an optional FrameMetrics that frame, event and screen switch timings
+    #are recorded in. when it is None nothing is timed
+    #width and height are only used if fullscreen is False
+    #if reuseEvents is True the same motion, drag and scroll event objects are passed
+    #to the screen every time, which saves making one per event but means a screen
+    #that keeps an event sees it change (see events.py). it is off by default so that
+    #screens can keep the events they are given
+    #evictionPolicy is an optional LRUEvictionPolicy (see eviction.py) that frees the
+    #resources of screens that aren't being shown. when it is None nothing is freed
+    #targetFps is how many frames a second are drawn while the app runs, and updateRate
+    #how many times a second Screen.update is called (see App.tick). while the window
+    #is unfocused, or nothing has happened for idleTimeout seconds, the frame rate
+    #drops to unfocusedFps or idleFps (None to not drop it)
+    #if offscreen is True the window is hidden and screens are drawn into a framebuffer
+    #of width by height (pyglet's default window size if they aren't given). it can be
+    #any size, and works headless, e.g. to render screens for thumbnails or tests
+    #frame by frame with App.renderFrame and read them back with a FrameCapture (see
+    #App.setCapture)
+    def __init__(self, title="Window!", redrawMode=ALWAYS_REDRAW, scissorDamage=False, clearColor=(0, 0, 0, 255),
+                 coalesceMotion=False, metrics=None, fullscreen=True, width=None, height=None, reuseEvents=False,
+                 evictionPolicy=None, targetFps=60, updateRate=60, vsync=True, unfocusedFps=10, idleFps=10,
+                 idleTimeout=5, offscreen=False):
+        self.__screens = {} #name --> screen, for the screens that have been built
+        self.__factories = {} #name --> factory, for the screens that haven't
         self.__screen = None
+        self.__screenName = None
+
+        self.__redrawMode = redrawMode
+        self.__scissorDamage = scissorDamage
+        self.__clearColor = clearColor
+        self.__previousDamage = None
+        self.__frameSkipped = False
+        self.__renderedFrames = 0
+        self.__skippedFrames = 0
+
+        self.__coalesceMotion = coalesceMotion
+        self.__pendingMotion = None
+
+        self.__motionEvent = None
+        self.__dragEvent = None
+        self.__scrollEvent = None
+        if reuseEvents:
+            self.__motionEvent = MouseMotionEvent(0, 0, 0, 0)
+            self.__dragEvent = MouseDragEvent(0, 0, 0, 0, 0, 0)
+            self.__scrollEvent = MouseScrollEvent(0, 0, 0, 0)
+
+        self.__metrics = metrics
+        self.__overlay = None
+        self.__frameStart = 0
+
+        self.__evictionPolicy = evictionPolicy
+        self.__prewarmQueue = []
+
+        self.__targetFps = targetFps
+        self.__updateStep = 1/updateRate
+        self.__unfocusedFps = unfocusedFps
+        self.__idleFps = idleFps
+        self.__idleTimeout = idleTimeout
+        self.__tickRate = None #the rate App.tick is scheduled at, None when it isn't
+        self.__focused = True
+        self.__lastInput = perf_counter()
+        self.__accumulator = 0
+        self.__loader = None #made by the first setScreenAsync
+        self.__pendingScreen = None #the name of the screen setScreenAsync will switch to
+
+        self.__framebuffer = None #what screens are drawn into if the app is offscreen
+        self.__capture = None
 
+        #the window is made last, as pyglet can send it events (e.g. on_resize) while it is being made
+        if offscreen:
+            from .graphics.framebuffer import Framebuffer
+            super().__init__(width=width, height=height, caption=title, vsync=False, visible=False)
+            #the window picks a size if none was given
+            self.__framebuffer = Framebuffer(self.width, self.height)
+            self.on_resize(self.width, self.height)
+        elif fullscreen:
+            super().__init__(caption=title, fullscreen=True, vsync=vsync)
+        else:
+            super().__init__(width=width, height=height, caption=title, vsync=vsync)
+
+    #screen is either a Screen or a factory that makes one when called with no
+    #arguments (e.g. the Screen subclass itself). factories aren't called until the
+    #screen is first set or prewarmed, so adding lots of screens is cheap
     def addScreen(self, name, screen):
-        for screen in self.__screens:
-            if screen[0] == name:
-                raise ScreenAlreadyExistsError("(App.addScreen) A Screen with the name " + name + " already exists")
+        if name in self.__screens or name in self.__factories:
+            raise ScreenAlreadyExistsError("(App.addScreen) A Screen with the name " + name + " already exists")
 
-        self.__screens += [(name, screen)]
+        if isinstance(screen, Screen):
+            self.__screens[name] = screen
+        else:
+            self.__factories[name] = screen
 
     def setScreen(self, name):
-        for screen in self.__screens:
-            if screen[0] == name:
-                self.__screen = screen[1]
-                return
+        start = perf_counter()
+        #a screen still loading from an earlier setScreenAsync shouldn't replace this one
+        self.__pendingScreen = None
+        screen = self.__screens.get(name)
+        if screen == None:
+            if name not in self.__factories:
+                raise ScreenDoesntExistError("(App.setScreen) The Screen " + name + " does not exist")
+            screen = self.__build(name)
+        if not screen.isPrepared():
+            if self.__loader != None and self.__loader.isLoading(screen):
+                self.__loader.finish(screen)
+            else:
+                from .loader import prepareNow
+                prepareNow(screen)
+
+        self.__screen = screen
+        self.__screenName = name
+        self.__accumulator = 0
+        #merged motion that hasn't been sent yet was meant for the screen being left
+        self.__pendingMotion = None
+        if self.__evictionPolicy != None:
+            self.__evictionPolicy.screenShown(name, screen)
+        screen.resize(self.width, self.height)
+        screen.invalidate()
+        if self.__metrics != None:
+            self.__metrics.recordScreenSwitch(perf_counter() - start, name)
+
+        self.prewarm(*screen.likelyNextScreens())
+
+    #switches to a screen once it has been loaded by a ScreenLoader (see loader.py),
+    #while the current screen keeps being drawn and given events
+    #onProgress(stage, fraction) is called on the main thread as it loads, so that
+    #the current screen can show how far it has got
+    #if the screen is already loaded it is switched to straight away. only the last
+    #screen asked for is switched to, and not at all if setScreen is called first
+    def setScreenAsync(self, name, onProgress=None):
+        screen = self.__screens.get(name)
+        if screen == None:
+            if name not in self.__factories:
+                raise ScreenDoesntExistError("(App.setScreenAsync) The Screen " + name + " does not exist")
+            screen = self.__build(name)
+        if screen.isPrepared():
+            self.setScreen(name)
+            return
+
+        if self.__loader == None:
+            from .loader import ScreenLoader
+            self.__loader = ScreenLoader()
+        self.__pendingScreen = name
+        self.__loader.load(screen, onProgress, lambda screen: self.__screenLoaded(name))
+
+    def __screenLoaded(self, name):
+        if self.__pendingScreen == name:
+            self.setScreen(name)
+
+    #the ScreenLoader used by setScreenAsync, or None if it hasn't been used
+    def getLoader(self):
+        return self.__loader
+
+    #returns True if the screen has been made, either by setScreen or prewarm
+    def screenBuilt(self, name):
+        return name in self.__screens
+
+    #builds screens that haven't been built yet between frames, one per tick, so
+    #that switching to them later doesn't have to wait for them to be made
+    def prewarm(self, *names):
+        wasEmpty = not self.__prewarmQueue
+        for name in names:
+            if name in self.__factories and name not in self.__prewarmQueue:
+                self.__prewarmQueue += [name]
+        if wasEmpty and self.__prewarmQueue:
+            pyglet.clock.schedule_once(self.__prewarmNext, 0)
+
+    def __prewarmNext(self, dt):
+        while self.__prewarmQueue:
+            name = self.__prewarmQueue.pop(0)
+            if name in self.__factories:
+                screen = self.__build(name)
+                if self.__evictionPolicy != None:
+                    self.__evictionPolicy.screenBuilt(name, screen)
+                break
+        if self.__prewarmQueue:
+            pyglet.clock.schedule_once(self.__prewarmNext, 0)
 
-        raise ScreenDoesntExistError("(App.setScreen) The Screen " + name + "does not exist")
+    def __build(self, name):
+        start = perf_counter()
+        screen = self.__factories.pop(name)()
+        self.__screens[name] = screen
+        if self.__metrics != None:
+            self.__metrics.record("build", perf_counter() - start, name)
+        return screen
 
     def on_draw(self):
         if self.__screen == None:
             return
 
-        clear()
-        self.__screen.draw()
+        rendered = self.__renderedFrames
+        if self.__framebuffer != None:
+            self.__framebuffer.bind()
+        try:
+            self.__draw()
+            if self.__capture != None and self.__renderedFrames != rendered:
+                self.__capture.capture()
+        finally:
+            #so that a screen or capture that raises doesn't leave the framebuffer bound
+            if self.__framebuffer != None:
+                self.__framebuffer.unbind()
+
+    def __draw(self):
+        if self.__metrics != None:
+            self.__frameStart = perf_counter()
+
+        self.__flushMotion()
+        self.__deliverAsync()
+
+        if self.__loader != None and self.__loader.busy():
+            self.__loader.update()
+
+        if self.__redrawMode == ALWAYS_REDRAW:
+            self.__paint()
+            self.__renderedFrames += 1
+            return
+
+        if not self.__screen.isInvalid():
+            #nothing has changed, so leave the last frame where it is
+            self.__frameSkipped = True
+            self.__skippedFrames += 1
+            return
+
+        damage = self.__screen.takeDamage()
+        if not self.__scissorDamage:
+            self.__paint()
+        else:
+            #after a flip the back buffer holds the frame before last,
+            #so the area damaged last frame has to be repainted as well
+            area = self.__damagedArea(damage, self.__previousDamage)
+            self.__previousDamage = damage
+            gl.glEnable(gl.GL_SCISSOR_TEST)
+            gl.glScissor(*area)
+            self.__paint()
+            gl.glDisable(gl.GL_SCISSOR_TEST)
+        self.__renderedFrames += 1
+
+    def __paint(self):
+        if self.__metrics == None:
+            clear(self.__clearColor)
+            self.__screen.draw()
+        else:
+            start = perf_counter()
+            clear(self.__clearColor)
+            cleared = perf_counter()
+            self.__screen.draw()
+            self.__metrics.record("clear", cleared - start, self.__screenName)
+            self.__metrics.record("draw", perf_counter() - cleared, self.__screenName)
+
+        if self.__overlay != None:
+            self.__overlay.draw()
+
+    #skipped frames aren't flipped so that the window keeps showing the last frame drawn
+    def flip(self):
+        if self.__frameSkipped:
+            self.__frameSkipped = False
+            return
+        if self.__metrics == None:
+            super().flip()
+            return
+
+        start = perf_counter()
+        super().flip()
+        end = perf_counter()
+        self.__metrics.record("flip", end - start, self.__screenName)
+        self.__metrics.recordFrame(end - self.__frameStart, self.__screenName)
+
+    def getMetrics(self):
+        return self.__metrics
+
+    #the overlay (e.g. a MetricsOverlay) is anything with a draw method, and is
+    #drawn on top of the current screen. None removes it
+    def setOverlay(self, overlay):
+        self.__overlay = overlay
+
+    def on_resize(self, width, height):
+        super().on_resize(width, height)
+        if self.__framebuffer != None:
+            self.__framebuffer.resize(width, height)
+        if self.__capture != None:
+            self.__capture.resize(width, height)
+        if self.__screen != None:
+            self.__screen.resize(width, height)
+            self.__screen.invalidate()
+
+    def on_expose(self):
+        if self.__screen != None:
+            self.__screen.invalidate()
+
+    #capture (a FrameCapture, see graphics/capture.py) reads back every frame that is
+    #drawn, from the framebuffer if the app is offscreen or the window if it isn't.
+    #None stops capturing. the capture being replaced hands over the frames it is still
+    #reading and frees its pixel buffers
+    def setCapture(self, capture):
+        if self.__capture != None and capture != self.__capture:
+            self.__capture.flush()
+            self.__capture.release()
+        self.__capture = capture
+        if capture != None:
+            capture.resize(self.width, self.height)
+
+    def getCapture(self):
+        return self.__capture
+
+    #the framebuffer screens are drawn into if the app is offscreen, otherwise None
+    def getFramebuffer(self):
+        return self.__framebuffer
+
+    def isOffscreen(self):
+        return self.__framebuffer != None
+
+    #draws one frame without pyglet's loop running, e.g. to render an offscreen app
+    #frame by frame. if dt is given the app is ticked first (see App.tick), so
+    #Screen.update moves on by dt seconds
+    def renderFrame(self, dt=None):
+        self.switch_to()
+        if dt != None:
+            self.tick(dt)
+        self.on_draw()
+        self.flip()
+
+    #the number of frames that have been drawn
+    def renderedFrames(self):
+        return self.__renderedFrames
+
+    #the number of frames that weren't drawn because nothing was invalid
+    def skippedFrames(self):
+        return self.__skippedFrames
+
+    def setRedrawMode(self, redrawMode):
+        self.__redrawMode = redrawMode
+        if self.__screen != None:
+            self.__screen.invalidate()
+
+    #returns the (x, y, width, height) box around all of the damaged rectangles
+    #(a damage of None means the whole window)
+    def __damagedArea(self, *damages):
+        if None in damages:
+            return (0, 0, self.width, self.height)
+
+        rects = damages[0] + damages[1]
+        minX = max(0, min(rect[0] for rect in rects))
+        minY = max(0, min(rect[1] for rect in rects))
+        maxX = min(self.width, max(rect[0] + rect[2] for rect in rects))
+        maxY = min(self.height, max(rect[1] + rect[3] for rect in rects))
+        return (int(minX), int(minY), int(max(0, maxX - minX)), int(max(0, maxY - minY)))
+
+    #events are only made if the current screen wants their type (see Screen.wantsEvent)
 
     def on_mouse_press(self, x, y, button, modifiers):
-        mouseClickEvent = MouseClickEvent(x, y, button, modifiers)
-        if mouseClickEvent.shouldBeProcessed():
-            self.__screen.processInput(mouseClickEvent)
+        self.__inputArrived()
+        self.__flushMotion()
+        if self.__screen.wantsEvent(MOUSE_CLICK):
+            self.__process(MouseClickEvent(x, y, button, modifiers))
         self.handleScreenRequests()
 
     def on_mouse_release(self, x, y, button, modifiers):
-        mouseClickReleaseEvent = MouseClickReleaseEvent(x, y, button, modifiers)
-        if mouseClickReleaseEvent.shouldBeProcessed():
-            self.__screen.processInput(mouseClickReleaseEvent)
+        self.__inputArrived()
+        self.__flushMotion()
+        if self.__screen.wantsEvent(MOUSE_RELEASE):
+            self.__process(MouseClickReleaseEvent(x, y, button, modifiers))
         self.handleScreenRequests()
 
     def on_key_press(self, symbol, modifiers):
-        keyEvent = KeyEvent(symbol, modifiers)
-        if keyEvent.shouldBeProcessed():
-            self.__screen.processInput(keyEvent)
+        self.__inputArrived()
+        self.__flushMotion()
+        if self.__screen.wantsEvent(KEY_PRESS):
+            self.__process(KeyEvent(symbol, modifiers))
         self.handleScreenRequests()
 
     def on_mouse_drag(self, x, y, dx, dy, buttons, modifiers):
-        mouseDragEvent = MouseDragEvent(x, y, dx, dy, buttons, modifiers)
-        if mouseDragEvent.shouldBeProcessed():
-            self.__screen.processInput(mouseDragEvent)
+        self.__inputArrived()
+        if not self.__screen.wantsEvent(MOUSE_DRAG):
+            return
+        if self.__coalesceMotion:
+            self.__coalesce(MOUSE_DRAG, x, y, dx, dy, buttons, modifiers)
+            return
+        self.__processDrag(x, y, dx, dy, buttons, modifiers, 1)
         self.handleScreenRequests()
 
     def on_mouse_scroll(self, x, y, scroll_x, scroll_y):
-        mouseScrollEvent = MouseScrollEvent(x, y, scroll_x, scroll_y)
-        if mouseScrollEvent.shouldBeProcessed():
-            self.__screen.processInput(mouseScrollEvent)
+        self.__inputArrived()
+        self.__flushMotion()
+        if not self.__screen.wantsEvent(MOUSE_SCROLL):
+            pass
+        elif self.__scrollEvent != None:
+            self.__process(self.__scrollEvent.reuse(x, y, scroll_x, scroll_y))
+        else:
+            self.__process(MouseScrollEvent(x, y, scroll_x, scroll_y))
         self.handleScreenRequests()
 
     def on_mouse_motion(self, x, y, dx, dy):
-        mouseMotionEvent = MouseMotionEvent(x, y, dx, dy)
-        if mouseMotionEvent.shouldBeProcessed():
-            self.__screen.processInput(mouseMotionEvent)
+        self.__inputArrived()
+        if not self.__screen.wantsEvent(MOUSE_MOTION):
+            return
+        if self.__coalesceMotion:
+            self.__coalesce(MOUSE_MOTION, x, y, dx, dy, None, None)
+            return
+        self.__processMotion(x, y, dx, dy, 1)
+        self.handleScreenRequests()
+
+    #consecutive motion (or drag, with the same buttons and modifiers) events are
+    #merged into one, with the latest position and the sum of their vectors.
+    #the merged event is sent to the screen at the start of the next frame, or
+    #before any other kind of event so that the order of events isn't changed
+    def __coalesce(self, type_, x, y, dx, dy, buttons, modifiers):
+        pending = self.__pendingMotion
+        if pending != None and pending[0] == type_ and pending[5] == buttons and pending[6] == modifiers:
+            pending[1] = x
+            pending[2] = y
+            pending[3] += dx
+            pending[4] += dy
+            pending[7] += 1
+            return
+
+        self.__flushMotion()
+        self.__pendingMotion = [type_, x, y, dx, dy, buttons, modifiers, 1]
+
+    def __flushMotion(self):
+        if self.__pendingMotion == None:
+            return
+
+        type_, x, y, dx, dy, buttons, modifiers, count = self.__pendingMotion
+        self.__pendingMotion = None
+        if type_ == MOUSE_DRAG:
+            self.__processDrag(x, y, dx, dy, buttons, modifiers, count)
+        else:
+            self.__processMotion(x, y, dx, dy, count)
         self.handleScreenRequests()
 
+    def __processMotion(self, x, y, dx, dy, count):
+        if self.__motionEvent != None:
+            self.__process(self.__motionEvent.reuse(x, y, dx, dy, count))
+        else:
+            self.__process(MouseMotionEvent(x, y, dx, dy, count))
+
+    def __processDrag(self, x, y, dx, dy, buttons, modifiers, count):
+        if self.__dragEvent != None:
+            self.__process(self.__dragEvent.reuse(x, y, dx, dy, buttons, modifiers, count))
+        else:
+            self.__process(MouseDragEvent(x, y, dx, dy, buttons, modifiers, count))
+
+    def __process(self, event):
+        if not event.shouldBeProcessed():
+            return
+        if self.__metrics == None:
+            self.__screen.dispatch(event)
+        else:
+            start = perf_counter()
+            self.__screen.dispatch(event)
+            self.__metrics.recordEvent(event.type_(), perf_counter() - start, self.__screenName)
+
     #handle requests made by the current screen
     #should be called by App's input handling functions
     def handleScreenRequests(self):
@@ -83,12 +495,121 @@ class App(pyglet.window.Window):
         if self.__screen.closeRequested():
             self.close()
 
+    #called by pyglet's clock targetFps times a second while the app runs, just before
+    #the window is redrawn. Screen.update is called with a fixed dt of 1/updateRate
+    #as many times as it takes to catch up with the time that has passed, so that
+    #things move at the same speed whatever the frame rate is. the time left over is
+    #given to the screen as an interpolation alpha (see Screen.interpolation)
+    def tick(self, dt):
+        if self.__screen == None:
+            return
+
+        start = perf_counter()
+        step = self.__updateStep
+        #a long stall (e.g. the window being dragged) is not caught up on all at once
+        self.__accumulator = min(self.__accumulator + dt, step*MAX_UPDATES_PER_TICK)
+        while self.__accumulator >= step:
+            self.__screen.update(step)
+            self.__accumulator -= step
+        self.__screen.setInterpolation(self.__accumulator/step)
+        if self.__metrics != None:
+            self.__metrics.record("update", perf_counter() - start, self.__screenName)
+
+        self.handleScreenRequests()
+        #only while the app runs, so that ticking it by hand (see App.renderFrame) doesn't schedule it
+        if self.__tickRate != None:
+            self.__pace()
+
+    def setTargetFps(self, targetFps):
+        self.__targetFps = targetFps
+        if self.__tickRate != None:
+            self.__pace()
+
+    def setVsync(self, vsync):
+        self.set_vsync(vsync)
+
+    #stops the app being ticked and screens being prewarmed once the window has gone
+    def close(self):
+        pyglet.clock.unschedule(self.tick)
+        pyglet.clock.unschedule(self.__prewarmNext)
+        self.__tickRate = None
+        super().close()
+
+    def on_activate(self):
+        self.__focused = True
+        self.__inputArrived()
+
+    def on_deactivate(self):
+        self.__focused = False
+        if self.__tickRate != None:
+            self.__pace()
+
+    #the number of times a second the screen is being updated and drawn right now
+    def currentFps(self):
+        return self.__tickRate
+
+    #works out how often App.tick should run and reschedules it if that has changed
+    def __pace(self):
+        rate = self.__targetFps
+        if not self.__focused and self.__unfocusedFps != None:
+            rate = min(rate, self.__unfocusedFps)
+        elif self.__idleFps != None and self.__idle():
+            rate = min(rate, self.__idleFps)
+
+        if rate != self.__tickRate:
+            pyglet.clock.unschedule(self.tick)
+            pyglet.clock.schedule_interval(self.tick, 1/rate)
+            self.__tickRate = rate
+
+    #the app is idle when there hasn't been any input for a while and the screen
+    #isn't asking to be redrawn (which it always is with ALWAYS_REDRAW)
+    def __idle(self):
+        if self.__redrawMode == ALWAYS_REDRAW or self.__screen.isInvalid():
+            return False
+        return perf_counter() - self.__lastInput > self.__idleTimeout
+
+    def __inputArrived(self):
+        self.__lastInput = perf_counter()
+        if self.__tickRate != None and self.__tickRate != self.__targetFps:
+            self.__pace()
+
+    #called on the main thread when a coroutine started with Screen.runAsync has finished
+    def on_async_result(self):
+        self.__deliverAsync()
+        if self.__screen != None:
+            self.handleScreenRequests()
+
     #to be called after a screen has been added and set
-    def run(self):
-        pyglet.app.run()
+    #if useAsyncio is True an asyncio event loop is run alongside pyglet's for as long
+    #as the app runs (see asyncloop.py). it is also started by the first Screen.runAsync
+    def run(self, useAsyncio=False):
+        if useAsyncio:
+            from .asyncloop import asyncLoop
+            asyncLoop.start()
+        self.__pace()
+        try:
+            pyglet.app.run()
+        finally:
+            pyglet.clock.unschedule(self.tick)
+            self.__tickRate = None
+            asyncloop = sys.modules.get(ASYNCLOOP)
+            if asyncloop != None:
+                asyncloop.asyncLoop.stop()
+
+    #hands over the results of finished coroutines (see asyncloop.py). asyncloop is only
+    #imported by the first Screen.runAsync (or run(useAsyncio=True)), so until then
+    #there can't be any
+    def __deliverAsync(self):
+        asyncloop = sys.modules.get(ASYNCLOOP)
+        if asyncloop != None:
+            asyncloop.asyncLoop.deliver()
 
     #for debug
     def availableScreens(self):
         print("AVAILABLE SCREENS")
-        for screen in self.__screens:
-            print("\t" + screen[0])
+        for name in self.__screens:
+            print("\t" + name)
+        for name in self.__factories:
+            print("\t" + name + " (not built yet)")
+
+App.register_event_type("on_async_result")
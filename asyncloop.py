@@ -0,0 +1,114 @@
+import threading
+from queue import SimpleQueue, Empty
+
+from .lazy import LazyModule
+
+#author Ryan Bailey
+
+#asyncio is slow to import and most apps never use it, so it is imported by the
+#first screen that does (see LazyModule)
+asyncio = LazyModule("asyncio")
+
+#runs an asyncio event loop in a thread of its own, next to pyglet's, so that screens
+#can wait on sockets, files, timers etc without freezing the window. coroutines are
+#given to the loop with AsyncLoop.submit (or Screen.runAsync), and their results are
+#handed back on the main thread by AsyncLoop.deliver, which the app calls before
+#every frame and whenever a result arrives (see App.run). neither loop polls the
+#other: the asyncio thread sleeps in its selector, and wakes pyglet up when it has
+#something for it
+
+class AsyncLoop():
+    def __init__(self):
+        self.__loop = None
+        self.__thread = None
+        self.__results = SimpleQueue() #(future, onResult, onError) waiting to be delivered
+        self.__wakeup = None
+
+    #wakeup is called from the asyncio thread whenever a result is waiting, and should
+    #get the main thread to call deliver. by default every App is sent an
+    #on_async_result event, which wakes pyglet's loop up if it is waiting
+    def setWakeup(self, wakeup):
+        self.__wakeup = wakeup
+
+    #starts the loop's thread. called by App.run, or by the first submit
+    def start(self):
+        if self.__loop != None:
+            return
+        self.__loop = asyncio.new_event_loop()
+        self.__thread = threading.Thread(target=self.__run, name="uiglet-asyncio", daemon=True)
+        self.__thread.start()
+
+    #cancels anything still running and stops the thread
+    def stop(self):
+        if self.__loop == None:
+            return
+        self.__loop.call_soon_threadsafe(self.__loop.stop)
+        self.__thread.join()
+        self.__loop = None
+        self.__thread = None
+
+    def running(self):
+        return self.__loop != None
+
+    #the asyncio event loop, for things like loop.create_server. None if it isn't running
+    def getLoop(self):
+        return self.__loop
+
+    #runs a coroutine on the loop. onResult(result) or onError(exception) is called on
+    #the main thread once it has finished. if there is no onError the exception is raised
+    #on the main thread instead. returns a concurrent.futures.Future that can be cancelled
+    #(a cancelled coroutine calls neither)
+    def submit(self, coroutine, onResult=None, onError=None):
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(coroutine, self.__loop)
+        future.add_done_callback(lambda future: self.__finished(future, onResult, onError))
+        return future
+
+    #calls the callbacks of every coroutine that has finished. must be called on the main thread
+    def deliver(self):
+        while not self.__results.empty():
+            try:
+                future, onResult, onError = self.__results.get_nowait()
+            except Empty:
+                return
+            if future.cancelled():
+                continue
+            exception = future.exception()
+            if exception != None:
+                if onError == None:
+                    raise exception
+                onError(exception)
+            elif onResult != None:
+                onResult(future.result())
+
+    def __finished(self, future, onResult, onError):
+        self.__results.put((future, onResult, onError))
+        if self.__wakeup != None:
+            self.__wakeup()
+        else:
+            wakeApps()
+
+    def __run(self):
+        loop = self.__loop
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_forever()
+            #stop was called, so clean up whatever is left
+            tasks = asyncio.all_tasks(loop)
+            for task in tasks:
+                task.cancel()
+            loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            loop.close()
+
+#posts an on_async_result event to every window that handles it (every App), from the
+#asyncio thread, so that the app calls deliver
+def wakeApps():
+    import pyglet.app
+    for window in list(pyglet.app.windows):
+        if "on_async_result" in window.event_types:
+            pyglet.app.platform_event_loop.post_event(window, "on_async_result")
+
+#the loop used by Screen.runAsync and App.run
+asyncLoop = AsyncLoop()
@@ -0,0 +1,80 @@
+#runs the benchmark suite on a headless window and writes the results to a json file
+#run from the directory above uiglet with:
+#   python -m uiglet.benchmarks [--output results.json] [--compare old.json] [--quick] [--software]
+
+#--compare prints how each result has changed since an earlier run, and exits with
+#a status of 1 if anything got slower by more than --threshold (default 25%). the
+#status is also 1 if importing any module took longer than its budget (see
+#IMPORT_BUDGETS in suite.py)
+
+#no gpu or display is needed: pyglet is put in headless mode (EGL), and --software
+#asks mesa for its software renderer
+
+import os
+import sys
+import json
+import argparse
+import platform
+
+import pyglet
+
+#author Ryan Bailey
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m uiglet.benchmarks")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="an earlier results file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.25, help="how much slower counts as a regression")
+    parser.add_argument("--quick", action="store_true", help="only run the smaller sizes")
+    parser.add_argument("--software", action="store_true", help="use mesa's software renderer")
+    arguments = parser.parse_args()
+
+    if arguments.software:
+        os.environ["LIBGL_ALWAYS_SOFTWARE"] = "1"
+    pyglet.options["headless"] = True
+    pyglet.options["shadow_window"] = False
+
+    #imported here as pyglet's options have to be set before any windows are made
+    from . import suite
+
+    renderer, results = suite.run(arguments.quick)
+    output = {"machine": {"python": platform.python_version(),
+                          "pyglet": pyglet.version,
+                          "platform": platform.platform(),
+                          "renderer": renderer},
+              "unit": "seconds per operation",
+              "results": results}
+    with open(arguments.output, "w") as file:
+        json.dump(output, file, indent=4, sort_keys=True)
+    print("wrote %d results to %s" % (len(results), arguments.output))
+
+    failed = False
+    for message in suite.overBudget(results):
+        print(message)
+        failed = True
+
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            previous = json.load(file)["results"]
+        if compare(previous, results, arguments.threshold):
+            failed = True
+
+    if failed:
+        sys.exit(1)
+
+#prints the change in every result, and returns True if any have regressed
+def compare(previous, results, threshold):
+    regressed = False
+    for name in sorted(results):
+        if name not in previous or previous[name] == 0:
+            continue
+        change = results[name]/previous[name] - 1
+        flag = ""
+        if change > threshold:
+            flag = "  <-- REGRESSION"
+            regressed = True
+        print("%-50s %12.3g %12.3g %+7.1f%%%s" % (name, previous[name], results[name], change*100, flag))
+    return regressed
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+#compares building N separate Rectangles with building one RectangleArray of N
+#rectangles, in time taken and memory used.
+#run from the directory above uiglet with:
+#   python -m uiglet.benchmarks.primitivearray [N ...]
+
+import sys
+import time
+import random
+import tracemalloc
+
+import pyglet
+pyglet.options["headless"] = True #nothing is drawn, so don't ask for a display
+
+from ..graphics.primitives import Rectangle
+from ..graphics.arrays import RectangleArray
+
+#author Ryan Bailey
+
+SCREEN_HEIGHT = 1080
+
+#returns (seconds taken, bytes allocated) to build whatever build returns,
+#keeping it alive until it has been measured
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    built = build()
+    taken = time.perf_counter() - start
+    allocated = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del built
+    return (taken, allocated)
+
+def buildRectangles(rectangles):
+    return [Rectangle(color, x, y, width, height, SCREEN_HEIGHT) for x, y, width, height, color in rectangles]
+
+def buildRectangleArray(rectangles):
+    x, y, width, height, colors = zip(*rectangles)
+    return RectangleArray(colors, x, y, width, height, SCREEN_HEIGHT)
+
+def main(counts):
+    print("%10s %22s %22s %10s %10s" % ("N", "Rectangle (s / MB)", "RectangleArray (s / MB)", "speedup", "memory"))
+    for count in counts:
+        rectangles = [(random.uniform(0, 1920), random.uniform(0, 1080),
+                       random.uniform(1, 20), random.uniform(1, 20),
+                       [random.randrange(256) for i in range(4)]) for i in range(count)]
+
+        objectTime, objectMemory = measure(lambda: buildRectangles(rectangles))
+        arrayTime, arrayMemory = measure(lambda: buildRectangleArray(rectangles))
+
+        print("%10d %11.3f / %8.2f %11.3f / %8.2f %9.1fx %9.1fx" % (count,
+                                                                objectTime, objectMemory/2**20,
+                                                                arrayTime, arrayMemory/2**20,
+                                                                objectTime/arrayTime,
+                                                                objectMemory/arrayMemory))
+
+if __name__ == "__main__":
+    main([int(count) for count in sys.argv[1:]] or [1000, 10000, 50000])
@@ -0,0 +1,479 @@
+#the benchmarks run by python -m uiglet.benchmarks (see __main__.py)
+#every benchmark returns the number of seconds one operation takes, so lower is better
+
+import os
+import sys
+import math
+import time
+import random
+import subprocess
+
+import numpy
+
+import pyglet
+from pyglet.gl import glFinish, glReadPixels, gl_info, GL_RGBA, GL_UNSIGNED_BYTE
+
+from ..app import App
+from ..screen import Screen
+from ..events import MOUSE_CLICK, KEY_PRESS
+from ..graphics.primitives import Primitive, Rectangle, Triangle, Ellipse, Line
+from ..graphics.batch import PrimitiveBatch
+from ..graphics.text import Label, layoutCache
+from ..graphics.layer import CachedLayer
+from ..graphics.instanced import InstancedShape
+from ..graphics.polyline import Polyline
+from ..graphics.triangulate import triangulate, triangulationCache
+from ..graphics.capture import FrameCapture
+from ..culling import Culler
+
+#author Ryan Bailey
+
+WIDTH = 1280
+HEIGHT = 720
+
+#the most seconds a cold import of each module may take (see importBenchmarks).
+#nothing but App should load opengl, and only the graphics modules need numpy
+IMPORT_BUDGETS = {"events": 0.05,
+                  "screen": 0.05,
+                  "widgetgrid": 0.05,
+                  "recording": 0.1,
+                  "graphics.primitives": 0.25,
+                  "app": 0.35}
+
+#runs function (which does operations operations) repeat times and
+#returns the seconds per operation of the fastest run
+def timeIt(function, operations, repeat=5):
+    best = None
+    for i in range(repeat):
+        start = time.perf_counter()
+        function()
+        taken = time.perf_counter() - start
+        if best == None or taken < best:
+            best = taken
+    return best/operations
+
+def randomColor(alpha=255):
+    return [random.randrange(256), random.randrange(256), random.randrange(256), alpha]
+
+def makeRectangle(batch=None):
+    return Rectangle(randomColor(), random.uniform(0, WIDTH), random.uniform(0, HEIGHT),
+                     random.uniform(2, 40), random.uniform(2, 40), HEIGHT, batch=batch)
+
+def makeTriangle(batch=None):
+    x = random.uniform(0, WIDTH)
+    y = random.uniform(0, HEIGHT)
+    return Triangle(randomColor(), x, y, x + 20, y, x + 10, y + 20, HEIGHT, batch=batch)
+
+def makeEllipse(batch=None):
+    return Ellipse(randomColor(), random.uniform(0, WIDTH), random.uniform(0, HEIGHT),
+                   random.uniform(2, 40), random.uniform(2, 40), HEIGHT, batch=batch)
+
+def makeLine(batch=None):
+    x = random.uniform(0, WIDTH)
+    y = random.uniform(0, HEIGHT)
+    return Line(randomColor(), x, y, x + random.uniform(5, 50), y + random.uniform(5, 50), 2, HEIGHT, batch=batch)
+
+def makeLabel(batch=None):
+    return Label("%.2f" % random.uniform(0, 1000), [255, 255, 255, 255], 12,
+                 random.uniform(0, WIDTH), random.uniform(0, HEIGHT), 80, 20, HEIGHT, batch=batch)
+
+SHAPES = {"Rectangle": makeRectangle,
+          "Triangle": makeTriangle,
+          "Ellipse": makeEllipse,
+          "Line": makeLine}
+
+def constructionBenchmarks(counts):
+    results = {}
+    for name, make in list(SHAPES.items()) + [("Label", makeLabel)]:
+        for count in counts:
+            if name == "Label":
+                layoutCache.clear()
+            results["construct/%s/%d" % (name, count)] = timeIt(lambda: [make() for i in range(count)], count, repeat=3)
+    return results
+
+def transformBenchmarks(count):
+    results = {}
+    for name, make in SHAPES.items():
+        shapes = [make() for i in range(count)]
+        results["transform/%s/rotate" % name] = timeIt(lambda: [shape.rotate(3) for shape in shapes], count)
+        results["transform/%s/scale" % name] = timeIt(lambda: [shape.scale(1.01, 0.99) for shape in shapes], count)
+        results["transform/%s/translateRelative" % name] = timeIt(lambda: [shape.translateRelative(1, -1) for shape in shapes], count)
+        results["transform/%s/translateCenterTo" % name] = timeIt(lambda: [shape.translateCenterTo(100, 100) for shape in shapes], count)
+        #a transform followed by something that needs the vertices, like a frame of animation
+        results["transform/%s/rotateAndGetVertices" % name] = timeIt(lambda: [(shape.rotate(3), shape.getVertices()) for shape in shapes], count)
+    return results
+
+#seconds per frame to draw count shapes, one at a time and from a PrimitiveBatch
+def drawBenchmarks(counts):
+    results = {}
+    for name, make in SHAPES.items():
+        for count in counts:
+            shapes = [make() for i in range(count)]
+            def drawEach():
+                for shape in shapes:
+                    shape.draw()
+                glFinish()
+            results["draw/%s/%d/immediate" % (name, count)] = timeIt(drawEach, 1)
+
+            batch = PrimitiveBatch()
+            for shape in shapes:
+                batch.add(shape)
+            def drawBatch():
+                batch.draw()
+                glFinish()
+            results["draw/%s/%d/batch" % (name, count)] = timeIt(drawBatch, 1)
+
+            #a batch where a tenth of the shapes move every frame
+            moving = shapes[::10]
+            def drawMovingBatch():
+                for shape in moving:
+                    shape.translateRelative(1, 1)
+                batch.draw()
+                glFinish()
+            results["draw/%s/%d/batchMoving" % (name, count)] = timeIt(drawMovingBatch, 1)
+    return results
+
+#seconds per frame to draw count shapes as instances of one InstancedShape, with a
+#tenth of them moving every frame
+def instancedBenchmarks(counts):
+    results = {}
+    for name, make in SHAPES.items():
+        for count in counts:
+            shapes = InstancedShape(make(), count, HEIGHT)
+            shapes.setPositions([random.uniform(0, WIDTH) for i in range(count)],
+                                [random.uniform(0, HEIGHT) for i in range(count)])
+            shapes.setColors([randomColor() for i in range(count)])
+            def drawMoving():
+                shapes.translateRelative(1, 1, slice(0, count//10))
+                shapes.draw()
+                glFinish()
+            results["draw/%s/%d/instancedMoving" % (name, count)] = timeIt(drawMoving, 1)
+            shapes.delete()
+    return results
+
+#seconds per frame for a live chart of count points that gets 10 new points every
+#frame, drawn as a Polyline and as a Line for every segment
+def polylineBenchmarks(counts):
+    results = {}
+    for count in counts:
+        line = Polyline(randomColor(), 2, count, HEIGHT)
+        xs = [WIDTH*i/count for i in range(count)]
+        line.append(xs, [random.uniform(0, HEIGHT) for i in range(count)])
+        line.draw()
+        def appendPolyline():
+            line.append([WIDTH]*10, [random.uniform(0, HEIGHT) for i in range(10)])
+            line.translateRelative(-WIDTH*10/count, 0)
+            line.draw()
+            glFinish()
+        results["chart/%d/polyline" % count] = timeIt(appendPolyline, 1)
+        line.delete()
+
+        ys = [random.uniform(0, HEIGHT) for i in range(count)]
+        def rebuildLines():
+            ys[:10] = []
+            ys.extend(random.uniform(0, HEIGHT) for i in range(10))
+            batch = PrimitiveBatch()
+            for i in range(count - 1):
+                Line(randomColor(), xs[i], ys[i], xs[i + 1], ys[i + 1], 2, HEIGHT, batch=batch)
+            batch.draw()
+            glFinish()
+        results["chart/%d/lines" % count] = timeIt(rebuildLines, 1, repeat=2)
+    return results
+
+#a star with points outer pixels from its centre, which is concave so has to be ear clipped
+def starVertices(x, y, points, outer):
+    vertices = []
+    for i in range(points*2):
+        radius = outer if i % 2 == 0 else outer*0.4
+        angle = math.pi*i/points
+        vertices += [(x + radius*math.cos(angle), y + radius*math.sin(angle))]
+    return vertices
+
+#seconds to triangulate one concave outline of each size (with nothing cached), and
+#seconds per shape to make and draw count same shaped stars, which share one triangulation
+def triangulationBenchmarks(counts):
+    results = {}
+    for points in (5, 50, 500):
+        vertices = starVertices(0, 0, points, 100)
+        results["triangulate/%d" % (points*2)] = timeIt(lambda: triangulate(vertices), 1)
+
+    for count in counts:
+        stars = []
+        def buildStars():
+            triangulationCache.clear()
+            stars[:] = [Primitive(randomColor(), starVertices(random.uniform(0, WIDTH), random.uniform(0, HEIGHT), 5, 20), HEIGHT)
+                        for i in range(count)]
+            for star in stars:
+                star.getTriangles()
+        results["construct/star/%d" % count] = timeIt(buildStars, count)
+
+        def drawStars():
+            for star in stars:
+                star.draw()
+            glFinish()
+        results["draw/star/%d" % count] = timeIt(drawStars, count)
+    return results
+
+#seconds per frame to draw count shapes spread over an area 5 times the size of the
+#window each way (as in a scrolled or zoomed view), with and without culling
+def cullingBenchmarks(counts):
+    results = {}
+    for count in counts:
+        shapes = [Rectangle(randomColor(), random.uniform(-2*WIDTH, 3*WIDTH), random.uniform(-2*HEIGHT, 3*HEIGHT),
+                            20, 20, HEIGHT) for i in range(count)]
+        def drawAll():
+            for shape in shapes:
+                shape.draw()
+            glFinish()
+        results["draw/offscreen/%d/all" % count] = timeIt(drawAll, 1)
+
+        culler = Culler(WIDTH, HEIGHT)
+        def drawCulled():
+            culler.newFrame()
+            culler.draw(shapes)
+            glFinish()
+        results["draw/offscreen/%d/culled" % count] = timeIt(drawCulled, 1)
+    return results
+
+#seconds per frame to draw count static shapes and a tenth as many labels, from a
+#batch and from a CachedLayer
+def layerBenchmarks(counts):
+    results = {}
+    for count in counts:
+        batch = PrimitiveBatch()
+        shapes = [makeRectangle(batch) for i in range(count)]
+        labels = [makeLabel() for i in range(count//10)]
+        def drawBatch():
+            batch.draw()
+            for label in labels:
+                label.draw()
+            glFinish()
+        results["draw/static/%d/batch" % count] = timeIt(drawBatch, 1)
+
+        layer = CachedLayer(WIDTH, HEIGHT)
+        for drawable in shapes + labels:
+            layer.add(drawable)
+        layer.draw()
+        def drawLayer():
+            layer.draw()
+            glFinish()
+        results["draw/static/%d/layer" % count] = timeIt(drawLayer, 1)
+        layer.delete()
+    return results
+
+#a screen that does a little work for every event, like a real one would
+class BenchmarkScreen(Screen):
+    def __init__(self, nextScreen=None):
+        super().__init__()
+        self.nextScreen = nextScreen
+        self.events = 0
+
+    def draw(self):
+        pass
+
+    def processInput(self, event):
+        self.events += 1
+        if self.nextScreen != None and event.type_() == "KEY_PRESS":
+            self.requestScreenChange(self.nextScreen)
+
+#seconds for App to turn one pyglet callback into an event and pass it to the screen
+def eventBenchmarks(app, count):
+    app.addScreen("events", BenchmarkScreen())
+    app.setScreen("events")
+    symbols = [pyglet.window.key.A, pyglet.window.key.B, pyglet.window.key.SPACE]
+
+    events = {"MOUSE_CLICK": lambda i: app.on_mouse_press(i % WIDTH, i % HEIGHT, 1, 0),
+              "MOUSE_RELEASE": lambda i: app.on_mouse_release(i % WIDTH, i % HEIGHT, 1, 0),
+              "MOUSE_MOTION": lambda i: app.on_mouse_motion(i % WIDTH, i % HEIGHT, 1, 1),
+              "MOUSE_DRAG": lambda i: app.on_mouse_drag(i % WIDTH, i % HEIGHT, 1, 1, 1, 0),
+              "MOUSE_SCROLL": lambda i: app.on_mouse_scroll(i % WIDTH, i % HEIGHT, 0, 1),
+              "KEY_PRESS": lambda i: app.on_key_press(symbols[i % 3], 0)}
+
+    results = {}
+    for name, dispatch in events.items():
+        results["event/%s" % name] = timeIt(lambda: [dispatch(i) for i in range(count)], count)
+    return results
+
+#a screen that only subscribes to clicks on one button-sized area and to key presses
+class RoutedScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.events = 0
+        self.subscribe(MOUSE_CLICK, self.clicked, region=(100, 100, 200, 50))
+        self.subscribe(KEY_PRESS, self.clicked)
+
+    def draw(self):
+        pass
+
+    def clicked(self, event):
+        self.events += 1
+        return True
+
+#seconds for App to handle one pyglet callback on a screen that uses subscribe,
+#including event types that nothing subscribes to
+def routedEventBenchmarks(app, count):
+    app.addScreen("routed", RoutedScreen())
+    app.setScreen("routed")
+    events = {"MOUSE_CLICK": lambda i: app.on_mouse_press(100 + i % 400, 100 + i % 100, 1, 0),
+              "MOUSE_MOTION": lambda i: app.on_mouse_motion(i % WIDTH, i % HEIGHT, 1, 1),
+              "KEY_PRESS": lambda i: app.on_key_press(pyglet.window.key.A, 0)}
+
+    results = {}
+    for name, dispatch in events.items():
+        results["event/routed/%s" % name] = timeIt(lambda: [dispatch(i) for i in range(count)], count)
+    return results
+
+#seconds to make each kind of event and read it the way a screen would
+def eventObjectBenchmarks(count):
+    from ..events import MouseClickEvent, MouseMotionEvent, MouseDragEvent, MouseScrollEvent, KeyEvent
+    symbols = [pyglet.window.key.A, pyglet.window.key.B, pyglet.window.key.SPACE]
+    makers = {"MOUSE_CLICK": lambda i: MouseClickEvent(i, i, 1, 0).location(),
+              "MOUSE_MOTION": lambda i: MouseMotionEvent(i, i, 1, 1).vector(),
+              "MOUSE_DRAG": lambda i: MouseDragEvent(i, i, 1, 1, 1, 0).vector(),
+              "MOUSE_SCROLL": lambda i: MouseScrollEvent(i, i, 0, 1).numberOfScrollClicks(),
+              "KEY_PRESS": lambda i: KeyEvent(symbols[i % 3], pyglet.window.key.MOD_SHIFT).key()}
+
+    results = {}
+    for name, make in makers.items():
+        results["eventObject/%s" % name] = timeIt(lambda: [make(i) for i in range(count)], count)
+    return results
+
+#seconds for a screen to ask for a switch and the app to switch to it
+def screenSwitchBenchmarks(app, count):
+    app.addScreen("switchA", BenchmarkScreen("switchB"))
+    app.addScreen("switchB", BenchmarkScreen("switchA"))
+    app.setScreen("switchA")
+    return {"setScreen": timeIt(lambda: [app.on_key_press(pyglet.window.key.A, 0) for i in range(count)], count)}
+
+#a screen with a batch of shapes and some labels, like a typical screen of an app
+class HeavyScreen(Screen):
+    def __init__(self, shapes=200, labels=20):
+        super().__init__()
+        self.batch = self.addResource(PrimitiveBatch())
+        self.shapes = [makeRectangle(self.batch) for i in range(shapes)]
+        self.labels = [self.addResource(makeLabel()) for i in range(labels)]
+
+    def draw(self):
+        self.batch.draw()
+        for label in self.labels:
+            label.draw()
+
+#seconds to add count screens to an app and show the first one, when the screens
+#are made up front and when they are added as factories
+def registryBenchmarks(count):
+    results = {}
+    def addInstances():
+        app = App(title="uiglet benchmarks", fullscreen=False, width=WIDTH, height=HEIGHT)
+        for i in range(count):
+            app.addScreen("screen%d" % i, HeavyScreen())
+        app.setScreen("screen0")
+        app.close()
+    def addFactories():
+        app = App(title="uiglet benchmarks", fullscreen=False, width=WIDTH, height=HEIGHT)
+        for i in range(count):
+            app.addScreen("screen%d" % i, HeavyScreen)
+        app.setScreen("screen0")
+        app.close()
+    results["startup/%d/instances" % count] = timeIt(addInstances, 1, repeat=1)
+    results["startup/%d/factories" % count] = timeIt(addFactories, 1, repeat=1)
+    return results
+
+#seconds per frame to render a screen offscreen at 1080p without reading it back,
+#reading every frame back with a FrameCapture, and reading every frame straight
+#into an array with glReadPixels
+def captureBenchmarks(frames):
+    width, height = 1920, 1080
+    app = App(title="uiglet benchmarks", width=width, height=height, offscreen=True)
+    app.addScreen("heavy", HeavyScreen())
+    app.setScreen("heavy")
+
+    results = {}
+    def render():
+        for i in range(frames):
+            app.renderFrame()
+        glFinish()
+    results["capture/1080p/none"] = timeIt(render, frames, repeat=3)
+
+    app.setCapture(FrameCapture(width, height))
+    def renderCaptured():
+        for i in range(frames):
+            app.renderFrame()
+        app.getCapture().flush()
+    results["capture/1080p/frameCapture"] = timeIt(renderCaptured, frames, repeat=3)
+    app.setCapture(None)
+
+    pixels = numpy.empty((height, width, 4), dtype=numpy.uint8)
+    def renderRead():
+        for i in range(frames):
+            app.renderFrame()
+            framebuffer = app.getFramebuffer()
+            framebuffer.bind()
+            glReadPixels(0, 0, width, height, GL_RGBA, GL_UNSIGNED_BYTE, pixels.ctypes.data)
+            framebuffer.unbind()
+    results["capture/1080p/readPixels"] = timeIt(renderRead, frames, repeat=3)
+    app.close()
+    return results
+
+#imports each module in a fresh interpreter, as a launcher or test run would, and
+#returns the seconds taken (the fastest of repeat tries, so that disk caching is
+#the same for every module)
+def importBenchmarks(repeat=3):
+    package = __package__.rpartition(".")[0]
+    root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    code = ("import time\n"
+            "start = time.perf_counter()\n"
+            "import pyglet\n"
+            "pyglet.options['headless'] = True\n"
+            "pyglet.options['shadow_window'] = False\n"
+            "import %s.%s\n"
+            "print(time.perf_counter() - start)")
+
+    results = {}
+    for module in IMPORT_BUDGETS:
+        times = []
+        for i in range(repeat):
+            output = subprocess.run([sys.executable, "-c", code % (package, module)], cwd=root,
+                                    capture_output=True, text=True, check=True).stdout
+            times += [float(output)]
+        results["import/%s" % module] = min(times)
+    return results
+
+#returns a message for every import that took longer than its budget
+def overBudget(results):
+    messages = []
+    for module, budget in IMPORT_BUDGETS.items():
+        taken = results.get("import/%s" % module)
+        if taken != None and taken > budget:
+            messages += ["importing %s took %.3fs, over its budget of %.3fs" % (module, taken, budget)]
+    return messages
+
+#returns the name of the renderer and the results
+#quick runs only use the smaller counts, for checking the suite itself works
+def run(quick=False):
+    random.seed(0)
+    counts = [100, 1000] if quick else [100, 1000, 10000]
+    drawCounts = [100, 1000] if quick else [1000, 5000]
+
+    app = App(title="uiglet benchmarks", fullscreen=False, width=WIDTH, height=HEIGHT, reuseEvents=True)
+    app.switch_to()
+    app.on_resize(WIDTH, HEIGHT)
+    renderer = gl_info.get_renderer()
+
+    results = {}
+    results.update(constructionBenchmarks(counts))
+    results.update(transformBenchmarks(counts[-1]))
+    results.update(drawBenchmarks(drawCounts))
+    results.update(layerBenchmarks(drawCounts))
+    results.update(instancedBenchmarks(drawCounts))
+    results.update(polylineBenchmarks(drawCounts))
+    results.update(cullingBenchmarks(drawCounts))
+    results.update(triangulationBenchmarks(drawCounts))
+    results.update(eventObjectBenchmarks(counts[-1]))
+    results.update(eventBenchmarks(app, counts[-1]))
+    results.update(routedEventBenchmarks(app, counts[-1]))
+    results.update(screenSwitchBenchmarks(app, counts[-1]))
+    app.close()
+    results.update(registryBenchmarks(20 if quick else 80))
+    results.update(captureBenchmarks(10 if quick else 60))
+    results.update(importBenchmarks())
+    return (renderer, results)
@@ -0,0 +1,61 @@
+import os
+import sys
+import importlib
+
+import numpy
+import pytest
+import pyglet
+
+#author Ryan Bailey
+
+#the tests import the package as uiglet. it is imported by the name of the directory
+#it is checked out in (normally uiglet anyway), so that the tests run from any checkout
+root = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(root))
+sys.modules.setdefault("uiglet", importlib.import_module(os.path.basename(root)))
+
+#tests that need a window make a hidden one. without a display pyglet has to use a
+#headless (egl) context, which has to be chosen before pyglet.window is imported
+if not os.environ.get("DISPLAY"):
+    pyglet.options["headless"] = True
+pyglet.options["shadow_window"] = False
+
+#a hidden window for tests that draw. pixels() reads back what has been drawn as a
+#(height, width, 4) array with the top row first, like the screen coordinates that
+#primitives are made with
+class DrawingWindow():
+    def __init__(self, width, height):
+        #pyglet.gl can only be imported once pyglet's options are set, above
+        from pyglet import gl
+        self.width = width
+        self.height = height
+        self.__window = pyglet.window.Window(width, height, visible=False)
+        self.__window.switch_to()
+        #sets up the projection, which pyglet only does when the window is shown
+        self.__window.on_resize(width, height)
+        self.__pixels = numpy.empty((height, width, 4), dtype=numpy.uint8)
+        self.__gl = gl
+
+    def clear(self, color=(0, 0, 0, 255)):
+        from uiglet.graphics.misc import clear
+        clear(color)
+
+    def pixels(self):
+        gl = self.__gl
+        gl.glFinish()
+        gl.glReadPixels(0, 0, self.width, self.height, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, self.__pixels.ctypes.data)
+        return self.__pixels[::-1].copy()
+
+    #the [r,g,b,a] color of the pixel at (x, y), in screen coordinates
+    def pixel(self, x, y):
+        return self.pixels()[y, x].tolist()
+
+    def close(self):
+        self.__window.close()
+
+@pytest.fixture
+def window():
+    window = DrawingWindow(64, 48)
+    window.clear()
+    yield window
+    window.close()
@@ -0,0 +1,103 @@
+#author Ryan Bailey
+
+#a Culler skips drawing anything that is completely outside the area being shown:
+#the window, or a clipped or scrolled part of it (see Culler.pushViewport).
+#primitives are tested with Primitive.getBounds and widgets with Widget.boundingBox,
+#which are both kept up to date as they move, so testing something is just
+#comparing two boxes and nothing has to be worked out for things that are offscreen.
+
+#it counts how many things it drew and how many it culled, and Culler.newFrame
+#saves the counts of the frame just drawn (see Culler.lastFrame).
+
+#typical use from a Screen:
+#   self.culler = self.addResource(Culler(width, height))
+#   ...
+#   def draw(self):
+#       self.culler.newFrame()
+#       self.culler.draw(self.shapes)
+#       self.widgets.draw(self.culler)
+#adding it as a resource keeps it the size of the window (see Screen.resize)
+class Culler():
+    def __init__(self, width, height):
+        #viewports are (minX, minY, maxX, maxY) boxes in opengl coordinates. the first
+        #is the window and each one pushed is clipped to the one before it
+        self.__viewports = [(0, 0, width, height)]
+        self.__drawn = 0
+        self.__culled = 0
+        self.__lastFrame = (0, 0)
+
+    #called with the window's new size (see Screen.resize)
+    def resize(self, width, height):
+        self.__viewports[0] = (0, 0, width, height)
+
+    #limits culling to the (x, y, width, height) area, in the same coordinates as the
+    #things being drawn (for a scrolled view that is translated by (scrollX, scrollY)
+    #when it is drawn, the area shown is (x - scrollX, y - scrollY, width, height))
+    def pushViewport(self, x, y, width, height):
+        minX, minY, maxX, maxY = self.__viewports[-1]
+        self.__viewports += [(max(minX, x), max(minY, y), min(maxX, x + width), min(maxY, y + height))]
+
+    def popViewport(self):
+        if len(self.__viewports) > 1:
+            self.__viewports.pop()
+
+    #returns the area being shown as an (x, y, width, height) tuple
+    def getViewport(self):
+        minX, minY, maxX, maxY = self.__viewports[-1]
+        return (minX, minY, max(0, maxX - minX), max(0, maxY - minY))
+
+    #returns True if any of the primitive (or anything with getBounds) or widget (or
+    #anything with boundingBox) is in the area being shown
+    def isVisible(self, drawable):
+        viewMinX, viewMinY, viewMaxX, viewMaxY = self.__viewports[-1]
+        if hasattr(drawable, "getBounds"):
+            minX, minY, maxX, maxY = drawable.getBounds()
+        else:
+            minX, minY, width, height = drawable.boundingBox()
+            maxX = minX + width
+            maxY = minY + height
+        return minX <= viewMaxX and viewMinX <= maxX and minY <= viewMaxY and viewMinY <= maxY
+
+    #draws the drawables that are visible, in order
+    def draw(self, drawables):
+        drawn = 0
+        culled = 0
+        for drawable in drawables:
+            if self.isVisible(drawable):
+                drawable.draw()
+                drawn += 1
+            else:
+                culled += 1
+        self.count(drawn, culled)
+
+    #returns a list of the drawables that are visible, and counts them as drawn
+    def visible(self, drawables):
+        found = [drawable for drawable in drawables if self.isVisible(drawable)]
+        self.count(len(found), len(drawables) - len(found))
+        return found
+
+    #adds to this frame's counts, for things that do their own culling (see WidgetGrid.draw)
+    def count(self, drawn, culled):
+        self.__drawn += drawn
+        self.__culled += culled
+
+    #should be called at the start of every frame
+    def newFrame(self):
+        self.__lastFrame = (self.__drawn, self.__culled)
+        self.__drawn = 0
+        self.__culled = 0
+
+    #returns how many things were (drawn, culled) in the last frame
+    def lastFrame(self):
+        return self.__lastFrame
+
+    #a culler holds nothing that needs freeing, but can be added with
+    #Screen.addResource so that it is resized with the window
+    def release(self):
+        pass
+
+    def restore(self):
+        pass
+
+    def resourceSize(self):
+        return 0
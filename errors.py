@@ -22,3 +22,18 @@ class LackOfVerticesError(Exception):
 
 class ScaleByZeroError(Exception):
     pass
+
+class FramebufferError(Exception):
+    pass
+
+class ShaderCompileError(Exception):
+    pass
+
+class FrameCaptureError(Exception):
+    pass
+
+class WidgetSizeError(Exception):
+    pass
+
+class RecordingFormatError(Exception):
+    pass
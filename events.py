@@ -1,9 +1,46 @@
-import pyglet.window.key
-import pyglet.window.mouse
+from .lazy import LazyModule
 
 #author Ryan Bailey
 
+#importing pyglet.window loads opengl, so the key and mouse constants are only
+#looked up when an event needs them (see LazyModule)
+key = LazyModule("pyglet.window.key")
+mouse = LazyModule("pyglet.window.mouse")
+
+#events use __slots__ so that making one doesn't mean making a dict for its fields.
+
+#if an App is made with reuseEvents=True, the motion, drag and scroll events it passes
+#to screens are reused for every event of that type, so a screen that wants to keep
+#one after processInput returns should keep event.copy() instead
+
+#event types, as returned by Event.type_ and used to subscribe to events (see Screen.subscribe)
+MOUSE_CLICK = "MOUSE_CLICK"
+MOUSE_RELEASE = "MOUSE_RELEASE"
+MOUSE_DRAG = "MOUSE_DRAG"
+MOUSE_SCROLL = "MOUSE_SCROLL"
+MOUSE_MOTION = "MOUSE_MOTION"
+KEY_PRESS = "KEY_PRESS"
+
+#keys that only change other keys, so they aren't passed to screens (by their
+#symbol strings, so that pyglet isn't needed to make the set)
+MODIFIER_KEYS = frozenset(("LSHIFT", "RSHIFT", "LCTRL", "RCTRL", "LALT", "RALT", "CAPSLOCK"))
+
+#symbol --> (symbol string, lower case symbol string, whether it is a letter,
+#whether it is a modifier key). filled in the first time each symbol is pressed
+symbols = {}
+
+def symbolInfo(symbol):
+    info = symbols.get(symbol)
+    if info == None:
+        string = key.symbol_string(symbol)
+        #pyglet always gives letters in upper case
+        isLetter = len(string) == 1 and "A" <= string <= "Z"
+        info = symbols[symbol] = (string, string.lower() if isLetter else string, isLetter, string in MODIFIER_KEYS)
+    return info
+
 class Event():
+    __slots__ = ("__type", "__modifers")
+
     def __init__(self, type_, modifiers):
         self.__type = type_
         self.__modifers = modifiers
@@ -11,52 +48,61 @@ class Event():
     def type_(self):
         return self.__type
 
+    #MouseScrollEvents and MouseMotionEvents have no modifiers, so they are given 0
+
     def controlPressed(self):
-        if self.__modifers == None: #MouseScrollEvents and MouseMotionEvents have no modifiers
-            return False
-        return self.__modifers & pyglet.window.key.MOD_CTRL
+        return bool(self.__modifers & key.MOD_CTRL)
 
     def shiftPressed(self):
-        if self.__modifers == None: #MouseScrollEvents and MouseMotionEvents have no modifiers
-            return False
-        return self.__modifers & pyglet.window.key.MOD_SHIFT
+        return bool(self.__modifers & key.MOD_SHIFT)
 
     def altPressed(self):
-        if self.__modifers == None: #MouseScrollEvents and MouseMotionEvents have no modifiers
-            return False
-        return self.__modifers & pyglet.window.key.MOD_ALT
+        return bool(self.__modifers & key.MOD_ALT)
 
     def capsLockOn(self):
-        if self.__modifers == None: #MouseScrollEvents and MouseMotionEvents have no modifiers
-            return False
-        return self.__modifers & pyglet.window.key.MOD_CAPSLOCK
+        return bool(self.__modifers & key.MOD_CAPSLOCK)
+
+    def modifiers(self):
+        return self.__modifers
 
     def shouldBeProcessed(self):
         return True
 
+    #the (x, y) the event happened at, used to find the handlers whose region it is in
+    #None for events that don't have a position, like key presses
+    def position(self):
+        return None
+
 
 class MouseClickEvent(Event):
+    __slots__ = ("__x", "__y", "__button")
+
     def __init__(self, x, y, button, modifiers):
-        super().__init__("MOUSE_CLICK", modifiers)
+        super().__init__(MOUSE_CLICK, modifiers)
         self.__x = x
         self.__y = y
         self.__button = button
 
-    def leftButtonPressed():
-        return self.__button == pyglet.window.mouse.LEFT
+    def leftButtonPressed(self):
+        return self.__button == mouse.LEFT
 
-    def middleButtonPressed():
-        return self.__button == pyglet.window.mouse.MIDDLE
+    def middleButtonPressed(self):
+        return self.__button == mouse.MIDDLE
 
-    def rightButtonPressed():
-        return self.__button == pyglet.window.mouse.RIGHT
+    def rightButtonPressed(self):
+        return self.__button == mouse.RIGHT
 
     def location(self):
         return (self.__x, self.__y)
 
+    def position(self):
+        return (self.__x, self.__y)
+
 class MouseClickReleaseEvent(Event):
+    __slots__ = ("__x", "__y")
+
     def __init__(self, x, y, button, modifiers):
-        super().__init__("MOUSE_RELEASE", modifiers)
+        super().__init__(MOUSE_RELEASE, modifiers)
         self.__x = x
         self.__y = y
         #shouldn't need to handle button as you will know which
@@ -65,103 +111,160 @@ class MouseClickReleaseEvent(Event):
     def location(self):
         return (self.__x, self.__y)
 
+    def position(self):
+        return (self.__x, self.__y)
+
+#rawEventCount is the number of events from pyglet that were merged to make
+#this one (see App's coalesceMotion)
 class MouseDragEvent(Event):
-    def __init__(self, x, y, dx, dy, buttons, modifiers):
-        super().__init__("MOUSE_DRAG", modifiers)
+    __slots__ = ("__x", "__y", "__dx", "__dy", "__buttons", "__rawEventCount")
+
+    def __init__(self, x, y, dx, dy, buttons, modifiers, rawEventCount=1):
+        super().__init__(MOUSE_DRAG, modifiers)
         self.__x = x
         self.__y = y
         self.__dx = dx
         self.__dy = dy
         self.__buttons = buttons
+        self.__rawEventCount = rawEventCount
+
+    #sets every field again so that the event can be used for the next drag
+    #returns the event
+    def reuse(self, x, y, dx, dy, buttons, modifiers, rawEventCount=1):
+        super().__init__(MOUSE_DRAG, modifiers)
+        self.__x = x
+        self.__y = y
+        self.__dx = dx
+        self.__dy = dy
+        self.__buttons = buttons
+        self.__rawEventCount = rawEventCount
+        return self
+
+    def copy(self):
+        return MouseDragEvent(self.__x, self.__y, self.__dx, self.__dy, self.__buttons,
+                              self.modifiers(), self.__rawEventCount)
 
     def leftButtonDragged(self):
-        return self.__buttons & pyglet.window.mouse.LEFT
+        return self.__buttons & mouse.LEFT
 
     def middleButtonDragged(self):
-        return self.__buttons & pyglet.window.mouse.MIDDLE
+        return self.__buttons & mouse.MIDDLE
 
     def rightButtonDragged(self):
-        return self.__buttons & pyglet.window.mouse.RIGHT
+        return self.__buttons & mouse.RIGHT
 
     def initialLocation(self):
         return (self.__x, self.__y)
 
+    def position(self):
+        return (self.__x, self.__y)
+
     def finalLocation(self):
         return (self.__x + self.__dx, self.__y + self.__dy)
 
     def vector(self):
         return (self.__dx, self.__dy)
 
+    def rawEventCount(self):
+        return self.__rawEventCount
+
 
 class KeyEvent(Event):
+    __slots__ = ("__symbol", "__string", "__lower", "__isLetter", "__isModifier")
+
     def __init__(self, symbol, modifiers):
-        super().__init__("KEY_PRESS", modifiers)
-        self.__symbol = pyglet.window.key.symbol_string(symbol)
-        
+        super().__init__(KEY_PRESS, modifiers)
+        self.__symbol = symbol
+        self.__string, self.__lower, self.__isLetter, self.__isModifier = symbolInfo(symbol)
+
     #returns the key pressed
     def key(self):
-        if not self.capsLockOn() and self.shiftPressed() and self.isLetter():
-            return self.__symbol
-        elif self.capsLockOn() and not self.shiftPressed() and self.isLetter():
-            return self.__symbol
-        elif self.capsLockOn() and self.shiftPressed() and self.isLetter():
-            return self.__symbol.lower()
-        elif self.isLetter():
-            return self.__symbol.lower()
-        else:
-            return self.__symbol
+        if not self.__isLetter:
+            return self.__string
+        #letters are upper case if exactly one of shift and caps lock is on
+        if self.capsLockOn() != self.shiftPressed():
+            return self.__string
+        return self.__lower
         #add symbol handling etc?
 
     def isLetter(self):
-        #if the symbol string has a length greater than one, the symbol cannot be a letter
-        if len(self.__symbol) > 1:
-            return False
+        return self.__isLetter
 
-        #you only need to check upper case as pyglet always gives the key in upper case
-        if int(self.__symbol) >= 65 and int(self.__symbol) <= 90:
-            return True
-        return False
+    #returns the pyglet key symbol (e.g. pyglet.window.key.A)
+    def symbol(self):
+        return self.__symbol
 
     #called by app to figure out whether or not the event should be passed to the screen
     def shouldBeProcessed(self):
-        alreadyHandled = (pyglet.window.key.LSHIFT,
-                          pyglet.window.key.RSHIFT,
-                          pyglet.window.key.LCTRL,
-                          pyglet.window.key.RCTRL,
-                          pyglet.window.key.LALT,
-                          pyglet.window.key.RALT,
-                          pyglet.window.key.CAPSLOCK)
-        if self.__symbol in alreadyHandled:
-            return False
-        return True
+        return not self.__isModifier
 
 class MouseScrollEvent(Event):
+    __slots__ = ("__x", "__y", "__scrollY")
+
     def __init__(self, x, y, scrollX, scrollY):
-        super.__init__("MOUSE_SCROLL", None)
+        super().__init__(MOUSE_SCROLL, 0)
         self.__x = x
         self.__y = y
         #no need to handle scrollX as the app won't be using horizontal scrolling
         self.__scrollY = scrollY
 
+    #sets every field again so that the event can be used for the next scroll
+    #returns the event
+    def reuse(self, x, y, scrollX, scrollY):
+        self.__x = x
+        self.__y = y
+        self.__scrollY = scrollY
+        return self
+
+    def copy(self):
+        return MouseScrollEvent(self.__x, self.__y, 0, self.__scrollY)
+
     def mousePosition(self):
-        return (self.x, self.y)
+        return (self.__x, self.__y)
+
+    def position(self):
+        return (self.__x, self.__y)
 
     def numberOfScrollClicks(self):
-        return scrollY
+        return self.__scrollY
 
+#rawEventCount is the number of events from pyglet that were merged to make
+#this one (see App's coalesceMotion)
 class MouseMotionEvent(Event):
-    def __init__(self, x, y, dx, dy):
-        super().__init__("MOUSE_MOTION", None)
+    __slots__ = ("__x", "__y", "__dx", "__dy", "__rawEventCount")
+
+    def __init__(self, x, y, dx, dy, rawEventCount=1):
+        super().__init__(MOUSE_MOTION, 0)
         self.__x = x
         self.__y = y
         self.__dx = dx
         self.__dy = dy
+        self.__rawEventCount = rawEventCount
+
+    #sets every field again so that the event can be used for the next motion
+    #returns the event
+    def reuse(self, x, y, dx, dy, rawEventCount=1):
+        self.__x = x
+        self.__y = y
+        self.__dx = dx
+        self.__dy = dy
+        self.__rawEventCount = rawEventCount
+        return self
+
+    def copy(self):
+        return MouseMotionEvent(self.__x, self.__y, self.__dx, self.__dy, self.__rawEventCount)
 
     def initialLocation(self):
         return (self.__x, self.__y)
 
+    def position(self):
+        return (self.__x, self.__y)
+
     def finalLocation(self):
         return (self.__x + self.__dx, self.__y + self.__dy)
 
     def vector(self):
         return (self.__dx, self.__dy)
+
+    def rawEventCount(self):
+        return self.__rawEventCount
@@ -0,0 +1,64 @@
+from collections import OrderedDict
+
+#author Ryan Bailey
+
+#releases the resources of the screens that were shown least recently (see
+#Screen.releaseResources) once the screens that have been built are using more than
+#memoryBudget bytes between them, or once more than maxResidentScreens of them are
+#holding on to their resources. the screen being shown is never released, and a
+#released screen is restored before it is shown again
+#give one to App as its evictionPolicy
+class LRUEvictionPolicy():
+    def __init__(self, memoryBudget=64*1024*1024, maxResidentScreens=None):
+        self.__memoryBudget = memoryBudget
+        self.__maxResidentScreens = maxResidentScreens
+        self.__resident = OrderedDict() #name --> screen, least recently shown first
+        self.__released = {} #name --> screen
+        self.__current = None #the name of the screen being shown
+        self.__releases = 0
+
+    #called by the app when a screen has been built without being shown (see App.prewarm)
+    #it is put just behind the screen being shown, as it is likely to be shown next
+    def screenBuilt(self, name, screen):
+        self.__resident[name] = screen
+        self.__resident.move_to_end(name)
+        if self.__current in self.__resident:
+            self.__resident.move_to_end(self.__current)
+        self.__evict(self.__current)
+
+    #called by the app when it switches to a screen
+    def screenShown(self, name, screen):
+        if name in self.__released:
+            del self.__released[name]
+            screen.restoreResources()
+        self.__resident[name] = screen
+        self.__resident.move_to_end(name)
+        self.__current = name
+        self.__evict(name)
+
+    def isReleased(self, name):
+        return name in self.__released
+
+    #the names of the screens that are holding on to their resources
+    def residentScreens(self):
+        return list(self.__resident)
+
+    #the number of times a screen has been released
+    def releases(self):
+        return self.__releases
+
+    def __evict(self, current):
+        sizes = {name: screen.resourceSize() for name, screen in self.__resident.items()}
+        total = sum(sizes.values())
+        for name in list(self.__resident):
+            overBudget = total > self.__memoryBudget
+            overCount = self.__maxResidentScreens != None and len(self.__resident) > self.__maxResidentScreens
+            if not overBudget and not overCount:
+                return
+            if name == current:
+                continue
+            screen = self.__resident.pop(name)
+            screen.releaseResources()
+            self.__released[name] = screen
+            self.__releases += 1
+            total -= sizes[name]
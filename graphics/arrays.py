@@ -0,0 +1,204 @@
+import numpy
+
+from .primitives import unitCircle
+from .triangulate import fan, areConvex, triangulationCache
+from .misc import enableBlending
+from ..errors import ColorLengthError, ColorRangeError, LackOfVerticesError, ScaleByZeroError
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#a PrimitiveArray holds lots of shapes that all have the same number of vertices
+#(e.g. thousands of particles or map markers) without a Python object for each one.
+#everything lives in contiguous numpy arrays:
+#   - the untransformed vertices of every shape, shape (count, vertexCount, 2)
+#   - one packed 8-bit [r,g,b,a] color per shape, shape (count, 4)
+#   - one 2d affine transform per shape (see Primitive), shape (count, 6)
+#and the whole array is drawn in a single draw call straight from those arrays.
+
+#most methods take a selection saying which shapes to change. it can be anything
+#that can index a numpy array: an int, a slice, a list/array of indices or a
+#boolean mask. None means every shape. the values given can either be single
+#values that are applied to every selected shape, or one value per selected shape.
+class PrimitiveArray():
+    #colors should be either a single [r,g,b,a] list or one per shape, all 8-bit
+    #vertices should be a (count, vertexCount, 2) array-like with the y axis
+    #lowest at the top, like the vertices given to a Primitive
+    def __init__(self, colors, vertices, screenHeight, rotations=0):
+        self.__screenHeight = screenHeight
+
+        self.__localVertices = numpy.array(vertices, dtype=numpy.float32)
+        if self.__localVertices.ndim != 3 or self.__localVertices.shape[2] != 2:
+            raise ValueError("The vertices supplied to a primitive array should have the shape (count, vertexCount, 2)")
+        if self.__localVertices.shape[1] < 3:
+            raise LackOfVerticesError("The shapes in the primitive array have too few vertices")
+        count, vertexCount = self.__localVertices.shape[:2]
+
+        self.__colors = numpy.empty((count, 4), dtype=numpy.uint8)
+        self.changeColor(colors)
+
+        minimums = self.__localVertices.min(axis=1)
+        maximums = self.__localVertices.max(axis=1)
+        self.__localCentres = (minimums + maximums)/2
+
+        #every shape starts off with the transform that converts its vertices for
+        #opengl (see Primitive.convertVertices)
+        self.__transforms = numpy.zeros((count, 6), dtype=numpy.float32)
+        self.__transforms[:, 0] = 1
+        self.__transforms[:, 4] = -1
+        self.__transforms[:, 5] = screenHeight
+
+        #convex shapes (checked all at once) are a fan of triangles, anything else is
+        #triangulated on its own, like a Primitive (see triangulate.py)
+        convex = areConvex(self.__localVertices)
+        if convex.all():
+            triangles = numpy.tile(fan(vertexCount), (count, 1))
+            self.__indices = (triangles + numpy.arange(count, dtype=numpy.uint32)[:, numpy.newaxis]*vertexCount).ravel()
+        else:
+            #shapes that touch themselves can have fewer triangles, so each is offset on its own
+            triangles = [fan(vertexCount) if convex[shape] else triangulationCache.get(self.__localVertices[shape])
+                         for shape in range(count)]
+            offsets = numpy.repeat(numpy.arange(count, dtype=numpy.uint32)*vertexCount, [len(indices) for indices in triangles])
+            self.__indices = numpy.concatenate(triangles) + offsets
+
+        self.__vertices = None #world space vertices, None when out of date
+        self.__vertexColors = None
+
+        if numpy.any(rotations):
+            self.rotate(rotations)
+
+    def __len__(self):
+        return len(self.__localVertices)
+
+    def draw(self):
+        vertices = self.getVertices()
+        if self.__vertexColors is None:
+            self.__vertexColors = numpy.repeat(self.__colors, self.__localVertices.shape[1], axis=0)
+
+        enableBlending()
+
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glEnableClientState(gl.GL_COLOR_ARRAY)
+        gl.glVertexPointer(2, gl.GL_FLOAT, 0, vertices.ctypes.data)
+        gl.glColorPointer(4, gl.GL_UNSIGNED_BYTE, 0, self.__vertexColors.ctypes.data)
+        gl.glDrawElements(gl.GL_TRIANGLES, len(self.__indices), gl.GL_UNSIGNED_INT, self.__indices.ctypes.data)
+        gl.glDisableClientState(gl.GL_COLOR_ARRAY)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+
+    #rotates each selected shape about its own centre
+    def rotate(self, degrees, selection=None):
+        radians = numpy.radians(degrees)
+        cos = numpy.cos(radians)
+        sin = numpy.sin(radians)
+
+        a, b, c, d, e, f = self.__selectedTransforms(selection)
+        centreX, centreY = self.__centres(selection)
+        self.__setTransforms(selection,
+                             cos*a - sin*d,
+                             cos*b - sin*e,
+                             cos*(c - centreX) - sin*(f - centreY) + centreX,
+                             sin*a + cos*d,
+                             sin*b + cos*e,
+                             sin*(c - centreX) + cos*(f - centreY) + centreY)
+
+    #translate the selected shapes relative to their current positions
+    def translateRelative(self, dx, dy, selection=None):
+        a, b, c, d, e, f = self.__selectedTransforms(selection)
+        self.__setTransforms(selection, a, b, c + dx, d, e, f - dy)
+
+    #translate the centre points of the selected shapes to the specified coordinates
+    def translateCentresTo(self, x, y, selection=None):
+        convertedY = self.__screenHeight - numpy.asarray(y)
+        a, b, c, d, e, f = self.__selectedTransforms(selection)
+        centreX, centreY = self.__centres(selection)
+        self.__setTransforms(selection, a, b, c + x - centreX, d, e, f + convertedY - centreY)
+
+    #scales each selected shape about its own centre
+    def scale(self, xScaleFactor, yScaleFactor, selection=None):
+        if numpy.any(numpy.asarray(xScaleFactor) == 0) or numpy.any(numpy.asarray(yScaleFactor) == 0):
+            raise ScaleByZeroError("Why would you ever want to scale a primitive by zero?")
+
+        a, b, c, d, e, f = self.__selectedTransforms(selection)
+        centreX, centreY = self.__centres(selection)
+        self.__setTransforms(selection,
+                             xScaleFactor*a,
+                             xScaleFactor*b,
+                             xScaleFactor*(c - centreX) + centreX,
+                             yScaleFactor*d,
+                             yScaleFactor*e,
+                             yScaleFactor*(f - centreY) + centreY)
+
+    #colors should be either a single [r,g,b,a] list or one per selected shape
+    def changeColor(self, colors, selection=None):
+        colors = numpy.asarray(colors)
+        if colors.shape[-1:] != (4,):
+            raise ColorLengthError("The colors supplied to a primitive array should have 4 values")
+        if numpy.any(colors < 0) or numpy.any(colors > 255):
+            raise ColorRangeError("The RGB values in the colors should be from 0-255")
+
+        self.__colors[self.__all(selection)] = colors
+        self.__vertexColors = None
+
+    #returns the [r,g,b,a] colors of the selected shapes as a (count, 4) array
+    def getColors(self, selection=None):
+        return self.__colors[self.__all(selection)]
+
+    #returns the centres of the selected shapes (in opengl coordinates)
+    #as a (count, 2) array
+    def getCentres(self, selection=None):
+        return numpy.stack(self.__centres(selection), axis=-1)
+
+    #returns the vertices of every shape in opengl coordinates as a
+    #(count*vertexCount, 2) array. like Primitive.getVertices it is cached
+    #until the next transform, so it is read only
+    def getVertices(self):
+        if self.__vertices is None:
+            a, b, c, d, e, f = (column[:, numpy.newaxis] for column in self.__transforms.T)
+            x = self.__localVertices[:, :, 0]
+            y = self.__localVertices[:, :, 1]
+            vertices = numpy.empty(self.__localVertices.shape, dtype=numpy.float32)
+            vertices[:, :, 0] = a*x + b*y + c
+            vertices[:, :, 1] = d*x + e*y + f
+            self.__vertices = vertices.reshape(-1, 2)
+            self.__vertices.flags.writeable = False
+        return self.__vertices
+
+    def __all(self, selection):
+        if selection is None:
+            return slice(None)
+        return selection
+
+    def __selectedTransforms(self, selection):
+        return self.__transforms[self.__all(selection)].T
+
+    def __setTransforms(self, selection, a, b, c, d, e, f):
+        self.__transforms[self.__all(selection)] = numpy.stack(numpy.broadcast_arrays(a, b, c, d, e, f), axis=-1)
+        self.__vertices = None
+
+    def __centres(self, selection):
+        a, b, c, d, e, f = self.__selectedTransforms(selection)
+        x, y = self.__localCentres[self.__all(selection)].T
+        return (a*x + b*y + c, d*x + e*y + f)
+
+class RectangleArray(PrimitiveArray):
+    #each of x, y, width and height can be a single value or one per rectangle
+    def __init__(self, colors, x, y, width, height, screenHeight, rotations=0):
+        x, y, width, height = numpy.broadcast_arrays(*(numpy.atleast_1d(numpy.asarray(value, dtype=numpy.float32))
+                                                      for value in (x, y, width, height)))
+        vertices = numpy.stack(((x, y),
+                                (x + width, y),
+                                (x + width, y + height),
+                                (x, y + height)))
+        super().__init__(colors, vertices.transpose(2, 0, 1), screenHeight, rotations)
+
+class EllipseArray(PrimitiveArray):
+    #(x, y) is the coordinate of the top left corner of the rectangle
+    #that fits around each ellipse
+    def __init__(self, colors, x, y, width, height, screenHeight, rotations=0, vertexCount=30):
+        x, y, width, height = numpy.broadcast_arrays(*(numpy.atleast_1d(numpy.asarray(value, dtype=numpy.float32))
+                                                      for value in (x, y, width, height)))
+        circleX, circleY = unitCircle(vertexCount).T.astype(numpy.float32)
+        vertices = numpy.empty((len(x), vertexCount, 2), dtype=numpy.float32)
+        vertices[:, :, 0] = (x + width/2)[:, numpy.newaxis] + (width/2)[:, numpy.newaxis]*circleX
+        vertices[:, :, 1] = (y + height/2)[:, numpy.newaxis] + (height/2)[:, numpy.newaxis]*circleY
+        super().__init__(colors, vertices, screenHeight, rotations)
@@ -0,0 +1,163 @@
+import ctypes
+import numpy
+import pyglet
+
+from .primitives import VERTICES_CHANGED, COLOR_CHANGED, SHAPE_CHANGED
+from .misc import enableBlending
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#transparent primitives are drawn in this group, after all the opaque ones,
+#so that anything behind them has already been drawn when they are blended.
+#the class is made the first time a batch is made, as pyglet.graphics loads opengl
+transparentGroupClass = None
+
+def transparentGroup(order):
+    global transparentGroupClass
+    if transparentGroupClass == None:
+        class TransparentGroup(pyglet.graphics.OrderedGroup):
+            def set_state(self):
+                enableBlending()
+
+            def unset_state(self):
+                gl.glDisable(gl.GL_BLEND)
+        transparentGroupClass = TransparentGroup
+    return transparentGroupClass(order)
+
+#draws lots of primitives in a handful of draw calls rather than a glBegin/glEnd
+#pair each. the geometry and colors of every primitive added are kept in vertex
+#buffers on the gpu, and when a primitive is transformed or recolored only the
+#part of the buffer that belongs to it is updated (the next time draw is called)
+class PrimitiveBatch():
+    def __init__(self):
+        self.__batch = pyglet.graphics.Batch()
+        self.__opaqueGroup = pyglet.graphics.OrderedGroup(0)
+        self.__transparentGroup = transparentGroup(1)
+
+        self.__vertexLists = {}
+        self.__groups = {}
+        self.__changed = {} #primitive --> changes waiting to be uploaded
+        self.__released = None #the primitives in the batch while it is released
+
+    def add(self, primitive):
+        if self.__released != None:
+            if primitive not in self.__released:
+                self.__released += [primitive]
+            return
+        if primitive in self.__vertexLists:
+            return
+
+        count = len(primitive.getLocalVertices())
+        #GL_POLYGON can't be batched, so the primitive is drawn as its triangles
+        indices = primitive.getTriangles().tolist()
+
+        group = self.__groupFor(primitive)
+        self.__groups[primitive] = group
+        vertexList = self.__batch.add_indexed(count, gl.GL_TRIANGLES, group, indices, "v2f/dynamic", "c4B/dynamic")
+        self.__vertexLists[primitive] = vertexList
+        self.__uploadVertices(primitive, vertexList)
+        self.__uploadColors(primitive, vertexList)
+        primitive.addObserver(self)
+
+    def remove(self, primitive):
+        if self.__released != None:
+            if primitive in self.__released:
+                self.__released.remove(primitive)
+            return
+        if primitive not in self.__vertexLists:
+            return
+
+        primitive.removeObserver(self)
+        self.__vertexLists.pop(primitive).delete()
+        self.__groups.pop(primitive)
+        self.__changed.pop(primitive, None)
+
+    def __contains__(self, primitive):
+        if self.__released != None:
+            return primitive in self.__released
+        return primitive in self.__vertexLists
+
+    def __len__(self):
+        if self.__released != None:
+            return len(self.__released)
+        return len(self.__vertexLists)
+
+    #frees the batch's buffers on the gpu while keeping track of its primitives, so
+    #that a screen that isn't being shown doesn't use any (see Screen.releaseResources)
+    #the buffers are made again by restore, or by the next draw
+    def release(self):
+        if self.__released != None:
+            return
+        primitives = list(self.__vertexLists)
+        for primitive in primitives:
+            self.remove(primitive)
+        self.__batch = pyglet.graphics.Batch()
+        self.__released = primitives
+
+    def restore(self):
+        if self.__released == None:
+            return
+        primitives = self.__released
+        self.__released = None
+        for primitive in primitives:
+            self.add(primitive)
+
+    #roughly how many bytes of gpu memory the batch is using: 8 bytes of vertex and
+    #4 of color for every vertex, and 4 bytes for every index of its triangles
+    def resourceSize(self):
+        size = 0
+        for primitive, vertexList in self.__vertexLists.items():
+            size += vertexList.get_size()*12 + len(primitive.getTriangles())*4
+        return size
+
+    #called by the primitives in the batch whenever they change
+    #the upload is left until draw so that a primitive that is transformed
+    #several times in a frame is only uploaded once
+    def primitiveChanged(self, primitive, change):
+        self.__changed[primitive] = self.__changed.get(primitive, 0) | change
+
+    def draw(self):
+        if self.__released != None:
+            self.restore()
+        if self.__changed:
+            self.__upload()
+        self.__batch.draw()
+
+    def __upload(self):
+        changed = self.__changed
+        self.__changed = {}
+        for primitive, change in changed.items():
+            if change & SHAPE_CHANGED:
+                #the number of vertices may have changed, so it needs a new vertex list
+                self.remove(primitive)
+                self.add(primitive)
+                continue
+
+            vertexList = self.__vertexLists[primitive]
+            if change & VERTICES_CHANGED:
+                self.__uploadVertices(primitive, vertexList)
+            if change & COLOR_CHANGED:
+                self.__uploadColors(primitive, vertexList)
+                #a primitive that has become (or stopped being) transparent
+                #has to move group to keep the draw order correct
+                group = self.__groupFor(primitive)
+                if group != self.__groups[primitive]:
+                    self.__batch.migrate(vertexList, gl.GL_TRIANGLES, group, self.__batch)
+                    self.__groups[primitive] = group
+
+    def __groupFor(self, primitive):
+        if primitive.isTransparent():
+            return self.__transparentGroup
+        return self.__opaqueGroup
+
+    #accessing vertexList.vertices/colors marks just that vertex list's part of
+    #the buffer as needing to be sent to the gpu, and the numpy arrays are
+    #copied straight into it
+    def __uploadVertices(self, primitive, vertexList):
+        vertices = primitive.getVertices()
+        ctypes.memmove(vertexList.vertices, vertices.ctypes.data, vertices.nbytes)
+
+    def __uploadColors(self, primitive, vertexList):
+        colors = numpy.tile(numpy.array(primitive.getColor(), dtype=numpy.uint8), vertexList.get_size())
+        ctypes.memmove(vertexList.colors, colors.ctypes.data, colors.nbytes)
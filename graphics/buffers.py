@@ -0,0 +1,49 @@
+import ctypes
+
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#an opengl buffer object holding the contents of a numpy array. parts of it can be
+#replaced without sending the whole array again (see VertexBuffer.update)
+class VertexBuffer():
+    #target is GL_ARRAY_BUFFER (the default) for vertex data or GL_ELEMENT_ARRAY_BUFFER
+    #for indices, and usage defaults to GL_DYNAMIC_DRAW
+    def __init__(self, array, target=None, usage=None):
+        self.__target = gl.GL_ARRAY_BUFFER if target == None else target
+        self.__usage = gl.GL_DYNAMIC_DRAW if usage == None else usage
+        buffer = gl.GLuint()
+        gl.glGenBuffers(1, ctypes.byref(buffer))
+        self.__buffer = buffer.value
+        self.__size = 0
+        self.setData(array)
+
+    #replaces the whole buffer, resizing it if needed
+    def setData(self, array):
+        gl.glBindBuffer(self.__target, self.__buffer)
+        gl.glBufferData(self.__target, array.nbytes, array.ctypes.data, self.__usage)
+        gl.glBindBuffer(self.__target, 0)
+        self.__size = array.nbytes
+
+    #sends rows start to stop of array (which should be the array the buffer was
+    #made from, or one like it) to the same place in the buffer
+    def update(self, array, start, stop):
+        rowBytes = array.strides[0]
+        gl.glBindBuffer(self.__target, self.__buffer)
+        gl.glBufferSubData(self.__target, start*rowBytes, (stop - start)*rowBytes, array.ctypes.data + start*rowBytes)
+        gl.glBindBuffer(self.__target, 0)
+
+    def bind(self):
+        gl.glBindBuffer(self.__target, self.__buffer)
+
+    def unbind(self):
+        gl.glBindBuffer(self.__target, 0)
+
+    #the number of bytes in the buffer
+    def resourceSize(self):
+        return self.__size
+
+    def delete(self):
+        if self.__buffer != None:
+            gl.glDeleteBuffers(1, ctypes.byref(gl.GLuint(self.__buffer)))
+            self.__buffer = None
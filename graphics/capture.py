@@ -0,0 +1,133 @@
+import ctypes
+import numpy
+
+from ..errors import FrameCaptureError
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#a FrameCapture reads frames back from the gpu into numpy arrays without holding up
+#drawing (e.g. for thumbnails, remote monitoring or visual regression tests).
+
+#glReadPixels straight into memory waits for the gpu to finish the frame before it
+#returns. instead each frame is read into a pixel buffer object on the gpu, which
+#returns straight away, and the frame read bufferCount - 1 captures before (which the
+#gpu has had a frame or more to finish) is copied out of its pixel buffer into a
+#numpy array. the arrays are made once and reused in turn, so capturing every frame
+#allocates nothing, and the frames come out bufferCount - 1 frames late.
+
+#frames are handed over as (height, width, 4) arrays of 8-bit rgba with the top row
+#first. the array is written over bufferCount captures later, so copy it to keep it
+
+#typical use (see App.setCapture):
+#   capture = FrameCapture(width, height, onFrame=lambda pixels, frame: ...)
+#   app.setCapture(capture)
+class FrameCapture():
+    #onFrame is called with (pixels, frame number) whenever a frame has been read back
+    def __init__(self, width, height, onFrame=None, bufferCount=2):
+        self.__width = width
+        self.__height = height
+        self.__onFrame = onFrame
+        self.__bufferCount = bufferCount
+
+        self.__buffers = None #pixel buffers, made on the first capture as they need a context
+        self.__arrays = [numpy.empty((height, width, 4), dtype=numpy.uint8) for i in range(bufferCount)]
+        self.__captured = 0 #frames that have been read into a pixel buffer
+        self.__finished = 0 #frames that have been copied out of one
+
+    #reads the framebuffer that is bound (the window's back buffer, or the app's
+    #framebuffer if it is offscreen) into the next pixel buffer. should be called once
+    #a frame has been drawn. returns the pixels of the frame that was finished, or None
+    #if the first few frames are still being read
+    def capture(self):
+        if self.__buffers == None:
+            self.__makeBuffers()
+
+        buffer = self.__buffers[self.__captured % self.__bufferCount]
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, buffer)
+        gl.glReadPixels(0, 0, self.__width, self.__height, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        self.__captured += 1
+
+        #every pixel buffer is in use, so the oldest frame is copied out to free one
+        if self.__captured - self.__finished == self.__bufferCount:
+            return self.__finish()
+        return None
+
+    #copies out every frame still being read (e.g. after the last frame has been
+    #captured) and returns the pixels of the last one, or None if there were none
+    def flush(self):
+        pixels = None
+        while self.__finished < self.__captured:
+            pixels = self.__finish()
+        return pixels
+
+    #the number of frames that have been handed over
+    def frames(self):
+        return self.__finished
+
+    def getSize(self):
+        return (self.__width, self.__height)
+
+    #frames still being read at the old size are dropped
+    def resize(self, width, height):
+        if (width, height) == (self.__width, self.__height):
+            return
+        self.release()
+        self.__width = width
+        self.__height = height
+        self.__arrays = [numpy.empty((height, width, 4), dtype=numpy.uint8) for i in range(self.__bufferCount)]
+
+    #frees the pixel buffers, dropping any frames still being read. they are made
+    #again by the next capture (see Screen.releaseResources)
+    def release(self):
+        if self.__buffers != None:
+            buffers = (gl.GLuint*len(self.__buffers))(*self.__buffers)
+            gl.glDeleteBuffers(len(self.__buffers), buffers)
+            self.__buffers = None
+        self.__finished = self.__captured
+
+    def restore(self):
+        pass
+
+    #the bytes used on the gpu by the pixel buffers
+    def resourceSize(self):
+        if self.__buffers == None:
+            return 0
+        return self.__bufferCount*self.__width*self.__height*4
+
+    def delete(self):
+        self.release()
+
+    def __makeBuffers(self):
+        buffers = (gl.GLuint*self.__bufferCount)()
+        gl.glGenBuffers(self.__bufferCount, buffers)
+        self.__buffers = list(buffers)
+        for buffer in self.__buffers:
+            gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, buffer)
+            gl.glBufferData(gl.GL_PIXEL_PACK_BUFFER, self.__width*self.__height*4, None, gl.GL_STREAM_READ)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+
+    #copies the oldest frame being read into its array and hands it over. raises
+    #FrameCaptureError if the pixel buffer can't be mapped, rather than handing over
+    #whatever the array held before (the frame is dropped, so capturing can go on)
+    def __finish(self):
+        frame = self.__finished
+        array = self.__arrays[frame % self.__bufferCount]
+
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, self.__buffers[frame % self.__bufferCount])
+        pointer = gl.glMapBuffer(gl.GL_PIXEL_PACK_BUFFER, gl.GL_READ_ONLY)
+        if pointer:
+            ctypes.memmove(array.ctypes.data, pointer, array.nbytes)
+            gl.glUnmapBuffer(gl.GL_PIXEL_PACK_BUFFER)
+        gl.glBindBuffer(gl.GL_PIXEL_PACK_BUFFER, 0)
+        self.__finished += 1
+        if not pointer:
+            raise FrameCaptureError("(FrameCapture.capture) Frame " + str(frame) + " couldn't be read back "
+                                    "(glMapBuffer failed with error " + hex(gl.glGetError()) + ")")
+
+        #opengl's rows start at the bottom, so the array is flipped (without copying it)
+        pixels = array[::-1]
+        if self.__onFrame != None:
+            self.__onFrame(pixels, frame)
+        return pixels
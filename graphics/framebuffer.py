@@ -0,0 +1,90 @@
+import ctypes
+
+from ..errors import FramebufferError
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#an offscreen framebuffer with an rgba texture attached, so that things can be drawn
+#once into the texture and the texture drawn instead of them (see CachedLayer)
+class Framebuffer():
+    def __init__(self, width, height):
+        self.__width = width
+        self.__height = height
+
+        texture = gl.GLuint()
+        gl.glGenTextures(1, ctypes.byref(texture))
+        self.__texture = texture.value
+        self.__allocate()
+
+        framebuffer = gl.GLuint()
+        gl.glGenFramebuffers(1, ctypes.byref(framebuffer))
+        self.__framebuffer = framebuffer.value
+
+        previous = self.__bound()
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.__framebuffer)
+        gl.glFramebufferTexture2D(gl.GL_FRAMEBUFFER, gl.GL_COLOR_ATTACHMENT0, gl.GL_TEXTURE_2D, self.__texture, 0)
+        status = gl.glCheckFramebufferStatus(gl.GL_FRAMEBUFFER)
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, previous)
+        if status != gl.GL_FRAMEBUFFER_COMPLETE:
+            self.delete()
+            raise FramebufferError("(Framebuffer) The framebuffer is incomplete (status " + hex(status) + ")")
+
+        self.__previous = None
+
+    #everything drawn until unbind is drawn into the texture, with (0, 0) at its
+    #bottom left corner
+    def bind(self):
+        viewport = (gl.GLint*4)()
+        gl.glGetIntegerv(gl.GL_VIEWPORT, viewport)
+        self.__previous = (self.__bound(), tuple(viewport))
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, self.__framebuffer)
+        gl.glViewport(0, 0, self.__width, self.__height)
+
+    #goes back to drawing to whatever was being drawn to before bind
+    def unbind(self):
+        framebuffer, viewport = self.__previous
+        self.__previous = None
+        gl.glBindFramebuffer(gl.GL_FRAMEBUFFER, framebuffer)
+        gl.glViewport(*viewport)
+
+    #the texture's contents are lost
+    def resize(self, width, height):
+        if (width, height) == (self.__width, self.__height):
+            return
+        self.__width = width
+        self.__height = height
+        self.__allocate()
+
+    def getTexture(self):
+        return self.__texture
+
+    def getSize(self):
+        return (self.__width, self.__height)
+
+    #the number of bytes the texture takes up
+    def resourceSize(self):
+        return self.__width*self.__height*4
+
+    def delete(self):
+        if self.__framebuffer != None:
+            gl.glDeleteFramebuffers(1, ctypes.byref(gl.GLuint(self.__framebuffer)))
+            self.__framebuffer = None
+        if self.__texture != None:
+            gl.glDeleteTextures(1, ctypes.byref(gl.GLuint(self.__texture)))
+            self.__texture = None
+
+    def __allocate(self):
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.__texture)
+        #the texture is drawn at the size it was drawn at, so there's no need to filter it
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MIN_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_MAG_FILTER, gl.GL_NEAREST)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_S, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexParameteri(gl.GL_TEXTURE_2D, gl.GL_TEXTURE_WRAP_T, gl.GL_CLAMP_TO_EDGE)
+        gl.glTexImage2D(gl.GL_TEXTURE_2D, 0, gl.GL_RGBA8, self.__width, self.__height, 0, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, None)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+
+    def __bound(self):
+        framebuffer = gl.GLint()
+        gl.glGetIntegerv(gl.GL_FRAMEBUFFER_BINDING, ctypes.byref(framebuffer))
+        return framebuffer.value
@@ -0,0 +1,274 @@
+import numpy
+
+from .shader import ShaderProgram
+from .buffers import VertexBuffer
+from .misc import enableBlending
+from ..errors import ColorLengthError, ColorRangeError, ScaleByZeroError
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#an InstancedShape draws lots of copies of one shape (e.g. particles, scatter plot
+#points, the lights on an led panel) in a single instanced draw call. the shape's
+#vertices are sent to the gpu once, and each copy (instance) only has:
+#   - a position: where the centre of the shape is drawn
+#   - a scale along x and y
+#   - a rotation in degrees
+#   - an 8-bit [r,g,b,a] color
+#which are kept in numpy arrays and in vertex buffers that opengl steps through once
+#per instance rather than once per vertex (see glVertexAttribDivisor). only the
+#instances that have changed since the last draw are sent to the gpu again, so
+#changing a few instances, or a contiguous range of them, is cheap.
+
+#it needs opengl 3.3 (or the ARB_instanced_arrays extension)
+
+#like PrimitiveArray, the methods take a selection saying which instances to change:
+#an int, a slice, a list/array of indices or a boolean mask, with None meaning every
+#instance. the values given can be single values or one per selected instance
+
+VERTEX_SHADER = """
+#version 120
+
+attribute vec2 vertex;
+attribute vec2 position;
+attribute vec2 scale;
+attribute float rotation;
+attribute vec4 color;
+
+varying vec4 fragmentColor;
+
+void main() {
+    float radians = radians(rotation);
+    vec2 scaled = vertex*scale;
+    vec2 rotated = vec2(cos(radians)*scaled.x - sin(radians)*scaled.y,
+                        sin(radians)*scaled.x + cos(radians)*scaled.y);
+    gl_Position = gl_ModelViewProjectionMatrix*vec4(rotated + position, 0.0, 1.0);
+    fragmentColor = color;
+}
+"""
+
+FRAGMENT_SHADER = """
+#version 120
+
+varying vec4 fragmentColor;
+
+void main() {
+    gl_FragColor = fragmentColor;
+}
+"""
+
+#made the first time an InstancedShape is drawn, as it needs a context, and made
+#again if it is drawn in a context that can't see the first one's objects
+program = None
+programSpace = None
+
+def instanceProgram():
+    global program, programSpace
+    #not gl.current_context, as the LazyModule keeps the value it had when first looked up
+    import pyglet.gl
+    space = pyglet.gl.current_context.object_space
+    if program == None or programSpace is not space:
+        #in a compatibility profile attribute 0 stands in for gl_Vertex, and has to
+        #be a per-vertex attribute for anything to be drawn, so the shape's vertices
+        #are bound there rather than left to the driver
+        program = ShaderProgram(VERTEX_SHADER, FRAGMENT_SHADER, attributes={"vertex": 0})
+        programSpace = space
+    return program
+
+class InstancedShape():
+    #template is any primitive (e.g. a Rectangle or Ellipse). its vertices, as they
+    #are drawn, are used as the shape of every instance, centred on the instance's
+    #position. count instances are made, all at the template's position with its color
+    def __init__(self, template, count, screenHeight):
+        self.__screenHeight = screenHeight
+        self.__count = count
+
+        centreX, centreY = template.getCentre()
+        self.__mesh = numpy.array(template.getVertices(), dtype=numpy.float32) - numpy.array((centreX, centreY), dtype=numpy.float32)
+        self.__indices = template.getTriangles()
+
+        #per instance attributes, in opengl coordinates
+        self.__positions = numpy.empty((count, 2), dtype=numpy.float32)
+        self.__positions[:] = (centreX, centreY)
+        self.__scales = numpy.ones((count, 2), dtype=numpy.float32)
+        self.__rotations = numpy.zeros(count, dtype=numpy.float32)
+        self.__colors = numpy.empty((count, 4), dtype=numpy.uint8)
+        self.__colors[:] = template.getColor()
+
+        #the gpu buffers are made on the first draw. dirty is the [start, stop) range of
+        #instances that have changed in each per instance attribute since the last draw
+        self.__buffers = None
+        self.__dirty = {}
+
+    def __len__(self):
+        return self.__count
+
+    #moves the selected instances so that their centres are at (x, y), with the
+    #y axis being lowest at the top like everywhere else
+    def setPositions(self, x, y, selection=None):
+        selection = self.__all(selection)
+        self.__positions[selection, 0] = x
+        self.__positions[selection, 1] = self.__screenHeight - numpy.asarray(y, dtype=numpy.float32)
+        self.__changed("position", selection)
+
+    def translateRelative(self, dx, dy, selection=None):
+        selection = self.__all(selection)
+        self.__positions[selection, 0] += dx
+        self.__positions[selection, 1] -= numpy.asarray(dy, dtype=numpy.float32)
+        self.__changed("position", selection)
+
+    #the scale is relative to the template, not to the instance's current scale
+    def setScales(self, xScaleFactor, yScaleFactor, selection=None):
+        if numpy.any(numpy.asarray(xScaleFactor) == 0) or numpy.any(numpy.asarray(yScaleFactor) == 0):
+            raise ScaleByZeroError("Why would you ever want to scale a primitive by zero?")
+        selection = self.__all(selection)
+        self.__scales[selection, 0] = xScaleFactor
+        self.__scales[selection, 1] = yScaleFactor
+        self.__changed("scale", selection)
+
+    #the rotation is relative to the template, not to the instance's current rotation
+    def setRotations(self, degrees, selection=None):
+        selection = self.__all(selection)
+        self.__rotations[selection] = degrees
+        self.__changed("rotation", selection)
+
+    #colors should be either a single [r,g,b,a] list or one per selected instance
+    def setColors(self, colors, selection=None):
+        colors = numpy.asarray(colors)
+        if colors.shape[-1:] != (4,):
+            raise ColorLengthError("The colors supplied to an instanced shape should have 4 values")
+        if numpy.any(colors < 0) or numpy.any(colors > 255):
+            raise ColorRangeError("The RGB values in the colors should be from 0-255")
+        selection = self.__all(selection)
+        self.__colors[selection] = colors
+        self.__changed("color", selection)
+
+    #the arrays are read only as changing them directly wouldn't update the gpu
+    def getPositions(self):
+        positions = self.__positions.copy()
+        positions[:, 1] = self.__screenHeight - positions[:, 1]
+        return positions
+
+    def getColors(self):
+        return self.__readOnly(self.__colors)
+
+    def getScales(self):
+        return self.__readOnly(self.__scales)
+
+    def getRotations(self):
+        return self.__readOnly(self.__rotations)
+
+    def draw(self):
+        if self.__count == 0:
+            return
+        if self.__buffers == None:
+            self.__makeBuffers()
+        elif self.__dirty:
+            self.__upload()
+
+        program = instanceProgram()
+        program.use()
+        enableBlending()
+
+        locations = []
+        for name, size, glType, normalized, divisor in (("vertex", 2, gl.GL_FLOAT, gl.GL_FALSE, 0),
+                                                        ("position", 2, gl.GL_FLOAT, gl.GL_FALSE, 1),
+                                                        ("scale", 2, gl.GL_FLOAT, gl.GL_FALSE, 1),
+                                                        ("rotation", 1, gl.GL_FLOAT, gl.GL_FALSE, 1),
+                                                        ("color", 4, gl.GL_UNSIGNED_BYTE, gl.GL_TRUE, 1)):
+            location = program.attributeLocation(name)
+            self.__buffers[name].bind()
+            gl.glEnableVertexAttribArray(location)
+            gl.glVertexAttribPointer(location, size, glType, normalized, 0, None)
+            gl.glVertexAttribDivisor(location, divisor)
+            locations += [location]
+
+        self.__buffers["indices"].bind()
+        gl.glDrawElementsInstanced(gl.GL_TRIANGLES, len(self.__indices), gl.GL_UNSIGNED_INT, None, self.__count)
+        self.__buffers["indices"].unbind()
+
+        #attribute state is shared with everything else that is drawn
+        for location in locations:
+            gl.glVertexAttribDivisor(location, 0)
+            gl.glDisableVertexAttribArray(location)
+        gl.glBindBuffer(gl.GL_ARRAY_BUFFER, 0)
+        gl.glDisable(gl.GL_BLEND)
+        program.stop()
+
+    #frees the gpu buffers. they are made again by the next draw (see Screen.releaseResources)
+    def release(self):
+        if self.__buffers != None:
+            for buffer in self.__buffers.values():
+                buffer.delete()
+            self.__buffers = None
+        self.__dirty = {}
+
+    def restore(self):
+        pass
+
+    def resourceSize(self):
+        if self.__buffers == None:
+            return 0
+        return sum(buffer.resourceSize() for buffer in self.__buffers.values())
+
+    def delete(self):
+        self.release()
+
+    def __makeBuffers(self):
+        self.__buffers = {"vertex": VertexBuffer(self.__mesh, usage=gl.GL_STATIC_DRAW),
+                          "indices": VertexBuffer(self.__indices, gl.GL_ELEMENT_ARRAY_BUFFER, gl.GL_STATIC_DRAW)}
+        for name, array in self.__instanceArrays().items():
+            self.__buffers[name] = VertexBuffer(array)
+        self.__dirty = {}
+
+    #sends the range of each array that has changed
+    def __upload(self):
+        arrays = self.__instanceArrays()
+        for name, (start, stop) in self.__dirty.items():
+            self.__buffers[name].update(arrays[name], start, stop)
+        self.__dirty = {}
+
+    def __instanceArrays(self):
+        return {"position": self.__positions,
+                "scale": self.__scales,
+                "rotation": self.__rotations,
+                "color": self.__colors}
+
+    def __changed(self, name, selection):
+        start, stop = self.__span(selection)
+        if start >= stop:
+            return
+        dirty = self.__dirty.get(name)
+        if dirty != None:
+            start = min(start, dirty[0])
+            stop = max(stop, dirty[1])
+        self.__dirty[name] = (start, stop)
+
+    #the smallest [start, stop) range of instances that covers the selection
+    def __span(self, selection):
+        if isinstance(selection, slice):
+            indices = range(*selection.indices(self.__count))
+            if len(indices) == 0:
+                return (0, 0)
+            #the first index is the highest if the step is negative
+            return (min(indices[0], indices[-1]), max(indices[0], indices[-1]) + 1)
+        if isinstance(selection, (int, numpy.integer)):
+            if not -self.__count <= selection < self.__count:
+                raise IndexError("(InstancedShape) index " + str(selection) + " is out of range for " + str(self.__count) + " instances")
+            index = int(selection) % self.__count
+            return (index, index + 1)
+
+        indices = numpy.arange(self.__count)[selection]
+        if len(indices) == 0:
+            return (0, 0)
+        return (int(indices.min()), int(indices.max()) + 1)
+
+    def __all(self, selection):
+        if selection is None:
+            return slice(None)
+        return selection
+
+    def __readOnly(self, array):
+        view = array.view()
+        view.flags.writeable = False
+        return view
@@ -0,0 +1,160 @@
+import pyglet
+
+from .batch import PrimitiveBatch
+from .primitives import Primitive
+from .framebuffer import Framebuffer
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#a CachedLayer draws content that hardly ever changes (backgrounds, grid lines,
+#borders, headings) into a texture the size of the window once, and from then on
+#draws just that texture, as one quad, however many things are in it.
+
+#the layer is drawn again the next time it is drawn after:
+#   - one of its primitives is transformed or recolored, or one of its labels is
+#     changed (it watches them, see Primitive.addObserver and Label.addObserver)
+#   - the window changes size (see Screen.resize)
+#   - CachedLayer.invalidate is called, for anything else added that can't be watched
+
+#everything is drawn into the texture with alpha blended separately (see
+#Primitive.draw), so the texture holds premultiplied colors and is drawn with
+#GL_ONE, GL_ONE_MINUS_SRC_ALPHA. translucent things in a layer look the same as
+#they would if they were drawn straight onto the window
+
+#add the layer to its screen with Screen.addResource so that it is resized with the
+#window and its texture can be freed while the screen isn't shown
+class CachedLayer():
+    #width and height should be the size of the window
+    def __init__(self, width, height):
+        self.__width = width
+        self.__height = height
+        self.__framebuffer = None #made the first time the layer is drawn
+        self.__batch = PrimitiveBatch() #the layer's primitives
+        self.__drawables = [] #everything else, drawn in the order added
+        self.__invalid = True
+        self.__renders = 0
+        #made with the framebuffer, so that a layer can be made without an opengl
+        #context (e.g. by Screen.prepare on a loader thread)
+        self.__quad = None
+
+    #primitives are drawn first (in a PrimitiveBatch, so the layer owns their batch
+    #while they're in it), then everything else in the order it was added. labels,
+    #and anything else with a draw method, can be added
+    def add(self, drawable):
+        if isinstance(drawable, Primitive):
+            self.__batch.add(drawable)
+        elif drawable not in self.__drawables:
+            self.__drawables += [drawable]
+        if hasattr(drawable, "addObserver"):
+            drawable.addObserver(self)
+        self.__invalid = True
+
+    def remove(self, drawable):
+        if drawable in self.__drawables:
+            self.__drawables.remove(drawable)
+        elif drawable in self.__batch:
+            self.__batch.remove(drawable)
+        else:
+            return
+        if hasattr(drawable, "removeObserver"):
+            drawable.removeObserver(self)
+        self.__invalid = True
+
+    def __contains__(self, drawable):
+        return drawable in self.__drawables or drawable in self.__batch
+
+    #makes the layer draw its contents again the next time it is drawn
+    def invalidate(self):
+        self.__invalid = True
+
+    def isInvalid(self):
+        return self.__invalid
+
+    #the number of times the contents have been drawn into the texture
+    def renders(self):
+        return self.__renders
+
+    #called by the layer's primitives and labels when they change
+    def primitiveChanged(self, primitive, change):
+        self.__invalid = True
+
+    def labelChanged(self, label):
+        self.__invalid = True
+
+    def draw(self):
+        if self.__invalid or self.__framebuffer == None:
+            self.__render()
+
+        gl.glEnable(gl.GL_TEXTURE_2D)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, self.__framebuffer.getTexture())
+        gl.glEnable(gl.GL_BLEND)
+        gl.glBlendFunc(gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
+        gl.glColor4f(1, 1, 1, 1)
+        self.__quad.draw(gl.GL_QUADS)
+        gl.glDisable(gl.GL_BLEND)
+        gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+        gl.glDisable(gl.GL_TEXTURE_2D)
+
+    #called with the window's new size (see Screen.resize)
+    def resize(self, width, height):
+        if (width, height) == (self.__width, self.__height):
+            return
+        self.__width = width
+        self.__height = height
+        if self.__quad != None:
+            self.__quad.vertices[:] = self.__quadVertices()
+        if self.__framebuffer != None:
+            self.__framebuffer.resize(width, height)
+        self.__invalid = True
+
+    #frees the texture and the primitives' vertex buffers (see Screen.releaseResources)
+    #they are made again the next time the layer is drawn
+    def release(self):
+        if self.__framebuffer != None:
+            self.__framebuffer.delete()
+            self.__framebuffer = None
+        self.__batch.release()
+
+    def restore(self):
+        self.__invalid = True
+
+    def resourceSize(self):
+        size = self.__batch.resourceSize()
+        if self.__framebuffer != None:
+            size += self.__framebuffer.resourceSize()
+        return size
+
+    def delete(self):
+        self.release()
+        if self.__quad != None:
+            self.__quad.delete()
+            self.__quad = None
+
+    def __render(self):
+        if self.__framebuffer == None:
+            self.__framebuffer = Framebuffer(self.__width, self.__height)
+        if self.__quad == None:
+            self.__quad = pyglet.graphics.vertex_list(4, ("v2f/static", self.__quadVertices()),
+                                                      ("t2f/static", (0, 0, 1, 0, 1, 1, 0, 1)))
+
+        #the app may be only repainting part of the window (see App's scissorDamage),
+        #but the whole of the texture needs drawing
+        scissor = gl.glIsEnabled(gl.GL_SCISSOR_TEST)
+        gl.glDisable(gl.GL_SCISSOR_TEST)
+
+        self.__framebuffer.bind()
+        gl.glClearColor(0, 0, 0, 0)
+        gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+        self.__batch.draw()
+        for drawable in self.__drawables:
+            drawable.draw()
+        self.__framebuffer.unbind()
+
+        if scissor:
+            gl.glEnable(gl.GL_SCISSOR_TEST)
+        self.__invalid = False
+        self.__renders += 1
+
+    def __quadVertices(self):
+        return (0, 0, self.__width, 0, self.__width, self.__height, 0, self.__height)
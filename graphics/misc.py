@@ -1,7 +1,14 @@
-from pyglet.gl import *
+from ..lazy import gl
 
 #author Ryan Bailey
 
 def clear(color): #color should be an [r,g,b,a] list where every value is 8-bit
-    glClearColor(color[0]/255, color[1]/255, color[2]/255, color[3]/255)
-    glClear(GL_COLOR_BUFFER_BIT)
+    gl.glClearColor(color[0]/255, color[1]/255, color[2]/255, color[3]/255)
+    gl.glClear(gl.GL_COLOR_BUFFER_BIT)
+
+#turns on the blending every shape and glyph is drawn with. alpha is blended
+#separately so that things drawn into a transparent framebuffer come out
+#premultiplied (see CachedLayer)
+def enableBlending():
+    gl.glEnable(gl.GL_BLEND)
+    gl.glBlendFuncSeparate(gl.GL_SRC_ALPHA, gl.GL_ONE_MINUS_SRC_ALPHA, gl.GL_ONE, gl.GL_ONE_MINUS_SRC_ALPHA)
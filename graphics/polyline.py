@@ -0,0 +1,243 @@
+import numpy
+
+from .buffers import VertexBuffer
+from .misc import enableBlending
+from ..errors import ColorLengthError, ColorRangeError
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#a Polyline is a line through a stream of points, for live charts. the points are
+#kept in a ring buffer of a fixed capacity: appending points past the capacity drops
+#the oldest ones, and only the points that were added (and their neighbours, whose
+#joins have changed) are worked out and sent to the gpu again.
+
+#every point is stored as two vertices, either side of the line and mitred with the
+#segments on both sides of it, so the whole line is drawn as one list of triangles
+#with one draw call. the index buffer holds the triangles of every segment twice
+#over (slot i joined to slot i + 1, going round the ring twice) so that the segments
+#from the oldest point to the newest are always a contiguous run of it, even once
+#the ring has wrapped round
+
+#if decimate is True, points are expected to arrive in order along the x axis and
+#only the first, lowest, highest and last point in each pixel column are kept, so
+#drawing a chart with more points than pixels costs the same as one with a few
+#points per pixel, and looks the same
+
+#mitres are cut off at MITRE_LIMIT times the line width, so sharp turns don't spike
+MITRE_LIMIT = 4
+
+class Polyline():
+    #color should be an [r,g,b,a] list where every value is 8-bit
+    #capacity is the most points that are kept
+    def __init__(self, color, lineWidth, capacity, screenHeight, decimate=False):
+        self.__validateColor(color)
+        self.__color = list(color)
+        self.__halfWidth = lineWidth/2
+        self.__capacity = capacity
+        self.__screenHeight = screenHeight
+        self.__decimate = decimate
+
+        self.__points = numpy.zeros((capacity, 2), dtype=numpy.float32) #opengl coordinates
+        self.__vertices = numpy.zeros((capacity, 2, 2), dtype=numpy.float32)
+        self.__start = 0 #the slot of the oldest point
+        self.__count = 0
+        self.__offset = (0.0, 0.0) #see Polyline.translateRelative
+
+        #the points kept for the pixel column the newest points are in, which may still
+        #change. they are the last len(self.__columnPoints) slots of the ring
+        self.__columnPoints = numpy.empty((0, 2), dtype=numpy.float32)
+
+        segments = numpy.arange(capacity*2, dtype=numpy.uint32)
+        left = (segments % capacity)*2
+        nextLeft = ((segments + 1) % capacity)*2
+        self.__indices = numpy.stack((left, left + 1, nextLeft, left + 1, nextLeft + 1, nextLeft), axis=1).ravel()
+
+        self.__vertexBuffer = None #made the first time the line is drawn
+        self.__indexBuffer = None
+        self.__dirty = [] #slots that have changed since the last draw
+
+    def __len__(self):
+        return self.__count
+
+    #xs and ys can be single values or sequences, in screen coordinates (the y axis
+    #lowest at the top)
+    def append(self, xs, ys):
+        points = numpy.empty((numpy.size(xs), 2), dtype=numpy.float32)
+        points[:, 0] = xs
+        points[:, 1] = self.__screenHeight - numpy.asarray(ys, dtype=numpy.float32)
+        if len(points) == 0:
+            return
+
+        if self.__decimate:
+            #the points of the last column are taken back out and decimated again
+            #along with the new ones, as the new ones may be in the same column
+            rewind = len(self.__columnPoints)
+            points = self.__decimated(numpy.concatenate((self.__columnPoints, points)))
+            self.__count -= min(rewind, self.__count)
+        self.__write(points)
+
+    #removes every point
+    def clear(self):
+        self.__start = 0
+        self.__count = 0
+        self.__columnPoints = numpy.empty((0, 2), dtype=numpy.float32)
+
+    #returns the points, oldest first, in opengl coordinates as a (count, 2) array
+    def getPoints(self):
+        slots = (self.__start + numpy.arange(self.__count)) % self.__capacity
+        return self.__points[slots]
+
+    #returns the indices of the triangles that are drawn (the segments from the oldest
+    #point to the newest), into the vertices, two per slot in the ring
+    def getTriangles(self):
+        return self.__indices[self.__start*6:(self.__start + max(self.__count - 1, 0))*6]
+
+    #moves the whole line when it is drawn without changing any points, e.g. to scroll
+    #a chart along as time passes
+    def translateRelative(self, dx, dy):
+        self.__offset = (self.__offset[0] + dx, self.__offset[1] - dy)
+
+    def changeColor(self, color):
+        self.__validateColor(color)
+        self.__color = list(color)
+
+    def getColor(self):
+        return self.__color
+
+    def draw(self):
+        if self.__count < 2:
+            return
+        if self.__vertexBuffer == None:
+            self.__vertexBuffer = VertexBuffer(self.__vertices.reshape(-1, 2))
+            self.__indexBuffer = VertexBuffer(self.__indices, gl.GL_ELEMENT_ARRAY_BUFFER, gl.GL_STATIC_DRAW)
+            self.__dirty = []
+        elif self.__dirty:
+            self.__upload()
+
+        enableBlending()
+        gl.glColor4f(self.__color[0]/255, self.__color[1]/255, self.__color[2]/255, self.__color[3]/255)
+        gl.glPushMatrix()
+        gl.glTranslatef(self.__offset[0], self.__offset[1], 0)
+
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        self.__vertexBuffer.bind()
+        gl.glVertexPointer(2, gl.GL_FLOAT, 0, None)
+        self.__indexBuffer.bind()
+        #the segments from the oldest point to the newest, 6 indices of 4 bytes each
+        gl.glDrawElements(gl.GL_TRIANGLES, (self.__count - 1)*6, gl.GL_UNSIGNED_INT, self.__start*6*4)
+        self.__indexBuffer.unbind()
+        self.__vertexBuffer.unbind()
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
+
+        gl.glPopMatrix()
+        gl.glDisable(gl.GL_BLEND)
+
+    #frees the gpu buffers. they are made again by the next draw (see Screen.releaseResources)
+    def release(self):
+        if self.__vertexBuffer != None:
+            self.__vertexBuffer.delete()
+            self.__indexBuffer.delete()
+            self.__vertexBuffer = None
+            self.__indexBuffer = None
+
+    def restore(self):
+        pass
+
+    def resourceSize(self):
+        if self.__vertexBuffer == None:
+            return 0
+        return self.__vertexBuffer.resourceSize() + self.__indexBuffer.resourceSize()
+
+    def delete(self):
+        self.release()
+
+    #puts points after the newest one, dropping the oldest if the ring is full
+    def __write(self, points):
+        capacity = self.__capacity
+        if len(points) > capacity:
+            points = points[-capacity:]
+        added = len(points)
+
+        #the newest point before these, whose join changes now it has a next point
+        first = max(self.__count - 1, 0)
+        head = (self.__start + self.__count) % capacity
+        self.__points[(head + numpy.arange(added)) % capacity] = points
+
+        dropped = max(0, self.__count + added - capacity)
+        self.__start = (self.__start + dropped) % capacity
+        self.__count = min(capacity, self.__count + added)
+        first = max(first - dropped, 0)
+
+        changed = list(range(first, self.__count))
+        if dropped:
+            #the new oldest point has lost the segment before it
+            changed = [0] + changed
+        self.__join(numpy.array(changed))
+
+    #works out the two vertices of the points at the given positions (0 being the
+    #oldest), mitring them with the segments either side
+    def __join(self, positions):
+        count = self.__count
+        capacity = self.__capacity
+        slots = (self.__start + positions) % capacity
+        points = self.__points[slots]
+        previous = self.__points[(self.__start + numpy.maximum(positions - 1, 0)) % capacity]
+        following = self.__points[(self.__start + numpy.minimum(positions + 1, count - 1)) % capacity]
+
+        before = self.__unit(points - previous)
+        after = self.__unit(following - points)
+        #the ends of the line only have one segment
+        before[positions == 0] = after[positions == 0]
+        after[positions == count - 1] = before[positions == count - 1]
+
+        tangent = self.__unit(before + after)
+        tangent[~tangent.any(axis=1)] = before[~tangent.any(axis=1)] #the line doubles back on itself
+        mitre = numpy.stack((-tangent[:, 1], tangent[:, 0]), axis=1)
+        normal = numpy.stack((-before[:, 1], before[:, 0]), axis=1)
+        cos = numpy.abs((mitre*normal).sum(axis=1))
+        length = self.__halfWidth/numpy.maximum(cos, 1/MITRE_LIMIT)
+
+        offsets = mitre*length[:, numpy.newaxis]
+        self.__vertices[slots, 0] = points + offsets
+        self.__vertices[slots, 1] = points - offsets
+        self.__dirty += [slots]
+
+    def __unit(self, vectors):
+        lengths = numpy.hypot(vectors[:, 0], vectors[:, 1])
+        lengths[lengths == 0] = 1
+        return vectors/lengths[:, numpy.newaxis]
+
+    #keeps the first, lowest, highest and last point of each pixel column (in the
+    #order they came in), and remembers the last column's points for next time
+    def __decimated(self, points):
+        columns = numpy.floor(points[:, 0]).astype(numpy.int64)
+        starts = numpy.flatnonzero(numpy.concatenate(([True], columns[1:] != columns[:-1])))
+        ends = numpy.append(starts[1:], len(points)) - 1
+        groups = numpy.repeat(numpy.arange(len(starts)), numpy.diff(numpy.append(starts, len(points))))
+
+        #sorting by column then y puts the lowest and highest of each column first and last
+        order = numpy.lexsort((points[:, 1], groups))
+        lowest = order[starts]
+        highest = order[ends]
+
+        keep = numpy.unique(numpy.concatenate((starts, lowest, highest, ends)))
+        lastColumn = keep[keep >= starts[-1]]
+        self.__columnPoints = points[lastColumn]
+        return points[keep]
+
+    def __upload(self):
+        slots = numpy.unique(numpy.concatenate(self.__dirty))
+        self.__dirty = []
+        vertices = self.__vertices.reshape(self.__capacity, 4)
+        #send each run of consecutive slots in one go
+        breaks = numpy.flatnonzero(numpy.diff(slots) != 1) + 1
+        for run in numpy.split(slots, breaks):
+            self.__vertexBuffer.update(vertices, int(run[0]), int(run[-1]) + 1)
+
+    def __validateColor(self, color):
+        if len(color) != 4:
+            raise ColorLengthError("The color supplied to the polyline should have 4 values")
+        for value in color:
+            if value < 0 or value > 255:
+                raise ColorRangeError("The RGB values in the color should be from 0-255")
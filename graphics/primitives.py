@@ -1,42 +1,59 @@
 import math
-from pyglet.gl import *
+import numpy
 
+from .triangulate import fan, triangulationCache
+from .misc import enableBlending
 from ..errors import ColorLengthError, ColorRangeError, LackOfVerticesError, ScaleByZeroError
+from ..lazy import gl
 
 #author Ryan Bailey
 
+#passed to observers (see Primitive.addObserver) to say what changed
+VERTICES_CHANGED = 1
+COLOR_CHANGED = 2
+SHAPE_CHANGED = 4 #the untransformed vertices were replaced, so there may be a different number of them
+
 class Primitive():
     #color should be an [r,g,b,a] list where every value is 8-bit
     #vertices should be a list of (x,y) tuples
     #rotation should be in degrees
-    def __init__(self, color, vertices, screenHeight, rotation=0):
+    #batch is an optional PrimitiveBatch that the primitive will be drawn by
+    #box is the (minX, minY, maxX, maxY) box around the vertices, for shapes that
+    #already know it (e.g. Rectangle), so that it doesn't have to be worked out
+    def __init__(self, color, vertices, screenHeight, rotation=0, batch=None, box=None):
         #some protection is better than no protection, right?
         self.__validateColor(color)
-        self.__color = color #note to self: alpha = 0 --> transparent, alpha = 255 --> opaque
+        self.__color = list(color) #note to self: alpha = 0 --> transparent, alpha = 255 --> opaque
 
         self.__screenHeight = screenHeight
+        self.__observers = []
 
-        #remove duplicates of vertices - thanks StackOverflow! beautiful solution!
-        used = set()
-        self.__vertices = [x for x in vertices if x not in used and (used.add(x) or True)]
-        #check there are enough vertices
-        if len(vertices) < 3:
-            raise LackOfVerticesError("The primitive has too few vertices")
-        self.__vertices = vertices
+        #the vertices given are never modified. instead every rotate, scale and
+        #translate is folded into a single 2d affine matrix, (a, b, c, d, e, f):
+
+        # (xWorld)    =    (a  b  c)    *    (xLocal)
+        # (yWorld)         (d  e  f)         (yLocal)
+        #                                    (  1   )
 
-        #convert tuples into lists so that the values can be modified
-        self.__color = list(self.__color)
-        for i in range(0, len(self.__vertices)):
-            self.__vertices[i] = list(self.__vertices[i])
+        #and the world space vertices are only worked out (all at once, with
+        #numpy) when something actually needs them
+        self.__setLocalVertices(vertices, box)
+        self.__matrix = (1.0, 0.0, 0.0, 0.0, 1.0, 0.0)
+
+        self.__vertices = None #world space vertices, None when out of date
+        self.__boundingBox = None
+        self.__bounds = None #see getBounds
 
         self.convertVertices()
 
         if rotation != 0:
             self.rotate(rotation)
 
+        if batch != None:
+            batch.add(self)
+
     def draw(self):
-        glEnable(GL_BLEND)
-        glBlendFunc(GL_SRC_ALPHA, GL_ONE_MINUS_SRC_ALPHA)
+        enableBlending()
 
         #note to self: (this seems like as good a place as any to put this)
 
@@ -52,129 +69,232 @@ class Primitive():
         #the only thing we need to remember with 2d space is that
         #transparent objects should be drawn after opaque objects.
 
-        glColor4f(self.__color[0]/255,
-                  self.__color[1]/255,
-                  self.__color[2]/255,
-                  self.__color[3]/255)
-        glBegin(GL_POLYGON)
-        for vertex in self.__vertices:
-            glVertex2f(vertex[0], vertex[1])
-        glEnd()
+        gl.glColor4f(self.__color[0]/255,
+                     self.__color[1]/255,
+                     self.__color[2]/255,
+                     self.__color[3]/255)
+
+        #hand opengl all of the vertices at once rather than one glVertex2f each,
+        #as triangles so that concave shapes are drawn right (see getTriangles)
+        vertices = self.getVertices()
+        triangles = self.getTriangles()
+        gl.glEnableClientState(gl.GL_VERTEX_ARRAY)
+        gl.glVertexPointer(2, gl.GL_FLOAT, 0, vertices.ctypes.data)
+        gl.glDrawElements(gl.GL_TRIANGLES, len(triangles), gl.GL_UNSIGNED_INT, triangles.ctypes.data)
+        gl.glDisableClientState(gl.GL_VERTEX_ARRAY)
 
     def rotate(self, degrees):
         radians = math.radians(degrees)
+        cos = math.cos(radians)
+        sin = math.sin(radians)
 
-        #time for some good old matrix multiplication
-
-        #essentially where T = theta in degrees
-        #and x and y are the coordinates of a vertex,
-        #I'm doing the following multiplication to all vertices:
-        #new vertex = rotation matrix * old vertex, so:
+        #the rotation matrix rotates the object about the origin:
 
         # (xNew)    =    (cosT  -sinT)    *    (x)
         # (yNew)         (sinT   cosT)         (y)
 
-        #note that the above depiction is of 3 matrices drawn over 2 lines
-
-        #the thing is however, the rotation matrix rotates the object about
-        #the origin, so what the above code would do is not rotate the object
-        #about its centre, but rather (0, 0), meaning the object is not only
-        #rotated, but also translated.
-
-        #to avoid this, before rotating the object, I centre it about the
-        #origin. then I rotate it, and then translate it back to it's
-        #original position.
-
-        #first figure out where the centre of the object is.
+        #so to rotate about the centre of the object it is moved so that it is
+        #centred about the origin, rotated, and then moved back. all three steps
+        #are applied to the transform matrix rather than to every vertex.
+        a, b, c, d, e, f = self.__matrix
         centreX, centreY = self.getCentre()
-
-        #translate the object so that it is centred about the origin
-        for i in range(0, len(self.__vertices)):
-            self.__vertices[i][0] -= centreX
-            self.__vertices[i][1] -= centreY
-
-        #rotate the object!
-        for i in range(0, len(self.__vertices)):
-            x, y = self.__vertices[i]
-            xNew = math.cos(radians)*x + -math.sin(radians)*y
-            yNew = math.sin(radians)*x + math.cos(radians)*y
-            self.__vertices[i] = [xNew, yNew]
-
-        #translate the newly rotated object back to its original position
-        for i in range(0, len(self.__vertices)):
-            self.__vertices[i][0] += centreX
-            self.__vertices[i][1] += centreY
+        self.__setMatrix(cos*a - sin*d,
+                         cos*b - sin*e,
+                         cos*(c - centreX) - sin*(f - centreY) + centreX,
+                         sin*a + cos*d,
+                         sin*b + cos*e,
+                         sin*(c - centreX) + cos*(f - centreY) + centreY)
 
     #translate the primitive relative to its current position
     def translateRelative(self, dx, dy):
-        for i in range(0, len(self.__vertices)):
-            self.__vertices[i][0] += dx
-            self.__vertices[i][1] -= dy
+        a, b, c, d, e, f = self.__matrix
+        self.__setMatrix(a, b, c + dx, d, e, f - dy)
 
     #translate the centre point of the primitive to the specified coordinates
     def translateCenterTo(self, x, y):
         contertedY = self.__screenHeight - y
         centreX, centreY = self.getCentre()
-        dx = x - centreX
-        dy = contertedY - centreY
-        for i in range(0, len(self.__vertices)):
-            self.__vertices[i][0] += dx
-            self.__vertices[i][1] += dy
+        a, b, c, d, e, f = self.__matrix
+        self.__setMatrix(a, b, c + x - centreX, d, e, f + contertedY - centreY)
 
     #scales about the centre point
     def scale(self, xScaleFactor, yScaleFactor):
         if xScaleFactor == 0 or yScaleFactor == 0:
             raise ScaleByZeroError("Why would you ever want to scale a primitive by zero?")
 
-        #first figure out where the centre of the object is.
+        #same idea as rotate: centre about the origin, scale, move back
+        a, b, c, d, e, f = self.__matrix
         centreX, centreY = self.getCentre()
-
-        #translate the object so that it is centred about the origin
-        for i in range(0, len(self.__vertices)):
-            self.__vertices[i][0] -= centreX
-            self.__vertices[i][1] -= centreY
-
-        #scale the object!
-        for i in range(0, len(self.__vertices)):
-            self.__vertices[i][0] *= xScaleFactor
-            self.__vertices[i][1] *= yScaleFactor
-
-        #translate the newly scaled object back to its original position
-        for i in range(0, len(self.__vertices)):
-            self.vertices[i][0] += centreX
-            self.vertices[i][1] += centreY
+        self.__setMatrix(xScaleFactor*a,
+                         xScaleFactor*b,
+                         xScaleFactor*(c - centreX) + centreX,
+                         yScaleFactor*d,
+                         yScaleFactor*e,
+                         yScaleFactor*(f - centreY) + centreY)
 
     #color should be an (r,g,b,a) tuple where every value is 8-bit
     def changeColor(self, color):
         self.__validateColor(color)
-        self.__color == color
+        self.__color = list(color)
+        self.__notify(COLOR_CHANGED)
+
+    #returns the vertices in opengl coordinates as an (n, 2) numpy array
+    #the array is cached until the primitive is next transformed, so it is read only
+    def getVertices(self):
+        if self.__vertices is None:
+            a, b, c, d, e, f = self.__matrix
+            vertices = self.getLocalVertices() @ numpy.array(((a, d), (b, e)))
+            vertices += (c, f)
+            self.__vertices = vertices.astype(numpy.float32)
+            self.__vertices.flags.writeable = False
+        return self.__vertices
+
+    #returns the outline split into triangles, as a read only array of indices into
+    #the vertices (three per triangle). it only depends on the untransformed vertices,
+    #so it is worked out once, and shared by every primitive with the same shape
+    #(see triangulate.py)
+    def getTriangles(self):
+        if self.__triangles is None:
+            if self.alwaysConvex():
+                self.__triangles = fan(len(self.__givenVertices))
+            else:
+                self.__triangles = triangulationCache.get(self.getLocalVertices())
+        return self.__triangles
+
+    #returns True if the outline is convex whatever its vertices are, so it can be split
+    #into a fan of triangles without being checked. the shapes below override this
+    def alwaysConvex(self):
+        return False
+
+    #returns the vertices the primitive was created with, before any transforms
+    def getLocalVertices(self):
+        if self.__localVertices is None:
+            self.__localVertices = numpy.asarray(self.__givenVertices, dtype=numpy.float64)
+        return self.__localVertices
+
+    #replaces the untransformed vertices, keeping the transform
+    #(e.g. Ellipse uses this to change how many vertices it has as it is scaled)
+    def setLocalVertices(self, vertices):
+        self.__setLocalVertices(vertices)
+        self.__vertices = None
+        self.__boundingBox = None
+        self.__bounds = None
+        self.__notify(SHAPE_CHANGED)
+
+    def __setLocalVertices(self, vertices, box=None):
+        if len(vertices) < 3:
+            raise LackOfVerticesError("The primitive has too few vertices")
+        self.__givenVertices = vertices
+        self.__localVertices = None #the vertices as a numpy array, made when first needed
+        self.__triangles = None #see getTriangles
+        if box == None:
+            #numpy arrays of floats are used as they are rather than copied
+            self.__localVertices = numpy.asarray(vertices, dtype=numpy.float64)
+            minX, minY = self.__localVertices.min(axis=0)
+            maxX, maxY = self.__localVertices.max(axis=0)
+            box = (float(minX), float(minY), float(maxX), float(maxY))
+        minX, minY, maxX, maxY = box
+        self.__localBox = box
+        self.__localCentre = (float(minX + maxX)/2, float(minY + maxY)/2)
+
+    #returns the transform as an (a, b, c, d, e, f) tuple (see __init__)
+    def getMatrix(self):
+        return self.__matrix
+
+    #returns the color as an [r,g,b,a] list
+    def getColor(self):
+        return self.__color
+
+    #transparent primitives have to be drawn after opaque ones
+    def isTransparent(self):
+        return self.__color[3] < 255
+
+    #an observer is told whenever the primitive is transformed or recolored by
+    #having its primitiveChanged(primitive, change) method called, where change
+    #is VERTICES_CHANGED, COLOR_CHANGED or SHAPE_CHANGED. PrimitiveBatch uses this to keep its
+    #vertex buffers up to date
+    def addObserver(self, observer):
+        if observer not in self.__observers:
+            self.__observers += [observer]
+
+    def removeObserver(self, observer):
+        if observer in self.__observers:
+            self.__observers.remove(observer)
+
+    def __notify(self, change):
+        for observer in self.__observers:
+            observer.primitiveChanged(self, change)
+
+    def __setMatrix(self, a, b, c, d, e, f):
+        self.__matrix = (a, b, c, d, e, f)
+        self.__vertices = None
+        self.__boundingBox = None
+        self.__bounds = None
+        self.__notify(VERTICES_CHANGED)
 
     #figure out where the centre of the object is
     #returns the centre coordinate as an (x, y) tuple
+
+    #the centre is the centre of the box around the untransformed vertices,
+    #carried along by the transform. that way it doesn't need the vertices to
+    #be worked out, and rotating an odd shape several times doesn't make it
+    #drift as the box around it changes
     def getCentre(self):
-        minX, minY = self.__vertices[0]
-        maxX, maxY = self.__vertices[0]
-        for vertex in self.__vertices:
-            if vertex[0] < minX:
-                minX = vertex[0]
-            elif vertex[0] > maxX:
-                maxX = vertex[0]
-            if vertex[1] < minY:
-                minY = vertex[1]
-            elif vertex[1] > maxY:
-                maxY = vertex[1]
-        centreX = (minX + maxX)/2
-        centreY = (minY + maxY)/2
-        return (centreX, centreY)
+        a, b, c, d, e, f = self.__matrix
+        x, y = self.__localCentre
+        return (a*x + b*y + c, d*x + e*y + f)
+
+    #returns the box around the vertices (in opengl coordinates)
+    #as a (minX, minY, maxX, maxY) tuple
+    def getBoundingBox(self):
+        if self.__boundingBox is None:
+            vertices = self.getVertices()
+            minX, minY = vertices.min(axis=0)
+            maxX, maxY = vertices.max(axis=0)
+            self.__boundingBox = (float(minX), float(minY), float(maxX), float(maxY))
+        return self.__boundingBox
+
+    #returns a (minX, minY, maxX, maxY) box (in opengl coordinates) that the primitive
+    #is inside, for culling (see Culler). it is the bounding box if the vertices have
+    #already been worked out, otherwise the box around the transformed corners of the
+    #box around the untransformed vertices, which only takes a few multiplications
+    #(but can be a bit bigger than the bounding box if the primitive is rotated)
+    def getBounds(self):
+        if self.__boundingBox is not None:
+            return self.__boundingBox
+        if self.__bounds is None:
+            a, b, c, d, e, f = self.__matrix
+            minX, minY, maxX, maxY = self.__localBox
+            self.__bounds = (c + min(a*minX, a*maxX) + min(b*minY, b*maxY),
+                             f + min(d*minX, d*maxX) + min(e*minY, e*maxY),
+                             c + max(a*minX, a*maxX) + max(b*minY, b*maxY),
+                             f + max(d*minX, d*maxX) + max(e*minY, e*maxY))
+        return self.__bounds
+
+    #returns True if the point (in opengl coordinates) is inside the primitive
+    def containsPoint(self, x, y):
+        minX, minY, maxX, maxY = self.getBoundingBox()
+        if x < minX or x > maxX or y < minY or y > maxY:
+            return False
+
+        #count how many edges a ray going right from the point crosses
+        vertices = self.getVertices()
+        x1 = vertices[:, 0]
+        y1 = vertices[:, 1]
+        x2 = numpy.roll(x1, -1)
+        y2 = numpy.roll(y1, -1)
+        straddles = (y1 > y) != (y2 > y)
+        with numpy.errstate(divide="ignore", invalid="ignore"):
+            crossingX = x1 + (y - y1)*(x2 - x1)/(y2 - y1)
+        return bool(numpy.count_nonzero(straddles & (x < crossingX)) % 2)
 
     #opengl has the y axis being lowest at the bottom and highest at the top
     #the vertices given presume that the y axis is lowest at the top and highest
     #at the bottom.
     #this function converts these vertices for opengl so they'll display correctly
     def convertVertices(self):
-        for i in range(0, len(self.__vertices)):
-            y = self.__vertices[i][1]
-            self.__vertices[i][1] = self.__screenHeight - y
+        a, b, c, d, e, f = self.__matrix
+        self.__setMatrix(a, b, c, -d, -e, self.__screenHeight - f)
 
     def __validateColor(self, color):
         if len(color) != 4:
@@ -184,7 +304,7 @@ class Primitive():
                 raise ColorRangeError("The RGB values in the color should be from 0-255")
 
 class Line(Primitive):
-    def __init__(self, color, x1, y1, x2, y2, lineWidth, screenHeight):
+    def __init__(self, color, x1, y1, x2, y2, lineWidth, screenHeight, batch=None):
         dx = x2 - x1
         dy = y2 - y1
         length = math.hypot(dx, dy)
@@ -199,33 +319,97 @@ class Line(Primitive):
                     (leftX, bottomY),
                     (rightX, bottomY),
                     (rightX, topY)]
-        rotation = math.atan(dy/dx)#?
-        super().__init__(color, vertices, screenHeight, rotation)
+        #the quad starts off horizontal, and is turned to point from (x1, y1) to (x2, y2)
+        #(the y axis is flipped for opengl, and rotate turns anticlockwise on screen)
+        rotation = math.degrees(math.atan2(-dy, dx))
+        super().__init__(color, vertices, screenHeight, rotation, batch)
+
+    def alwaysConvex(self):
+        return True
 
 class Triangle(Primitive):
-    def __init__(self, color, x1, y1, x2, y2, x3, y3, screenHeight):
+    def __init__(self, color, x1, y1, x2, y2, x3, y3, screenHeight, batch=None):
         vertices = [(x1, y1), (x2, y2), (x3, y3)]
-        super().__init__(color, vertices, screenHeight)
+        super().__init__(color, vertices, screenHeight, batch=batch)
+
+    def alwaysConvex(self):
+        return True
 
 class Rectangle(Primitive):
-    def __init__(self, color, x, y, width, height, screenHeight, rotation=0):
+    def __init__(self, color, x, y, width, height, screenHeight, rotation=0, batch=None):
 
         vertices = [(x, y),
                     (x + width, y),
                     (x + width, y + height),
                     (x, y + height)]
-        super().__init__(color, vertices, screenHeight, rotation)
+        #the box around a rectangle is known, so Primitive doesn't have to search for it
+        box = (min(x, x + width), min(y, y + height), max(x, x + width), max(y, y + height))
+        super().__init__(color, vertices, screenHeight, rotation, batch, box)
+
+    def alwaysConvex(self):
+        return True
+
+#the vertices of a circle of radius 1 centred on (0, 0), by number of vertices
+#these are worked out once and then scaled and translated for every Ellipse
+unitCircles = {}
+
+def unitCircle(vertexCount):
+    if vertexCount not in unitCircles:
+        angles = numpy.arange(vertexCount)*2*math.pi/vertexCount
+        circle = numpy.stack((numpy.cos(angles), numpy.sin(angles)), axis=1)
+        circle.flags.writeable = False
+        unitCircles[vertexCount] = circle
+    return unitCircles[vertexCount]
+
+#how many vertices an ellipse needs so that its edges are never more than
+#ELLIPSE_TOLERANCE pixels from the real curve
+ELLIPSE_TOLERANCE = 0.5
+ELLIPSE_MIN_VERTICES = 8
+ELLIPSE_MAX_VERTICES = 256
+
+#the vertex count is rounded up to a multiple of 4 so that ellipses of similar sizes
+#share unit circles, and don't have to be re-tessellated on every small scale
+def verticesForRadius(radius):
+    if radius <= ELLIPSE_TOLERANCE*2:
+        return ELLIPSE_MIN_VERTICES
+    vertexCount = math.ceil(math.pi/math.acos(1 - ELLIPSE_TOLERANCE/radius))
+    vertexCount = 4*math.ceil(vertexCount/4)
+    return min(max(vertexCount, ELLIPSE_MIN_VERTICES), ELLIPSE_MAX_VERTICES)
 
 class Ellipse(Primitive):
-    def __init__(self, color, x, y, width, height, screenHeight, rotation=0):
+    #vertexCount is how many vertices are used to draw the ellipse. if it isn't given
+    #it depends on how big the ellipse is on screen, so small ellipses are cheap and
+    #large ones are smooth, and it is updated whenever the ellipse is scaled
+    def __init__(self, color, x, y, width, height, screenHeight, rotation=0, batch=None, vertexCount=None):
         #(x, y) is the coordinate of the top left corner of the rectangle
         #that fits around the ellipse
-        vertexCount = 30
-        centreX = x + width/2
-        centreY = y + height/2
-        vertices = []
-        for i in range(0, vertexCount):
-            x = centreX + (width/2)*math.cos(i*2*math.pi/vertexCount)
-            y = centreY + (height/2)*math.sin(i*2*math.pi/vertexCount)
-            vertices += [(x, y)]
-        super().__init__(color, vertices, screenHeight, rotation)
+        self.__centre = (x + width/2, y + height/2)
+        self.__radii = (width/2, height/2)
+        self.__adaptive = vertexCount == None
+        if self.__adaptive:
+            vertexCount = verticesForRadius(max(abs(width), abs(height))/2)
+        self.__vertexCount = vertexCount
+
+        super().__init__(color, self.__tessellate(vertexCount), screenHeight, rotation, batch)
+
+    def scale(self, xScaleFactor, yScaleFactor):
+        super().scale(xScaleFactor, yScaleFactor)
+        if not self.__adaptive:
+            return
+
+        #how much the transform stretches things, at most
+        a, b, c, d, e, f = self.getMatrix()
+        stretch = max(math.hypot(a, d), math.hypot(b, e))
+        vertexCount = verticesForRadius(max(abs(self.__radii[0]), abs(self.__radii[1]))*stretch)
+        if vertexCount != self.__vertexCount:
+            self.__vertexCount = vertexCount
+            self.setLocalVertices(self.__tessellate(vertexCount))
+
+    def getVertexCount(self):
+        return self.__vertexCount
+
+    def alwaysConvex(self):
+        return True
+
+    def __tessellate(self, vertexCount):
+        return unitCircle(vertexCount)*self.__radii + self.__centre
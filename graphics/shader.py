@@ -0,0 +1,83 @@
+import ctypes
+
+from ..errors import ShaderCompileError
+from ..lazy import gl
+
+#author Ryan Bailey
+
+#a glsl program made from a vertex and a fragment shader. the shaders are
+#compiled and linked straight away, and ShaderCompileError is raised with
+#opengl's log if either fails
+class ShaderProgram():
+    #attributes is an optional dict of attribute name --> location, for attributes
+    #that have to be at a particular location. they are bound before the program is
+    #linked, and opengl places any others
+    def __init__(self, vertexSource, fragmentSource, attributes=None):
+        self.__program = gl.glCreateProgram()
+        shaders = [self.__compile(gl.GL_VERTEX_SHADER, vertexSource),
+                   self.__compile(gl.GL_FRAGMENT_SHADER, fragmentSource)]
+        for shader in shaders:
+            gl.glAttachShader(self.__program, shader)
+        if attributes != None:
+            for name, location in attributes.items():
+                gl.glBindAttribLocation(self.__program, location, name.encode())
+        gl.glLinkProgram(self.__program)
+        for shader in shaders:
+            gl.glDetachShader(self.__program, shader)
+            gl.glDeleteShader(shader)
+
+        linked = gl.GLint()
+        gl.glGetProgramiv(self.__program, gl.GL_LINK_STATUS, ctypes.byref(linked))
+        if not linked.value:
+            log = self.__log(gl.glGetProgramiv, gl.glGetProgramInfoLog, self.__program)
+            gl.glDeleteProgram(self.__program)
+            raise ShaderCompileError("(ShaderProgram) The shader program failed to link:\n" + log)
+
+        self.__attributes = {} #name --> location
+        self.__uniforms = {}
+
+    def use(self):
+        gl.glUseProgram(self.__program)
+
+    def stop(self):
+        gl.glUseProgram(0)
+
+    #returns the location of an attribute, or -1 if the program doesn't use it
+    def attributeLocation(self, name):
+        location = self.__attributes.get(name)
+        if location == None:
+            location = self.__attributes[name] = gl.glGetAttribLocation(self.__program, name.encode())
+        return location
+
+    def uniformLocation(self, name):
+        location = self.__uniforms.get(name)
+        if location == None:
+            location = self.__uniforms[name] = gl.glGetUniformLocation(self.__program, name.encode())
+        return location
+
+    def delete(self):
+        gl.glDeleteProgram(self.__program)
+
+    def __compile(self, shaderType, source):
+        shader = gl.glCreateShader(shaderType)
+        source = source.encode()
+        sources = (ctypes.c_char_p*1)(source)
+        lengths = (gl.GLint*1)(len(source))
+        gl.glShaderSource(shader, 1, ctypes.cast(sources, ctypes.POINTER(ctypes.POINTER(gl.GLchar))), lengths)
+        gl.glCompileShader(shader)
+
+        compiled = gl.GLint()
+        gl.glGetShaderiv(shader, gl.GL_COMPILE_STATUS, ctypes.byref(compiled))
+        if not compiled.value:
+            log = self.__log(gl.glGetShaderiv, gl.glGetShaderInfoLog, shader)
+            gl.glDeleteShader(shader)
+            kind = "vertex" if shaderType == gl.GL_VERTEX_SHADER else "fragment"
+            raise ShaderCompileError("(ShaderProgram) The " + kind + " shader failed to compile:\n" + log)
+        return shader
+
+    def __log(self, getParameter, getLog, handle):
+        length = gl.GLint()
+        getParameter(handle, gl.GL_INFO_LOG_LENGTH, ctypes.byref(length))
+        log = ctypes.create_string_buffer(max(1, length.value))
+        getLog(handle, length.value, None, log)
+        return log.value.decode(errors="replace")
@@ -1,27 +1,378 @@
+import ctypes
+import numpy
 import pyglet
-import os.path
+from collections import OrderedDict
+
+from .misc import enableBlending
+from ..lazy import gl
 
 #author Ryan Bailey
 
-class Label(pyglet.text.Label):
-    def __init__(self, text, color, size, x, y, width, height, screenHeight, anchor_x="left", anchor_y="top"):
+#labels draw their text as one textured quad per glyph. the quads are laid out
+#once for each (text, font, size, width) and kept in an LRU cache (see
+#LayoutCache), so a table full of cells showing the same few strings only lays
+#each string out once. the quads of every label given the same batch (a
+#pyglet.graphics.Batch) are drawn together, in one draw call for each texture
+#the glyphs are stored in - usually just one.
+
+#glyphs are drawn with blending so that their edges are smooth.
+#the class is made the first time it is needed, as pyglet.graphics loads opengl
+glyphGroupClass = None
+
+def glyphGroup(texture):
+    global glyphGroupClass
+    if glyphGroupClass == None:
+        class GlyphGroup(pyglet.graphics.TextureGroup):
+            def set_state(self):
+                enableBlending()
+                super().set_state()
+
+            def unset_state(self):
+                super().unset_state()
+                gl.glDisable(gl.GL_BLEND)
+        glyphGroupClass = GlyphGroup
+    return glyphGroupClass(texture)
+
+#fonts loaded so far, by (fontName, size)
+fonts = {}
+
+def loadFont(fontName, size):
+    key = (fontName, size)
+    if key not in fonts:
+        fonts[key] = pyglet.font.load(fontName, size)
+    return fonts[key]
+
+#text that has been laid out: the quads of its glyphs relative to the top left
+#corner of the text, split up by the texture the glyphs are stored in
+class TextLayout():
+    def __init__(self, text, font, width):
+        self.ascent = font.ascent
+        self.lineHeight = font.ascent - font.descent
+
+        glyphs = [] #(glyph, x, y) for every glyph
+        self.width = 0
+        lines = self.__wrap(text, font, width)
+        for lineNumber, line in enumerate(lines):
+            x = 0
+            y = -self.ascent - lineNumber*self.lineHeight
+            for glyph in font.get_glyphs(line):
+                glyphs += [(glyph, x, y)]
+                x += glyph.advance
+            self.width = max(self.width, x)
+        self.height = len(lines)*self.lineHeight
+
+        self.quads = {} #texture --> (vertices, texture coordinates)
+        for texture in {glyph.owner for glyph, x, y in glyphs}:
+            textureGlyphs = [(glyph, x, y) for glyph, x, y in glyphs if glyph.owner is texture]
+            vertices = numpy.empty((len(textureGlyphs), 4, 2), dtype=numpy.float32)
+            texCoords = numpy.empty((len(textureGlyphs), 12), dtype=numpy.float32)
+            for i, (glyph, x, y) in enumerate(textureGlyphs):
+                left, bottom, right, top = glyph.vertices
+                vertices[i] = ((x + left, y + bottom),
+                               (x + right, y + bottom),
+                               (x + right, y + top),
+                               (x + left, y + top))
+                texCoords[i] = glyph.tex_coords
+            vertices.flags.writeable = False
+            texCoords.flags.writeable = False
+            self.quads[texture] = (vertices.reshape(-1, 2), texCoords.reshape(-1, 3))
+
+    #splits the text into lines, wrapping on spaces if a width is given
+    def __wrap(self, text, font, width):
+        if width == None:
+            return text.split("\n")
+
+        lines = []
+        spaceWidth = sum(glyph.advance for glyph in font.get_glyphs(" "))
+        for paragraph in text.split("\n"):
+            line = ""
+            lineWidth = 0
+            for word in paragraph.split(" "):
+                wordWidth = sum(glyph.advance for glyph in font.get_glyphs(word))
+                if line and lineWidth + spaceWidth + wordWidth > width:
+                    lines += [line]
+                    line = word
+                    lineWidth = wordWidth
+                elif line:
+                    line += " " + word
+                    lineWidth += spaceWidth + wordWidth
+                else:
+                    line = word
+                    lineWidth = wordWidth
+            lines += [line]
+        return lines
+
+class LayoutCache():
+    def __init__(self, maxSize=4096):
+        self.__maxSize = maxSize
+        self.__layouts = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    #width is None if the text shouldn't be wrapped
+    def get(self, text, fontName, size, width):
+        key = (text, fontName, size, width)
+        layout = self.__layouts.get(key)
+        if layout != None:
+            self.__layouts.move_to_end(key)
+            self.__hits += 1
+            return layout
+
+        self.__misses += 1
+        layout = TextLayout(text, loadFont(fontName, size), width)
+        self.__layouts[key] = layout
+        if len(self.__layouts) > self.__maxSize:
+            self.__layouts.popitem(last=False)
+        return layout
+
+    def clear(self):
+        self.__layouts.clear()
+
+    def __len__(self):
+        return len(self.__layouts)
+
+    #returns (hits, misses) since the cache was made
+    def stats(self):
+        return (self.__hits, self.__misses)
+
+layoutCache = LayoutCache()
+
+class Label():
+    #color should be an [r,g,b,a] list where every value is 8-bit
+    #size is the font size in points
+    #batch is a pyglet.graphics.Batch shared by the labels on a screen. if it is
+    #given the labels are drawn by drawing the batch, otherwise by Label.draw
+    #if multiline is True the text is wrapped to fit in width
+    def __init__(self, text, color, size, x, y, width, height, screenHeight, anchor_x="left", anchor_y="top",
+                 batch=None, fontName="Courier", multiline=False):
+        self.__text = text
+        self.__color = list(color)
+        self.__size = size
+        self.__x = x
+        self.__y = y
+        self.__width = width
+        self.__height = height
+        self.__screenHeight = screenHeight
+        self.__anchorX = anchor_x
+        self.__anchorY = anchor_y
+        self.__fontName = fontName
+        self.__multiline = multiline
+
+        self.__ownBatch = batch == None
+        if self.__ownBatch:
+            batch = pyglet.graphics.Batch()
+        self.__batch = batch
+
+        self.__vertexLists = {} #texture --> vertex list
+        self.__layout = None
+        self.__released = False
+        self.__observers = []
+        self.__relayout()
+
+    def draw(self):
+        if self.__released:
+            self.restore()
+        if self.__ownBatch:
+            self.__batch.draw()
+            return
+
+        for texture, vertexList in self.__vertexLists.items():
+            group = glyphGroup(texture)
+            group.set_state()
+            vertexList.draw(gl.GL_QUADS)
+            group.unset_state()
+
+    #frees the label's space in its batch
+    def delete(self):
+        for vertexList in self.__vertexLists.values():
+            vertexList.delete()
+        self.__vertexLists = {}
+
+    #frees the label's vertices while keeping its text, so that a screen that isn't
+    #being shown doesn't use any (see Screen.releaseResources). they are made again
+    #by restore, or by the next Label.draw (a label drawn by drawing a shared batch
+    #has to be restored)
+    def release(self):
+        self.delete()
+        self.__released = True
+
+    def restore(self):
+        if self.__released:
+            self.__released = False
+            self.__relayout()
+
+    #roughly how many bytes of memory the label's vertices use: 8 bytes of vertex,
+    #12 of texture coordinates and 4 of color for every vertex
+    def resourceSize(self):
+        return sum(vertexList.get_size() for vertexList in self.__vertexLists.values())*24
+
+    def getText(self):
+        return self.__text
+
+    #the text is changed in place: the label's existing vertices are reused if
+    #there is room for the new text in them
+    def setText(self, text):
+        if text != self.__text:
+            self.__text = text
+            self.__relayout()
+            self.__notify()
+
+    def getColor(self):
+        return self.__color
+
+    def setColor(self, color):
+        self.__color = list(color)
+        self.__writeColors()
+        self.__notify()
+
+    #returns (x, y) with the y axis lowest at the top, like the constructor
+    def getPosition(self):
+        return (self.__x, self.__y)
+
+    #(x, y) presumes the y axis is lowest at the top, like the constructor
+    def setPosition(self, x, y):
+        self.__x = x
+        self.__y = y
+        self.__writeVertices()
+        self.__notify()
+
+    def getFontSize(self):
+        return self.__size
+
+    def setFontSize(self, size):
+        if size != self.__size:
+            self.__size = size
+            self.__relayout()
+            self.__notify()
+
+    def getFontName(self):
+        return self.__fontName
+
+    def setFontName(self, fontName):
+        if fontName != self.__fontName:
+            self.__fontName = fontName
+            self.__relayout()
+            self.__notify()
+
+    #returns the (width, height) of the box the text is anchored in
+    def getSize(self):
+        return (self.__width, self.__height)
+
+    def setSize(self, width, height):
+        self.__width = width
+        self.__height = height
+        self.__relayout()
+        self.__notify()
+
+    def setAnchor(self, anchorX, anchorY):
+        self.__anchorX = anchorX
+        self.__anchorY = anchorY
+        self.__writeVertices()
+        self.__notify()
+
+    #Label used to be a pyglet.text.Label, so the pyglet attributes it supports are
+    #kept as properties. like pyglet's, x and y are in opengl coordinates (the y axis
+    #lowest at the bottom) and color is an (r,g,b,a) tuple. pyglet's other
+    #attributes (document, bold, italic, dpi etc) aren't supported
+    text = property(getText, setText)
+    x = property(lambda self: self.__x,
+                 lambda self, x: self.setPosition(x, self.__y))
+    y = property(lambda self: self.__screenHeight - self.__y,
+                 lambda self, y: self.setPosition(self.__x, self.__screenHeight - y))
+    position = property(lambda self: (self.x, self.y),
+                        lambda self, position: self.setPosition(position[0], self.__screenHeight - position[1]))
+    color = property(lambda self: tuple(self.__color), setColor)
+    font_size = property(getFontSize, setFontSize)
+    font_name = property(getFontName, setFontName)
+    width = property(lambda self: self.__width,
+                     lambda self, width: self.setSize(width, self.__height))
+    height = property(lambda self: self.__height,
+                      lambda self, height: self.setSize(self.__width, height))
+    anchor_x = property(lambda self: self.__anchorX,
+                        lambda self, anchorX: self.setAnchor(anchorX, self.__anchorY))
+    anchor_y = property(lambda self: self.__anchorY,
+                        lambda self, anchorY: self.setAnchor(self.__anchorX, anchorY))
+    content_width = property(lambda self: self.__layout.width)
+    content_height = property(lambda self: self.__layout.height)
+
+    #sizes the text so that its lines are heightInPixels tall
+    def setPixelHeight(self, heightInPixels):
+        self.setFontSize(pixelsToPoints(heightInPixels, self.__fontName))
+
+    #an observer is told whenever the label's text, color, position or size changes
+    #by having its labelChanged(label) method called (see CachedLayer)
+    def addObserver(self, observer):
+        if observer not in self.__observers:
+            self.__observers += [observer]
+
+    def removeObserver(self, observer):
+        if observer in self.__observers:
+            self.__observers.remove(observer)
+
+    def __notify(self):
+        for observer in self.__observers:
+            observer.labelChanged(self)
+
+    #returns the (width, height) of the text itself in pixels
+    def contentSize(self):
+        return (self.__layout.width, self.__layout.height)
+
+    def __relayout(self):
+        width = None
+        if self.__multiline:
+            width = self.__width
+        self.__layout = layoutCache.get(self.__text, self.__fontName, self.__size, width)
+        if self.__released:
+            return
+
+        for texture, (vertices, texCoords) in self.__layout.quads.items():
+            vertexList = self.__vertexLists.get(texture)
+            if vertexList == None:
+                vertexList = self.__batch.add(len(vertices), gl.GL_QUADS, glyphGroup(texture),
+                                              "v2f/dynamic", "t3f/dynamic", "c4B/dynamic")
+                self.__vertexLists[texture] = vertexList
+            elif vertexList.get_size() < len(vertices):
+                vertexList.resize(len(vertices))
+            #otherwise there's room already, and any quads left over are
+            #squashed to nothing by __writeVertices
+
+            ctypes.memmove(vertexList.tex_coords, texCoords.ctypes.data, texCoords.nbytes)
+
+        self.__writeColors()
+        self.__writeVertices()
+
+    def __writeColors(self):
+        for vertexList in self.__vertexLists.values():
+            colors = numpy.tile(numpy.array(self.__color, dtype=numpy.uint8), vertexList.get_size())
+            ctypes.memmove(vertexList.colors, colors.ctypes.data, colors.nbytes)
+
+    def __writeVertices(self):
         #opengl has the y axis being lowest at the bottom and highest at the top
         #the y value given presumes that the y axis is lowest at the top and highest
-        #at the bottom.
-        #the following line converts the y value for opengl
-        #so the label will display correctly
-        cY = screenHeight - y
-
-        super().__init__(text=text,
-                         color=color,
-                         font_size=size,
-                         x=x,
-                         y=cY,
-                         width=width,
-                         height=height,
-                         font_name="Courier",
-                         anchor_x=anchor_x,
-                         anchor_y=anchor_y)
+        #at the bottom, so it is converted for opengl here
+        x = self.__x
+        y = self.__screenHeight - self.__y
+
+        layout = self.__layout
+        boxWidth = self.__width or layout.width
+        boxHeight = self.__height or layout.height
+        if self.__anchorX == "center":
+            x -= boxWidth/2
+        elif self.__anchorX == "right":
+            x -= boxWidth
+        if self.__anchorY == "center":
+            y += boxHeight/2
+        elif self.__anchorY == "bottom":
+            y += boxHeight
+        elif self.__anchorY == "baseline":
+            y += layout.ascent
+
+        for texture, vertexList in self.__vertexLists.items():
+            quads = layout.quads.get(texture)
+            ctypes.memset(vertexList.vertices, 0, ctypes.sizeof(vertexList.vertices))
+            if quads != None:
+                vertices = quads[0] + numpy.array((x, y), dtype=numpy.float32)
+                ctypes.memmove(vertexList.vertices, vertices.ctypes.data, vertices.nbytes)
 
 
 #dpi is dots per inch or pixels per inch
@@ -31,6 +382,18 @@ class Label(pyglet.text.Label):
 #total pixels = points*dpi/72
 #font size = pixels*72/dpi
 
+#that is the size of the em square though, and how tall a line of text is
+#depends on the font, so the height of a line (ascent - descent) at a known size
+#is looked up once for each font and everything else is worked out from that
+
+#pixels per point of line height, by font name
+fontMetrics = {}
+
+METRIC_SIZE = 72
+
 #converts pixels to points
-def pixelsToPoints(self, heightInPixels):
-        self.font_size = math.floor(heightInPixels*72/self.dpi)
+def pixelsToPoints(heightInPixels, fontName="Courier"):
+    if fontName not in fontMetrics:
+        font = loadFont(fontName, METRIC_SIZE)
+        fontMetrics[fontName] = (font.ascent - font.descent)/METRIC_SIZE
+    return heightInPixels/fontMetrics[fontName]
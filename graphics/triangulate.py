@@ -0,0 +1,171 @@
+import numpy
+from collections import OrderedDict
+
+#author Ryan Bailey
+
+#splits the outline of a polygon into triangles, given as indices into its vertices
+#(three per triangle), so that any shape can be drawn with GL_TRIANGLES: in a batch,
+#with glDrawElements, or instanced. GL_POLYGON is only right for convex shapes.
+
+#convex polygons are split into a fan of triangles that all share the first vertex.
+#anything else is split by ear clipping: a corner whose triangle has no other vertex
+#inside it (an ear) is cut off, and that is repeated until one triangle is left.
+#this handles concave polygons and ones whose outline touches itself (e.g. two
+#shapes joined at a corner, or a shape with a hole cut into it along a seam)
+
+#triangles only depend on the shape, not on where it is or how it is transformed
+#(moving, rotating and scaling keep the same vertices in the same ears), so they are
+#worked out once and kept in an LRU cache keyed by the untransformed vertices
+#relative to the first one (to a thousandth of a pixel, so that the same shape made
+#in different places still matches). every primitive of the same shape shares one
+#index array
+
+#fans by vertex count
+fans = {}
+
+def fan(vertexCount):
+    indices = fans.get(vertexCount)
+    if indices is None:
+        indices = numpy.array([(0, i, i + 1) for i in range(1, vertexCount - 1)], dtype=numpy.uint32).ravel()
+        indices.flags.writeable = False
+        fans[vertexCount] = indices
+    return indices
+
+#returns a boolean array saying which of the polygons are convex. polygons is a
+#(count, vertexCount, 2) array. a polygon is convex if it turns the same way at every
+#vertex and only goes round once (a star drawn without lifting the pen turns the same
+#way at every point, but goes round twice)
+def areConvex(polygons):
+    polygons = numpy.asarray(polygons, dtype=numpy.float64)
+    edges = numpy.roll(polygons, -1, axis=1) - polygons
+    following = numpy.roll(edges, -1, axis=1)
+    cross = edges[:, :, 0]*following[:, :, 1] - edges[:, :, 1]*following[:, :, 0]
+    dot = (edges*following).sum(axis=2)
+
+    tolerance = 1e-9*(edges**2).sum(axis=2).max(axis=1, keepdims=True)
+    sameWay = numpy.all(cross >= -tolerance, axis=1) | numpy.all(cross <= tolerance, axis=1)
+    turns = numpy.abs(numpy.arctan2(cross, dot).sum(axis=1))
+    return sameWay & (numpy.abs(turns - 2*numpy.pi) < 1e-6)
+
+#returns the triangles of one polygon, given as an (n, 2) array of vertices
+def triangulate(vertices):
+    vertices = numpy.asarray(vertices, dtype=numpy.float64)
+    if areConvex(vertices[numpy.newaxis])[0]:
+        return fan(len(vertices))
+    triangles = []
+    for loop in splitAtTouches(vertices, list(range(len(vertices)))):
+        triangles += earClip(vertices, loop)
+    indices = numpy.array(triangles, dtype=numpy.uint32)
+    indices.flags.writeable = False
+    return indices
+
+#twice the area inside the loop of vertices, positive if it goes anticlockwise
+def signedArea(vertices, loop):
+    x = vertices[loop, 0]
+    y = vertices[loop, 1]
+    return float(numpy.dot(x, numpy.roll(y, -1)) - numpy.dot(numpy.roll(x, -1), y))
+
+#where the outline goes through the same point twice it is two loops joined there.
+#if both loops go round the same way they are separate shapes touching at a corner,
+#and are split up so that each is clipped on its own. if they go round opposite ways
+#one is a hole cut in the other along a seam, and they are left together
+def splitAtTouches(vertices, loop):
+    seen = {}
+    for position, index in enumerate(loop):
+        point = (vertices[index, 0], vertices[index, 1])
+        if point in seen:
+            first = loop[seen[point]:position]
+            second = loop[position:] + loop[:seen[point]]
+            if len(first) > 2 and len(second) > 2 and signedArea(vertices, first)*signedArea(vertices, second) > 0:
+                return splitAtTouches(vertices, first) + splitAtTouches(vertices, second)
+        seen[point] = position
+    return [loop]
+
+def earClip(vertices, loop):
+    #which way the outline goes round, so that corners turning the same way are convex
+    direction = 1.0 if signedArea(vertices, loop) >= 0 else -1.0
+    span = vertices.max(axis=0) - vertices.min(axis=0)
+    tolerance = 1e-12*float(numpy.dot(span, span))
+
+    remaining = list(loop)
+    triangles = []
+    position = 0
+    misses = 0
+    while len(remaining) > 3:
+        size = len(remaining)
+        position %= size
+        a = remaining[position - 1]
+        b = remaining[position]
+        c = remaining[(position + 1) % size]
+
+        if misses >= size or isEar(vertices, remaining, a, b, c, direction, tolerance):
+            #if a whole lap finds no ears the outline crosses itself, and a corner
+            #is cut off anyway so that it still ends up as triangles
+            triangles += [a, b, c]
+            del remaining[position]
+            misses = 0
+        else:
+            position += 1
+            misses += 1
+    return triangles + remaining
+
+def isEar(vertices, remaining, a, b, c, direction, tolerance):
+    (ax, ay), (bx, by), (cx, cy) = vertices[a], vertices[b], vertices[c]
+    turn = ((bx - ax)*(cy - by) - (by - ay)*(cx - bx))*direction
+    if turn < -tolerance:
+        return False #the corner is reflex
+
+    others = vertices[remaining]
+    px = others[:, 0]
+    py = others[:, 1]
+    #the side of the new edge (from c back to a) that each vertex is on
+    across = ((ax - cx)*(py - cy) - (ay - cy)*(px - cx))*direction
+    if turn <= tolerance:
+        #the three are in a line. cutting the corner off changes nothing, unless
+        #another vertex is on the new edge (where the outline touches itself there)
+        between = ((px - ax)*(cx - ax) + (py - ay)*(cy - ay) > 0) & ((px - cx)*(ax - cx) + (py - cy)*(ay - cy) > 0)
+        return not (between & (numpy.abs(across) <= tolerance)).any()
+
+    #no other vertex can be inside the triangle or on its new edge. vertices that are
+    #on top of one of its corners (where the outline touches itself) don't count
+    inside = (((bx - ax)*(py - ay) - (by - ay)*(px - ax))*direction > tolerance) & \
+             (((cx - bx)*(py - by) - (cy - by)*(px - bx))*direction > tolerance) & \
+             (across >= -tolerance)
+    corners = ((px == ax) & (py == ay)) | ((px == bx) & (py == by)) | ((px == cx) & (py == cy))
+    return not (inside & ~corners).any()
+
+class TriangulationCache():
+    def __init__(self, maxSize=4096):
+        self.__maxSize = maxSize
+        self.__triangulations = OrderedDict()
+        self.__hits = 0
+        self.__misses = 0
+
+    #returns a read only array of the indices of the polygon's triangles
+    def get(self, vertices):
+        vertices = numpy.asarray(vertices, dtype=numpy.float64)
+        key = numpy.round(vertices - vertices[0], 3).tobytes()
+        indices = self.__triangulations.get(key)
+        if indices is not None:
+            self.__triangulations.move_to_end(key)
+            self.__hits += 1
+            return indices
+
+        self.__misses += 1
+        indices = triangulate(vertices)
+        self.__triangulations[key] = indices
+        if len(self.__triangulations) > self.__maxSize:
+            self.__triangulations.popitem(last=False)
+        return indices
+
+    def clear(self):
+        self.__triangulations.clear()
+
+    def __len__(self):
+        return len(self.__triangulations)
+
+    #returns (hits, misses) since the cache was made
+    def stats(self):
+        return (self.__hits, self.__misses)
+
+triangulationCache = TriangulationCache()
@@ -0,0 +1,32 @@
+import importlib
+
+#author Ryan Bailey
+
+#importing pyglet.gl (or pyglet.window, which imports it) loads the whole opengl
+#binding and makes a hidden window to get a context, which is slow and fails on a
+#machine with no display. modules that only need opengl to draw use the LazyModule
+#below instead, so that making screens, primitives and events (e.g. in tools and
+#tests) never loads it, and it is only loaded the first time something is drawn.
+
+#a LazyModule stands in for a module and imports it the first time one of its
+#attributes is used. every attribute is copied onto the LazyModule the first time
+#it is looked up, so after that using one costs the same as it would on the module.
+#that also means it keeps the value an attribute had then, so module variables that
+#change (like pyglet.gl.current_context) should be read from the module itself
+class LazyModule():
+    def __init__(self, name):
+        self.__name = name
+
+    def __getattr__(self, attribute):
+        #only called for attributes that haven't been copied over yet
+        if attribute.startswith("_LazyModule__"):
+            raise AttributeError(attribute)
+        value = getattr(importlib.import_module(self.__name), attribute)
+        setattr(self, attribute, value)
+        return value
+
+    def __repr__(self):
+        return "<LazyModule " + self.__name + ">"
+
+#shared by every module that draws
+gl = LazyModule("pyglet.gl")
@@ -0,0 +1,129 @@
+from time import perf_counter
+from queue import SimpleQueue, Empty
+from concurrent.futures import ThreadPoolExecutor
+
+#author Ryan Bailey
+
+#loads screens in two parts so that the window doesn't freeze while they are made:
+#   - Screen.prepare(progress) is run by a worker thread (or whatever executor is
+#     given), while the current screen keeps being drawn. it should do everything
+#     that doesn't need opengl: loading data, making primitives without a batch,
+#     working out vertices and so on
+#   - Screen.upload() is a generator that does the rest (adding primitives to
+#     batches, making labels) on the main thread, a step at a time. the loader runs
+#     as many steps as fit in uploadBudget seconds each frame
+#a screen with neither is ready straight away. see App.setScreenAsync
+
+#progress stages, passed to onProgress along with how far through the stage the screen is
+PREPARING = "PREPARING"
+UPLOADING = "UPLOADING"
+
+#prepares and uploads a screen on the current thread, for when it is needed straight away
+def prepareNow(screen):
+    screen.prepare(lambda fraction: None)
+    for fraction in screen.upload():
+        pass
+    screen.markPrepared()
+
+class LoadJob():
+    def __init__(self, screen, future, onProgress, onReady):
+        self.screen = screen
+        self.future = future
+        self.onProgress = onProgress
+        self.onReady = onReady
+        self.progress = SimpleQueue() #fractions reported by prepare, from the worker thread
+        self.steps = None #the upload generator, once prepare has finished
+
+class ScreenLoader():
+    #executor is a concurrent.futures executor to run prepare in. a process pool
+    #can't be used here as screens hold opengl objects, but prepare can send
+    #its own work to one
+    #uploadBudget is how many seconds of each frame can be spent uploading
+    def __init__(self, executor=None, uploadBudget=0.004):
+        self.__ownExecutor = executor == None
+        if self.__ownExecutor:
+            executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="uiglet-loader")
+        self.__executor = executor
+        self.__uploadBudget = uploadBudget
+        self.__jobs = {} #screen --> LoadJob
+
+    #starts loading a screen. onProgress(stage, fraction) and onReady(screen) are
+    #called on the main thread, from ScreenLoader.update
+    def load(self, screen, onProgress=None, onReady=None):
+        job = self.__jobs.get(screen)
+        if job != None:
+            return
+
+        job = LoadJob(screen, None, onProgress, onReady)
+        job.future = self.__executor.submit(screen.prepare, job.progress.put)
+        self.__jobs[screen] = job
+
+    def isLoading(self, screen):
+        return screen in self.__jobs
+
+    def busy(self):
+        return bool(self.__jobs)
+
+    #called every frame by the app. passes on progress, and uploads the screens that
+    #have been prepared until the frame's upload budget has been used
+    def update(self):
+        deadline = perf_counter() + self.__uploadBudget
+        for job in list(self.__jobs.values()):
+            self.__reportProgress(job)
+            if job.steps == None:
+                if not job.future.done():
+                    continue
+                if job.future.exception() != None:
+                    #raise whatever prepare raised on the main thread, once
+                    del self.__jobs[job.screen]
+                    job.future.result()
+                job.steps = iter(job.screen.upload())
+
+            while perf_counter() < deadline:
+                try:
+                    fraction = next(job.steps)
+                except StopIteration:
+                    self.__finished(job)
+                    break
+                if fraction != None and job.onProgress != None:
+                    job.onProgress(UPLOADING, fraction)
+
+            if perf_counter() >= deadline:
+                return
+
+    #loads a screen straight away, waiting for it if it is already being loaded
+    #its onReady isn't called, as whatever called finish knows it is ready
+    def finish(self, screen):
+        job = self.__jobs.get(screen)
+        if job == None:
+            prepareNow(screen)
+            return
+
+        job.future.result()
+        self.__reportProgress(job)
+        if job.steps == None:
+            job.steps = iter(screen.upload())
+        for fraction in job.steps:
+            pass
+        job.onReady = None
+        self.__finished(job)
+
+    #stops the worker threads (only if the loader made them)
+    def shutdown(self):
+        if self.__ownExecutor:
+            self.__executor.shutdown(wait=False)
+
+    def __reportProgress(self, job):
+        while True:
+            try:
+                fraction = job.progress.get_nowait()
+            except Empty:
+                return
+            if job.onProgress != None:
+                job.onProgress(PREPARING, fraction)
+
+    def __finished(self, job):
+        del self.__jobs[job.screen]
+        job.screen.markPrepared()
+        if job.onReady != None:
+            job.onReady(job.screen)
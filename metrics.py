@@ -0,0 +1,133 @@
+import json
+import time
+from collections import deque
+
+#author Ryan Bailey
+
+#keeps the last sampleCount values added to it so that percentiles can be worked out
+class RollingHistogram():
+    def __init__(self, sampleCount=600):
+        self.__samples = deque(maxlen=sampleCount)
+        self.__count = 0
+
+    def add(self, value):
+        self.__samples.append(value)
+        self.__count += 1
+
+    #the total number of values ever added, not just the ones still kept
+    def count(self):
+        return self.__count
+
+    #percent should be from 0-100
+    def percentile(self, percent):
+        if not self.__samples:
+            return 0
+        ordered = sorted(self.__samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered)*percent/100))]
+
+    def summary(self):
+        if not self.__samples:
+            return {"count": self.__count}
+        ordered = sorted(self.__samples)
+        last = len(ordered) - 1
+        return {"count": self.__count,
+                "mean": sum(ordered)/len(ordered),
+                "p50": ordered[min(last, len(ordered)*50//100)],
+                "p95": ordered[min(last, len(ordered)*95//100)],
+                "p99": ordered[min(last, len(ordered)*99//100)],
+                "max": ordered[last]}
+
+#records where the time goes in an App (see App's metrics argument):
+#   - "frame": from the start of on_draw to the end of the flip
+#   - "clear", "draw" and "flip": the parts of a frame
+#   - "event:<type>": how long the screen took to handle each type of event (see Screen.dispatch)
+#   - "switch": how long App.setScreen took
+#   - "update": how long the Screen.update calls of each tick took
+#   - "build": how long it took to make a screen that was added as a factory
+#every timing is kept for the whole app and for each screen, and is in seconds
+class FrameMetrics():
+    #frameBudget is how long a frame can take before it counts as an overrun
+    def __init__(self, frameBudget=1/60, sampleCount=600):
+        self.__frameBudget = frameBudget
+        self.__sampleCount = sampleCount
+        self.__timings = {} #name --> RollingHistogram
+        self.__screenTimings = {} #screen name --> name --> RollingHistogram
+        self.__overruns = 0
+        self.__screenOverruns = {}
+
+    def record(self, name, seconds, screenName=None):
+        self.__histogram(self.__timings, name).add(seconds)
+        if screenName != None:
+            self.__histogram(self.__screenTimings.setdefault(screenName, {}), name).add(seconds)
+
+    def recordEvent(self, eventType, seconds, screenName=None):
+        self.record("event:" + eventType, seconds, screenName)
+
+    #screenName is the screen that was switched to
+    def recordScreenSwitch(self, seconds, screenName=None):
+        self.record("switch", seconds, screenName)
+
+    def recordFrame(self, seconds, screenName=None):
+        self.record("frame", seconds, screenName)
+        if seconds > self.__frameBudget:
+            self.__overruns += 1
+            if screenName != None:
+                self.__screenOverruns[screenName] = self.__screenOverruns.get(screenName, 0) + 1
+
+    #the number of frames that took longer than the frame budget
+    def overruns(self):
+        return self.__overruns
+
+    #returns the RollingHistogram for a timing, or None if it hasn't been recorded
+    def timing(self, name, screenName=None):
+        if screenName == None:
+            return self.__timings.get(name)
+        return self.__screenTimings.get(screenName, {}).get(name)
+
+    def summary(self):
+        return {"frameBudget": self.__frameBudget,
+                "overruns": self.__overruns,
+                "timings": {name: histogram.summary() for name, histogram in self.__timings.items()},
+                "screens": {screenName: {"overruns": self.__screenOverruns.get(screenName, 0),
+                                         "timings": {name: histogram.summary() for name, histogram in timings.items()}}
+                            for screenName, timings in self.__screenTimings.items()}}
+
+    #writes the summary to a json file
+    def dump(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=4)
+
+    #returns a short, human readable summary (in milliseconds) for showing on screen
+    def report(self):
+        lines = ["overruns: %d" % self.__overruns]
+        for name in sorted(self.__timings):
+            histogram = self.__timings[name]
+            lines += ["%s: p50 %.2f p95 %.2f p99 %.2f ms" % (name,
+                                                             histogram.percentile(50)*1000,
+                                                             histogram.percentile(95)*1000,
+                                                             histogram.percentile(99)*1000)]
+        return "\n".join(lines)
+
+    def __histogram(self, timings, name):
+        histogram = timings.get(name)
+        if histogram == None:
+            histogram = timings[name] = RollingHistogram(self.__sampleCount)
+        return histogram
+
+#draws FrameMetrics.report in the top left corner of the screen
+#(see App.setOverlay). the text is only updated every updateInterval seconds
+class MetricsOverlay():
+    def __init__(self, metrics, screenHeight, color=(255, 255, 0, 255), size=10, updateInterval=0.5):
+        self.__metrics = metrics
+        self.__updateInterval = updateInterval
+        self.__lastUpdate = 0
+        #imported here so that recording metrics doesn't load the text module
+        from .graphics.text import Label
+        self.__label = Label("", color, size, 5, 5, 600, 0, screenHeight, multiline=True)
+
+    def draw(self):
+        now = time.perf_counter()
+        if now - self.__lastUpdate > self.__updateInterval:
+            self.__lastUpdate = now
+            self.__label.setText(self.__metrics.report())
+        self.__label.draw()
@@ -0,0 +1,193 @@
+import json
+import time
+import struct
+from pyglet.event import EventDispatcher
+
+from .metrics import RollingHistogram
+from .errors import RecordingFormatError
+
+#author Ryan Bailey
+
+#InputRecorder logs everything an App is sent by pyglet (mouse, keys, resizes and
+#the frames drawn) to a compact binary file, and InputReplayer sends a log back
+#through the same App, from pyglet's side of its event handlers, so that a session
+#can be played back against a screen as often as needed: at the speed it was
+#recorded at, or as fast as possible to load test it, and on a headless window.
+
+#the file is a header followed by one record per event:
+#   header: the magic bytes, then the window's width and height ("<8sII")
+#   record: the kind of event and the microseconds since the record before ("<BQ"),
+#           followed by the event's arguments (see FORMATS). positions and movements
+#           are ints, like pyglet sends them, so replayed events are the same as the
+#           recorded ones. only scroll amounts are floats
+
+MAGIC = b"UIGLREC3"
+HEADER = struct.Struct("<8sII")
+RECORD = struct.Struct("<BQ")
+
+MOUSE_PRESS = 1
+MOUSE_RELEASE = 2
+KEY_PRESS = 3
+MOUSE_MOTION = 4
+MOUSE_DRAG = 5
+MOUSE_SCROLL = 6
+RESIZE = 7
+FRAME = 8
+
+#kind --> (pyglet event, format of its arguments)
+FORMATS = {MOUSE_PRESS: ("on_mouse_press", struct.Struct("<iiII")),
+           MOUSE_RELEASE: ("on_mouse_release", struct.Struct("<iiII")),
+           KEY_PRESS: ("on_key_press", struct.Struct("<QI")),
+           MOUSE_MOTION: ("on_mouse_motion", struct.Struct("<iiii")),
+           MOUSE_DRAG: ("on_mouse_drag", struct.Struct("<iiiiII")),
+           MOUSE_SCROLL: ("on_mouse_scroll", struct.Struct("<iiff")),
+           RESIZE: ("on_resize", struct.Struct("<II")),
+           FRAME: ("on_draw", struct.Struct("<"))}
+
+#records an App's input until stop is called. the recorder's handlers are pushed on
+#top of the app's, and let every event carry on through to it
+class InputRecorder():
+    def __init__(self, app, path):
+        self.__app = app
+        self.__file = open(path, "wb")
+        self.__file.write(HEADER.pack(MAGIC, app.width, app.height))
+        self.__last = time.perf_counter()
+        self.__records = 0
+
+        self.__handlers = {"on_mouse_press": lambda *arguments: self.__record(MOUSE_PRESS, arguments),
+                           "on_mouse_release": lambda *arguments: self.__record(MOUSE_RELEASE, arguments),
+                           "on_key_press": lambda *arguments: self.__record(KEY_PRESS, arguments),
+                           "on_mouse_motion": lambda *arguments: self.__record(MOUSE_MOTION, arguments),
+                           "on_mouse_drag": lambda *arguments: self.__record(MOUSE_DRAG, arguments),
+                           "on_mouse_scroll": lambda *arguments: self.__record(MOUSE_SCROLL, arguments),
+                           "on_resize": lambda *arguments: self.__record(RESIZE, arguments),
+                           "on_draw": lambda *arguments: self.__record(FRAME, arguments)}
+        app.push_handlers(**self.__handlers)
+
+    #the number of events recorded so far
+    def records(self):
+        return self.__records
+
+    def stop(self):
+        if self.__file == None:
+            return
+        self.__app.remove_handlers(**self.__handlers)
+        self.__file.close()
+        self.__file = None
+
+    def __record(self, kind, arguments):
+        now = time.perf_counter()
+        delay = int((now - self.__last)*1000000)
+        self.__last = now
+        self.__file.write(RECORD.pack(kind, delay) + FORMATS[kind][1].pack(*arguments))
+        self.__records += 1
+
+#reads a log made by InputRecorder. returns (width, height, records), where records is
+#a list of (kind, seconds since the start, arguments)
+#raises RecordingFormatError if the file isn't a recording (or was made by an older
+#version with a different format) or has been cut short
+def readRecording(path):
+    with open(path, "rb") as file:
+        data = file.read()
+
+    if len(data) < HEADER.size or data[:len(MAGIC)] != MAGIC:
+        raise RecordingFormatError("(readRecording) " + path + " is not an input recording")
+    magic, width, height = HEADER.unpack_from(data, 0)
+
+    records = []
+    offset = HEADER.size
+    seconds = 0
+    while offset < len(data):
+        if offset + RECORD.size > len(data):
+            raise RecordingFormatError("(readRecording) " + path + " ends part way through a record")
+        kind, delay = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if kind not in FORMATS:
+            raise RecordingFormatError("(readRecording) " + path + " has a record of unknown kind " + str(kind))
+        if offset + FORMATS[kind][1].size > len(data):
+            raise RecordingFormatError("(readRecording) " + path + " ends part way through a record")
+        arguments = FORMATS[kind][1].unpack_from(data, offset)
+        offset += FORMATS[kind][1].size
+        seconds += delay/1000000
+        records += [(kind, seconds, arguments)]
+    return (width, height, records)
+
+#plays a recording back through an app, which should have its screens added and set.
+#events are dispatched to the app like pyglet's event loop dispatches them (straight
+#to the handlers, rather than through the queue a window keeps for events sent to it
+#outside of the loop), and every frame record
+#ticks the app (with the time between the recorded frames, so Screen.update sees the
+#same steps it did when it was recorded), draws it and flips it
+class InputReplayer():
+    def __init__(self, app, path):
+        self.__app = app
+        self.__width, self.__height, self.__records = readRecording(path)
+
+    #replays the whole recording and returns a ReplayReport. if realtime is True
+    #the events are spaced out as they were recorded, otherwise they are sent as
+    #fast as the app can take them
+    def run(self, realtime=False):
+        app = self.__app
+        app.switch_to()
+        if (app.width, app.height) != (self.__width, self.__height):
+            app.set_size(self.__width, self.__height)
+        EventDispatcher.dispatch_event(app, "on_resize", self.__width, self.__height)
+
+        report = ReplayReport(len(self.__records))
+        start = time.perf_counter()
+        lastFrame = None
+        for kind, seconds, arguments in self.__records:
+            if realtime:
+                wait = start + seconds - time.perf_counter()
+                if wait > 0:
+                    time.sleep(wait)
+
+            event = FORMATS[kind][0]
+            before = time.perf_counter()
+            if kind == FRAME:
+                if lastFrame != None:
+                    app.tick(seconds - lastFrame)
+                lastFrame = seconds
+                EventDispatcher.dispatch_event(app, "on_draw")
+                app.flip()
+            else:
+                EventDispatcher.dispatch_event(app, event, *arguments)
+            report.add(event, time.perf_counter() - before)
+
+        report.finish(time.perf_counter() - start)
+        return report
+
+class ReplayReport():
+    def __init__(self, recordCount):
+        self.__latencies = {} #pyglet event --> RollingHistogram of seconds
+        self.__sampleCount = max(1, recordCount)
+        self.__events = 0
+        self.__frames = 0
+        self.__seconds = 0
+
+    def add(self, event, seconds):
+        histogram = self.__latencies.get(event)
+        if histogram == None:
+            histogram = self.__latencies[event] = RollingHistogram(self.__sampleCount)
+        histogram.add(seconds)
+        if event == "on_draw":
+            self.__frames += 1
+        else:
+            self.__events += 1
+
+    def finish(self, seconds):
+        self.__seconds = seconds
+
+    def summary(self):
+        seconds = max(self.__seconds, 1e-9)
+        return {"seconds": self.__seconds,
+                "events": self.__events,
+                "frames": self.__frames,
+                "eventsPerSecond": self.__events/seconds,
+                "framesPerSecond": self.__frames/seconds,
+                "latency": {event: histogram.summary() for event, histogram in self.__latencies.items()}}
+
+    #writes the summary to a json file, to compare with other versions
+    def dump(self, path):
+        with open(path, "w") as file:
+            json.dump(self.summary(), file, indent=4, sort_keys=True)
@@ -9,12 +9,86 @@ class Screen():
         self.__screenChangeRequested = False
         self.__closeRequested = False
 
+        #a screen starts off needing to be drawn
+        self.__invalid = True
+        self.__damage = None #list of damaged rectangles, None meaning the whole screen
+
+        self.__handlers = {} #event type --> tuple of (handler, region test)
+        #processInput is only given events if a subclass has overridden it
+        self.__catchAll = type(self).processInput is not Screen.processInput
+
+        self.__resources = [] #see Screen.addResource
+        self.__prepared = False #see Screen.prepare
+        self.__interpolation = 0
+
     def draw(self):
         raise NotImplementedError("The current screen's draw function is not implemented")
 
+    #given every event that no subscribed handler has consumed (see Screen.subscribe)
+    #screens that only use subscribe don't need to implement it
     def processInput(self, event):
         raise NotImplementedError("The current screen's processInput function is not implemented")
 
+    #called by the app (see App.tick) with a fixed dt in seconds. move and animate
+    #things here rather than in draw so that they move at the same speed whatever the
+    #frame rate is
+    def update(self, dt):
+        pass
+
+    #how far (0-1) the time since the last update is towards the next one. draw can
+    #use it to place things between where they were and where they will be, so that
+    #they move smoothly when the frame rate and update rate don't match
+    def interpolation(self):
+        return self.__interpolation
+
+    #called by the app before every frame
+    def setInterpolation(self, alpha):
+        self.__interpolation = alpha
+
+    #calls handler(event) for every event of eventType (e.g. events.MOUSE_CLICK)
+    #region limits the handler to events that happen in it, and is either an
+    #(x, y, width, height) rectangle in the same coordinates as mouse events or
+    #anything with a mousedOver(x, y) method, like a widget
+    #events without a position (key presses) are never given to handlers with a region
+    #handlers are called in the order they subscribed, and a handler that returns
+    #True consumes the event so that later handlers and processInput don't get it
+    def subscribe(self, eventType, handler, region=None):
+        contains = None
+        if region == None:
+            pass
+        elif hasattr(region, "mousedOver"):
+            contains = region.mousedOver
+        else:
+            rx, ry, width, height = region
+            contains = lambda x, y: rx <= x < rx + width and ry <= y < ry + height
+        #a new tuple is made so that handlers can (un)subscribe while an event is being dispatched
+        self.__handlers[eventType] = self.__handlers.get(eventType, ()) + ((handler, contains),)
+
+    def unsubscribe(self, eventType, handler):
+        handlers = tuple(entry for entry in self.__handlers.get(eventType, ()) if entry[0] != handler)
+        if handlers:
+            self.__handlers[eventType] = handlers
+        else:
+            self.__handlers.pop(eventType, None)
+
+    #used by the app to avoid making events that nothing would be given
+    def wantsEvent(self, eventType):
+        return self.__catchAll or eventType in self.__handlers
+
+    #gives an event to the handlers subscribed to its type, then to processInput
+    #if none of them consumed it. called by the app
+    def dispatch(self, event):
+        handlers = self.__handlers.get(event.type_())
+        if handlers != None:
+            position = event.position()
+            for handler, contains in handlers:
+                if contains != None and (position == None or not contains(*position)):
+                    continue
+                if handler(event):
+                    return
+        if self.__catchAll:
+            self.processInput(event)
+
     #use this function to request that the app switch from this screen to another
     def requestScreenChange(self, screenName):
         self.__screenChangeRequested = True
@@ -29,7 +103,7 @@ class Screen():
     def changeScreen(self):
         if self.__nextScreen == None:
             raise NoChangeScreenSpecifiedError("Cannot change screen as no screen has been specified")
-        self.screenChangeRequested = False
+        self.__screenChangeRequested = False
         return self.__nextScreen
 
     #use this function to request that the app close
@@ -39,3 +113,104 @@ class Screen():
     #this is the function that the app uses to test if close has been requested
     def closeRequested(self):
         return self.__closeRequested
+
+    #use this function to tell the app that the screen needs to be redrawn
+    #(only matters when the app's redraw mode is REDRAW_WHEN_INVALID)
+    #rect is the (x, y, width, height) area that has changed, in the same coordinates
+    #as mouse events (origin at the bottom left), or None if everything has changed
+    def invalidate(self, rect=None):
+        if rect == None:
+            self.__damage = None
+        elif self.__invalid and self.__damage == None:
+            pass #the whole screen is already being redrawn
+        elif not self.__invalid:
+            self.__damage = [rect]
+        else:
+            self.__damage += [rect]
+        self.__invalid = True
+
+    #this is the function that the app uses to test if the screen needs redrawing
+    def isInvalid(self):
+        return self.__invalid
+
+    #returns the damaged rectangles (or None if the whole screen is damaged) and
+    #marks the screen as valid again. should only be called by the app when it draws
+    def takeDamage(self):
+        damage = self.__damage
+        self.__invalid = False
+        self.__damage = []
+        return damage
+
+    #called by a widget whose parent is this screen when it moves or changes size
+    def widgetMoved(self, widget, oldBox):
+        self.invalidate(oldBox)
+        widget.invalidate()
+
+    #resources are things that hold gpu or text memory, like PrimitiveBatches and
+    #Labels, which can be freed while the screen isn't being shown and made again
+    #when it is (see App's evictionPolicy). anything with release, restore and
+    #resourceSize methods can be added. returns the resource
+    def addResource(self, resource):
+        self.__resources += [resource]
+        return resource
+
+    def removeResource(self, resource):
+        self.__resources.remove(resource)
+
+    #called by the app's eviction policy when the screen hasn't been shown for a while.
+    #screens that hold memory some other way should override these three
+    def releaseResources(self):
+        for resource in self.__resources:
+            resource.release()
+
+    #called by the app before the screen is shown again
+    def restoreResources(self):
+        for resource in self.__resources:
+            resource.restore()
+
+    #roughly how many bytes the screen's resources are using
+    def resourceSize(self):
+        return sum(resource.resourceSize() for resource in self.__resources)
+
+    #called by the app with the size of the window when it changes, and when the
+    #screen is switched to. resizes any resources that can be resized, like CachedLayers
+    def resize(self, width, height):
+        for resource in self.__resources:
+            if hasattr(resource, "resize"):
+                resource.resize(width, height)
+
+    #the names of the screens that are likely to be switched to from this one. the
+    #app builds any of them that haven't been built yet while this screen is shown
+    #(see App.prewarm)
+    def likelyNextScreens(self):
+        return ()
+
+    #does the slow part of making the screen that doesn't need opengl (loading data,
+    #making primitives without a batch, etc) and is run in a worker thread when the
+    #screen is loaded with App.setScreenAsync. it shouldn't touch anything the current
+    #screen is using. progress(fraction) can be called with how far through it is (0-1)
+    def prepare(self, progress):
+        pass
+
+    #a generator that does the rest of making the screen (adding primitives to
+    #batches, making labels) on the main thread. it should yield often, optionally
+    #with how far through it is (0-1), as the loader spreads the steps across frames
+    def upload(self):
+        return ()
+
+    #returns True once prepare and upload have been run
+    def isPrepared(self):
+        return self.__prepared
+
+    #called by the loader once prepare and upload have finished
+    def markPrepared(self):
+        self.__prepared = True
+
+    #runs a coroutine (e.g. one reading from a socket) without blocking the window
+    #onResult(result) or onError(exception) is called on the main thread, before the
+    #next frame, once it has finished, even if the screen is no longer being shown
+    #returns a future that can be cancelled (see asyncloop.py)
+    def runAsync(self, coroutine, onResult=None, onError=None):
+        #imported here so that screens that never use it don't import it
+        from .asyncloop import asyncLoop
+        return asyncLoop.submit(coroutine, onResult, onError)
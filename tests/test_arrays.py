@@ -0,0 +1,112 @@
+import numpy
+import pytest
+
+from uiglet.graphics.arrays import RectangleArray, EllipseArray
+from uiglet.graphics.primitives import Rectangle, Ellipse
+from uiglet.errors import ColorLengthError, ColorRangeError, ScaleByZeroError
+
+#author Ryan Bailey
+
+SCREEN_HEIGHT = 100
+COUNT = 6
+
+#every form a selection can take, and the indices it selects
+SELECTIONS = [(None, list(range(COUNT))),
+              (2, [2]),
+              (-1, [COUNT - 1]),
+              (slice(1, 5, 2), [1, 3]),
+              (slice(None, None, -2), [5, 3, 1]),
+              ([0, 4], [0, 4]),
+              (numpy.array([5, 1]), [5, 1]),
+              (numpy.arange(COUNT) % 3 == 0, [0, 3])]
+
+def makeShapes():
+    x = numpy.arange(COUNT)*12.0
+    y = numpy.arange(COUNT)*5.0
+    array = RectangleArray([255, 255, 255, 255], x, y, 10, 20, SCREEN_HEIGHT)
+    rectangles = [Rectangle([255, 255, 255, 255], x[i], y[i], 10, 20, SCREEN_HEIGHT) for i in range(COUNT)]
+    return (array, rectangles)
+
+def vertices(rectangles):
+    return numpy.concatenate([rectangle.getVertices() for rectangle in rectangles])
+
+#each transform, done to the selected shapes of the array and to the matching rectangles
+TRANSFORMS = {"rotate": (lambda array, selection: array.rotate(30, selection),
+                         lambda rectangle: rectangle.rotate(30)),
+              "translateRelative": (lambda array, selection: array.translateRelative(3, -4, selection),
+                                    lambda rectangle: rectangle.translateRelative(3, -4)),
+              "translateCentresTo": (lambda array, selection: array.translateCentresTo(50, 60, selection),
+                                     lambda rectangle: rectangle.translateCenterTo(50, 60)),
+              "scale": (lambda array, selection: array.scale(2, 0.5, selection),
+                        lambda rectangle: rectangle.scale(2, 0.5))}
+
+@pytest.mark.parametrize("transform", TRANSFORMS)
+@pytest.mark.parametrize("selection, selected", SELECTIONS)
+def test_transforms_only_change_the_selected_shapes(transform, selection, selected):
+    array, rectangles = makeShapes()
+    transformArray, transformRectangle = TRANSFORMS[transform]
+    transformArray(array, selection)
+    for i in selected:
+        transformRectangle(rectangles[i])
+    assert numpy.allclose(array.getVertices(), vertices(rectangles), atol=1e-4)
+    assert numpy.allclose(array.getCentres(), [rectangle.getCentre() for rectangle in rectangles], atol=1e-4)
+
+def test_transforms_take_one_value_per_selected_shape():
+    array, rectangles = makeShapes()
+    array.translateRelative([1, 2], [3, 4], [0, 5])
+    array.rotate(numpy.array([10, 20, 30]), slice(1, 4))
+    rectangles[0].translateRelative(1, 3)
+    rectangles[5].translateRelative(2, 4)
+    for i, degrees in zip(range(1, 4), [10, 20, 30]):
+        rectangles[i].rotate(degrees)
+    assert numpy.allclose(array.getVertices(), vertices(rectangles), atol=1e-4)
+
+def test_rotations_given_to_the_constructor():
+    array = RectangleArray([255, 255, 255, 255], [0, 20], 0, 10, 10, SCREEN_HEIGHT, rotations=[0, 45])
+    rectangles = [Rectangle([255, 255, 255, 255], 0, 0, 10, 10, SCREEN_HEIGHT),
+                  Rectangle([255, 255, 255, 255], 20, 0, 10, 10, SCREEN_HEIGHT, rotation=45)]
+    assert numpy.allclose(array.getVertices(), vertices(rectangles), atol=1e-4)
+
+def test_ellipses_match_ellipse_primitives():
+    array = EllipseArray([255, 255, 255, 255], [0, 30], [10, 40], [20, 8], [10, 16], SCREEN_HEIGHT, vertexCount=16)
+    ellipses = [Ellipse([255, 255, 255, 255], 0, 10, 20, 10, SCREEN_HEIGHT, vertexCount=16),
+                Ellipse([255, 255, 255, 255], 30, 40, 8, 16, SCREEN_HEIGHT, vertexCount=16)]
+    array.rotate(60, 1)
+    array.scale(3, 2, [True, False])
+    ellipses[1].rotate(60)
+    ellipses[0].scale(3, 2)
+    assert numpy.allclose(array.getVertices(), vertices(ellipses), atol=1e-3)
+
+@pytest.mark.parametrize("selection, selected", SELECTIONS)
+def test_colors_only_change_for_the_selected_shapes(selection, selected):
+    array, rectangles = makeShapes()
+    array.changeColor([10, 20, 30, 40], selection)
+    expected = numpy.full((COUNT, 4), 255)
+    expected[selected] = [10, 20, 30, 40]
+    assert (array.getColors() == expected).all()
+    assert (array.getColors(selection) == expected[selected]).all()
+
+def test_bad_values_are_rejected():
+    array, rectangles = makeShapes()
+    with pytest.raises(ColorLengthError):
+        array.changeColor([1, 2, 3])
+    with pytest.raises(ColorRangeError):
+        array.changeColor([[1, 2, 3, 4], [1, 2, 3, 256]], [0, 1])
+    with pytest.raises(ScaleByZeroError):
+        array.scale([1, 0], 1, [0, 1])
+
+def test_vertices_are_cached_until_a_transform():
+    array, rectangles = makeShapes()
+    first = array.getVertices()
+    assert array.getVertices() is first
+    assert not first.flags.writeable
+    array.translateRelative(1, 1, 0)
+    assert array.getVertices() is not first
+
+def test_drawn_shapes_are_where_their_vertices_are(window):
+    array = RectangleArray([[255, 0, 0, 255], [0, 0, 255, 255]], [0, 30], [0, 20], 10, 10, window.height)
+    array.translateRelative(5, 5, 1)
+    array.draw()
+    assert window.pixel(5, 5) == [255, 0, 0, 255]
+    assert window.pixel(40, 30) == [0, 0, 255, 255]
+    assert window.pixel(32, 22) == [0, 0, 0, 255]
@@ -0,0 +1,117 @@
+from uiglet.graphics.batch import PrimitiveBatch
+from uiglet.graphics.primitives import Primitive, Rectangle, Ellipse
+
+#author Ryan Bailey
+
+RED = [255, 0, 0, 255]
+BLUE = [0, 0, 255, 255]
+BLACK = [0, 0, 0, 255]
+
+def redraw(window, batch):
+    window.clear()
+    batch.draw()
+
+def test_moved_primitives_are_redrawn_where_they_now_are(window):
+    batch = PrimitiveBatch()
+    moving = Rectangle(RED, 0, 0, 10, 10, window.height, batch=batch)
+    still = Rectangle(BLUE, 40, 30, 10, 10, window.height, batch=batch)
+    redraw(window, batch)
+    assert window.pixel(5, 5) == RED
+
+    moving.translateRelative(20, 10)
+    redraw(window, batch)
+    assert window.pixel(5, 5) == BLACK
+    assert window.pixel(25, 15) == RED
+    assert window.pixel(45, 35) == BLUE
+
+def test_recolored_primitives_are_redrawn_in_their_new_color(window):
+    batch = PrimitiveBatch()
+    rectangle = Rectangle(RED, 0, 0, 10, 10, window.height, batch=batch)
+    redraw(window, batch)
+    rectangle.changeColor(BLUE)
+    redraw(window, batch)
+    assert window.pixel(5, 5) == BLUE
+
+def test_reshaped_primitives_get_new_vertices(window):
+    batch = PrimitiveBatch()
+    primitive = Primitive(RED, [(0, 0), (10, 0), (10, 10), (0, 10)], window.height, batch=batch)
+    redraw(window, batch)
+
+    #a different number of vertices, so the primitive is removed and added again
+    primitive.setLocalVertices([(0, 0), (30, 0), (30, 10), (20, 10), (20, 20), (0, 20)])
+    redraw(window, batch)
+    assert len(batch) == 1 and primitive in batch
+    assert window.pixel(25, 5) == RED
+    assert window.pixel(15, 15) == RED
+    assert window.pixel(25, 15) == BLACK
+
+    #an adaptive ellipse has more vertices once it is scaled up
+    ellipse = Ellipse(BLUE, 40, 30, 4, 4, window.height, batch=batch)
+    vertexCount = ellipse.getVertexCount()
+    ellipse.scale(4, 4)
+    assert ellipse.getVertexCount() > vertexCount
+    redraw(window, batch)
+    assert window.pixel(42, 32) == BLUE
+    assert window.pixel(42, 38) == BLUE
+
+def test_transparent_primitives_are_drawn_after_opaque_ones(window):
+    batch = PrimitiveBatch()
+    #added first, but still drawn over the opaque rectangle
+    Rectangle([255, 0, 0, 128], 0, 0, 20, 20, window.height, batch=batch)
+    Rectangle(BLUE, 10, 10, 20, 20, window.height, batch=batch)
+    redraw(window, batch)
+    red, green, blue, alpha = window.pixel(15, 15)
+    assert red > 100 and 100 < blue < 150
+
+def test_primitives_change_group_when_they_become_transparent(window):
+    batch = PrimitiveBatch()
+    top = Rectangle(RED, 0, 0, 20, 20, window.height, batch=batch)
+    Rectangle(BLUE, 10, 10, 20, 20, window.height, batch=batch)
+    top.changeColor([255, 0, 0, 128])
+    redraw(window, batch)
+    red, green, blue, alpha = window.pixel(15, 15)
+    assert red > 100 and blue > 100
+
+    top.changeColor(RED)
+    redraw(window, batch)
+    assert window.pixel(5, 5) == RED
+
+def test_removed_primitives_arent_drawn(window):
+    batch = PrimitiveBatch()
+    rectangle = Rectangle(RED, 0, 0, 10, 10, window.height, batch=batch)
+    batch.remove(rectangle)
+    redraw(window, batch)
+    assert window.pixel(5, 5) == BLACK
+    assert len(batch) == 0 and rectangle not in batch
+
+    #a removed primitive is no longer watched
+    rectangle.translateRelative(5, 5)
+    redraw(window, batch)
+    assert window.pixel(10, 10) == BLACK
+
+def test_release_frees_the_buffers_and_keeps_the_primitives(window):
+    batch = PrimitiveBatch()
+    first = Rectangle(RED, 0, 0, 10, 10, window.height, batch=batch)
+    second = Rectangle(BLUE, 20, 0, 10, 10, window.height, batch=batch)
+    size = batch.resourceSize()
+    assert size > 0
+
+    batch.release()
+    assert batch.resourceSize() == 0
+    assert len(batch) == 2 and first in batch
+    #changes while it is released are kept track of too
+    batch.remove(second)
+    third = Rectangle(BLUE, 40, 0, 10, 10, window.height, batch=batch)
+    first.translateRelative(0, 20)
+
+    #drawing restores it
+    redraw(window, batch)
+    assert batch.resourceSize() == size
+    assert len(batch) == 2 and second not in batch and third in batch
+    assert window.pixel(5, 25) == RED
+    assert window.pixel(25, 5) == BLACK
+    assert window.pixel(45, 5) == BLUE
+
+    batch.release()
+    batch.restore()
+    assert batch.resourceSize() == size
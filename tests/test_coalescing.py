@@ -0,0 +1,96 @@
+from pyglet.window import mouse, key
+
+from uiglet.app import App
+from uiglet.screen import Screen
+from uiglet.events import MOUSE_CLICK
+
+#author Ryan Bailey
+
+class LoggingScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    def processInput(self, event):
+        fields = [event.type_(), event.position()]
+        if hasattr(event, "vector"):
+            fields += [event.vector(), event.rawEventCount()]
+        self.log += [tuple(fields)]
+
+    def draw(self):
+        pass
+
+#only wants clicks
+class ClickScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.log = []
+        self.subscribe(MOUSE_CLICK, lambda event: self.log.append(event.position()))
+
+    def draw(self):
+        pass
+
+def makeApp(**arguments):
+    app = App(fullscreen=False, width=200, height=150, coalesceMotion=True, **arguments)
+    screens = {"log": LoggingScreen(), "other": LoggingScreen(), "clicks": ClickScreen()}
+    for name, screen in screens.items():
+        app.addScreen(name, screen)
+    app.setScreen("log")
+    return (app, screens)
+
+def test_motion_between_frames_is_merged():
+    app, screens = makeApp()
+    app.on_mouse_motion(10, 10, 1, 2)
+    app.on_mouse_motion(12, 13, 2, 3)
+    app.on_mouse_motion(15, 11, 3, -2)
+    assert screens["log"].log == []
+
+    app.renderFrame()
+    app.close()
+    assert screens["log"].log == [("MOUSE_MOTION", (15, 11), (6, 3), 3)]
+
+def test_drags_with_different_buttons_arent_merged():
+    app, screens = makeApp()
+    app.on_mouse_drag(10, 10, 1, 1, mouse.LEFT, 0)
+    app.on_mouse_drag(11, 11, 1, 1, mouse.LEFT, 0)
+    app.on_mouse_drag(12, 12, 1, 1, mouse.RIGHT, 0)
+    app.on_mouse_drag(13, 13, 1, 1, mouse.RIGHT, key.MOD_SHIFT)
+    app.on_mouse_motion(14, 14, 1, 1)
+    app.renderFrame()
+    app.close()
+    assert [(entry[1], entry[3]) for entry in screens["log"].log] == [((11, 11), 2), ((12, 12), 1), ((13, 13), 1), ((14, 14), 1)]
+    assert [entry[0] for entry in screens["log"].log] == ["MOUSE_DRAG"]*3 + ["MOUSE_MOTION"]
+
+def test_other_events_send_the_merged_motion_first():
+    app, screens = makeApp()
+    app.on_mouse_motion(10, 10, 1, 1)
+    app.on_mouse_motion(11, 11, 1, 1)
+    app.on_mouse_press(11, 11, mouse.LEFT, 0)
+    app.on_mouse_motion(12, 12, 1, 1)
+    app.on_key_press(key.A, 0)
+    app.close()
+    assert [entry[0] for entry in screens["log"].log] == ["MOUSE_MOTION", "MOUSE_CLICK", "MOUSE_MOTION", "KEY_PRESS"]
+    assert screens["log"].log[0][3] == 2
+
+def test_merged_motion_isnt_sent_to_the_next_screen():
+    app, screens = makeApp()
+    app.on_mouse_motion(10, 10, 1, 1)
+    app.setScreen("other")
+    app.renderFrame()
+    app.on_mouse_motion(20, 20, 1, 1)
+    app.setScreen("clicks")
+    app.renderFrame()
+    app.close()
+    assert screens["log"].log == []
+    assert screens["other"].log == []
+    assert screens["clicks"].log == []
+
+def test_without_coalescing_every_motion_is_sent():
+    app = App(fullscreen=False, width=200, height=150)
+    screen = LoggingScreen()
+    app.addScreen("log", screen)
+    app.setScreen("log")
+    app.on_mouse_motion(10, 10, 1, 1)
+    app.on_mouse_motion(11, 11, 1, 1)
+    app.close()
+    assert [entry[3] for entry in screen.log] == [1, 1]
@@ -0,0 +1,126 @@
+from uiglet.culling import Culler
+from uiglet.widget import Widget
+from uiglet.widgetgrid import WidgetGrid
+from uiglet.graphics.primitives import Rectangle
+
+#author Ryan Bailey
+
+SCREEN_HEIGHT = 100
+
+class Box(Widget):
+    def __init__(self, x, y, width, height):
+        super().__init__(x, y, width, height)
+        self.draws = 0
+
+    def draw(self):
+        self.draws += 1
+
+    def mousedOver(self, x, y):
+        return False
+
+#anything with getBounds, given as a (minX, minY, maxX, maxY) box
+class Bounded():
+    def __init__(self, minX, minY, maxX, maxY):
+        self.bounds = (minX, minY, maxX, maxY)
+        self.draws = 0
+
+    def getBounds(self):
+        return self.bounds
+
+    def draw(self):
+        self.draws += 1
+
+def test_things_touching_the_edges_are_visible():
+    culler = Culler(100, 80)
+    #overlapping, inside, touching each edge and corner, and covering the whole viewport
+    for box in [(-10, -10, 5, 5), (10, 10, 20, 20), (-20, 10, 0, 20), (100, 10, 120, 20), (10, -20, 20, 0),
+                (10, 80, 20, 90), (-5, -5, 0, 0), (100, 80, 110, 90), (-50, -50, 200, 200)]:
+        assert culler.isVisible(Bounded(*box))
+    #just past each edge
+    for box in [(-20, 10, -0.5, 20), (100.5, 10, 120, 20), (10, -20, 20, -0.5), (10, 80.5, 20, 90)]:
+        assert not culler.isVisible(Bounded(*box))
+
+def test_widgets_are_tested_with_their_bounding_box():
+    culler = Culler(100, 80)
+    assert culler.isVisible(Box(90, 70, 20, 20))
+    assert culler.isVisible(Box(-20, -20, 20, 20))
+    assert not culler.isVisible(Box(-20, -20, 19, 19))
+    assert not culler.isVisible(Box(101, 0, 10, 10))
+
+def test_primitives_are_tested_where_they_are_drawn():
+    culler = Culler(100, SCREEN_HEIGHT)
+    #screen coordinates have y going down, so y=-20 is above the top of the window
+    rectangle = Rectangle([255, 255, 255, 255], 10, -20, 10, 10, SCREEN_HEIGHT)
+    assert not culler.isVisible(rectangle)
+    rectangle.translateRelative(0, 15)
+    assert culler.isVisible(rectangle)
+    rectangle.rotate(45)
+    assert culler.isVisible(rectangle)
+    rectangle.translateRelative(200, 0)
+    assert not culler.isVisible(rectangle)
+
+def test_pushed_viewports_are_clipped_to_the_one_before():
+    culler = Culler(100, 80)
+    assert culler.getViewport() == (0, 0, 100, 80)
+
+    culler.pushViewport(50, 40, 100, 100)
+    assert culler.getViewport() == (50, 40, 50, 40)
+    assert not culler.isVisible(Bounded(10, 10, 20, 20))
+    assert culler.isVisible(Bounded(60, 50, 70, 60))
+    assert not culler.isVisible(Bounded(110, 50, 120, 60))
+
+    culler.pushViewport(-10, -10, 70, 60)
+    assert culler.getViewport() == (50, 40, 10, 10)
+
+    #a viewport outside the one before it is empty
+    culler.pushViewport(200, 200, 10, 10)
+    assert culler.getViewport()[2:] == (0, 0)
+    assert not culler.isVisible(Bounded(50, 40, 60, 50))
+
+    culler.popViewport()
+    culler.popViewport()
+    assert culler.getViewport() == (50, 40, 50, 40)
+    culler.popViewport()
+    #the window's viewport can't be popped
+    culler.popViewport()
+    assert culler.getViewport() == (0, 0, 100, 80)
+
+def test_resize_changes_the_windows_viewport():
+    culler = Culler(100, 80)
+    thing = Bounded(150, 10, 160, 20)
+    assert not culler.isVisible(thing)
+    culler.resize(200, 80)
+    assert culler.isVisible(thing)
+    assert culler.getViewport() == (0, 0, 200, 80)
+
+def test_drawn_and_culled_are_counted_per_frame():
+    culler = Culler(100, 80)
+    inside = [Bounded(0, 0, 10, 10), Bounded(50, 50, 60, 60)]
+    outside = [Bounded(200, 0, 210, 10)]
+
+    culler.newFrame()
+    culler.draw(inside + outside)
+    assert [thing.draws for thing in inside + outside] == [1, 1, 0]
+    assert culler.lastFrame() == (0, 0)
+
+    found = culler.visible(outside + inside)
+    assert found == inside
+    culler.count(3, 4)
+    culler.newFrame()
+    assert culler.lastFrame() == (2 + 2 + 3, 1 + 1 + 4)
+
+    culler.newFrame()
+    assert culler.lastFrame() == (0, 0)
+
+def test_widget_grid_draws_and_counts_only_visible_widgets():
+    culler = Culler(100, 80)
+    grid = WidgetGrid(cellSize=32)
+    widgets = [Box(0, 0, 10, 10), Box(90, 70, 30, 30), Box(150, 10, 10, 10), Box(10, -40, 10, 10)]
+    for widget in widgets:
+        grid.add(widget)
+
+    culler.newFrame()
+    grid.draw(culler)
+    culler.newFrame()
+    assert [widget.draws for widget in widgets] == [1, 1, 0, 0]
+    assert culler.lastFrame() == (2, 2)
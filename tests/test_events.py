@@ -0,0 +1,110 @@
+from pyglet.window import mouse, key
+
+from uiglet.app import App
+from uiglet.screen import Screen
+from uiglet.events import MouseMotionEvent, MouseDragEvent, MouseScrollEvent, KeyEvent
+
+#author Ryan Bailey
+
+#keeps the events it is given, and copies of them
+class KeepingScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.events = []
+        self.copies = []
+
+    def processInput(self, event):
+        self.events += [event]
+        self.copies += [event.copy()]
+
+    def draw(self):
+        pass
+
+def dragFields(event):
+    return (event.initialLocation(), event.vector(), bool(event.leftButtonDragged()), bool(event.rightButtonDragged()),
+            event.shiftPressed(), event.controlPressed(), event.rawEventCount())
+
+def test_reuse_sets_every_field():
+    motion = MouseMotionEvent(1, 2, 3, 4, 5)
+    assert motion.reuse(10, 20, -1, -2) is motion
+    assert (motion.initialLocation(), motion.vector(), motion.rawEventCount()) == ((10, 20), (-1, -2), 1)
+    assert motion.finalLocation() == (9, 18)
+
+    drag = MouseDragEvent(1, 2, 3, 4, mouse.LEFT | mouse.RIGHT, key.MOD_SHIFT | key.MOD_CTRL, 7)
+    assert drag.reuse(5, 6, 7, 8, mouse.MIDDLE, 0) is drag
+    assert dragFields(drag) == ((5, 6), (7, 8), False, False, False, False, 1)
+    assert drag.middleButtonDragged()
+    assert drag.modifiers() == 0
+    assert drag.type_() == "MOUSE_DRAG"
+
+    scroll = MouseScrollEvent(1, 2, 0, 3)
+    assert scroll.reuse(4, 5, 0, -1) is scroll
+    assert (scroll.mousePosition(), scroll.numberOfScrollClicks()) == ((4, 5), -1)
+
+def test_copies_dont_change_when_the_event_is_reused():
+    motion = MouseMotionEvent(1, 2, 3, 4, 2)
+    motionCopy = motion.copy()
+    motion.reuse(10, 20, 30, 40)
+    assert motionCopy is not motion
+    assert (motionCopy.initialLocation(), motionCopy.vector(), motionCopy.rawEventCount()) == ((1, 2), (3, 4), 2)
+
+    drag = MouseDragEvent(1, 2, 3, 4, mouse.LEFT, key.MOD_SHIFT, 3)
+    dragCopy = drag.copy()
+    drag.reuse(10, 20, 30, 40, mouse.RIGHT, key.MOD_CTRL)
+    assert dragFields(dragCopy) == ((1, 2), (3, 4), True, False, True, False, 3)
+    assert dragFields(drag) == ((10, 20), (30, 40), False, True, False, True, 1)
+
+    scroll = MouseScrollEvent(1, 2, 0, 3)
+    scrollCopy = scroll.copy()
+    scroll.reuse(4, 5, 0, -1)
+    assert (scrollCopy.mousePosition(), scrollCopy.numberOfScrollClicks()) == ((1, 2), 3)
+
+def test_reused_events_dont_keep_state_between_dispatches():
+    app = App(fullscreen=False, width=200, height=150, reuseEvents=True)
+    screen = KeepingScreen()
+    app.addScreen("keep", screen)
+    app.setScreen("keep")
+
+    app.on_mouse_drag(10, 10, 1, 1, mouse.LEFT, key.MOD_SHIFT)
+    app.on_mouse_drag(20, 20, 2, 2, mouse.RIGHT, 0)
+    app.on_mouse_motion(30, 30, 3, 3)
+    app.on_mouse_motion(40, 40, 4, 4)
+    app.on_mouse_scroll(50, 50, 0, 2)
+    app.on_mouse_scroll(60, 60, 0, -1)
+    app.close()
+
+    #the same object is passed for every event of a type
+    drags, motions, scrolls = screen.events[0:2], screen.events[2:4], screen.events[4:6]
+    for pair in [drags, motions, scrolls]:
+        assert pair[0] is pair[1]
+
+    #so only the copies kept during processInput still hold the first event
+    assert dragFields(screen.copies[0]) == ((10, 10), (1, 1), True, False, True, False, 1)
+    assert dragFields(screen.copies[1]) == ((20, 20), (2, 2), False, True, False, False, 1)
+    assert screen.copies[2].initialLocation() == (30, 30)
+    assert screen.copies[3].initialLocation() == (40, 40)
+    assert screen.copies[4].numberOfScrollClicks() == 2
+    assert screen.copies[5].numberOfScrollClicks() == -1
+    assert dragFields(drags[0]) == dragFields(screen.copies[1])
+
+def test_new_events_are_made_by_default():
+    app = App(fullscreen=False, width=200, height=150)
+    screen = KeepingScreen()
+    app.addScreen("keep", screen)
+    app.setScreen("keep")
+
+    app.on_mouse_motion(30, 30, 3, 3)
+    app.on_mouse_motion(40, 40, 4, 4)
+    app.close()
+
+    assert screen.events[0] is not screen.events[1]
+    assert screen.events[0].initialLocation() == (30, 30)
+
+def test_key_events_follow_shift_and_caps_lock():
+    assert KeyEvent(key.A, 0).key() == "a"
+    assert KeyEvent(key.A, key.MOD_SHIFT).key() == "A"
+    assert KeyEvent(key.A, key.MOD_CAPSLOCK).key() == "A"
+    assert KeyEvent(key.A, key.MOD_SHIFT | key.MOD_CAPSLOCK).key() == "a"
+    assert KeyEvent(key.SPACE, key.MOD_SHIFT).key() == "SPACE"
+    assert KeyEvent(key.LSHIFT, 0).shouldBeProcessed() == False
+    assert KeyEvent(key.A, 0).shouldBeProcessed()
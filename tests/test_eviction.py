@@ -0,0 +1,82 @@
+from uiglet.eviction import LRUEvictionPolicy
+
+#author Ryan Bailey
+
+#a screen whose resources are size bytes
+class SizedScreen():
+    def __init__(self, size):
+        self.size = size
+        self.released = False
+
+    def releaseResources(self):
+        self.released = True
+
+    def restoreResources(self):
+        self.released = False
+
+    def resourceSize(self):
+        return 0 if self.released else self.size
+
+def test_least_recently_shown_screens_are_released_first():
+    policy = LRUEvictionPolicy(memoryBudget=100)
+    screens = {name: SizedScreen(40) for name in "ABC"}
+    for name in "ABC":
+        policy.screenShown(name, screens[name])
+
+    #A, B and C use 120 bytes, so A goes
+    assert policy.isReleased("A") and screens["A"].released
+    assert policy.residentScreens() == ["B", "C"]
+
+    #showing A again restores it, and B is now the least recently shown
+    policy.screenShown("A", screens["A"])
+    assert not screens["A"].released
+    assert policy.isReleased("B")
+    assert policy.residentScreens() == ["C", "A"]
+    assert policy.releases() == 2
+
+def test_the_screen_being_shown_is_kept_when_it_is_over_budget():
+    policy = LRUEvictionPolicy(memoryBudget=100)
+    a = SizedScreen(150)
+    policy.screenShown("A", a)
+    assert not a.released
+    assert policy.residentScreens() == ["A"]
+
+def test_prewarming_over_budget_doesnt_release_the_screen_being_shown():
+    policy = LRUEvictionPolicy(memoryBudget=100)
+    a = SizedScreen(150)
+    b = SizedScreen(10)
+    policy.screenShown("A", a)
+    policy.screenBuilt("B", b)
+
+    assert not a.released
+    assert not policy.isReleased("A")
+    #A can't be released, so B is the only one that can be
+    assert b.released
+    assert policy.residentScreens() == ["A"]
+
+def test_prewarmed_screens_are_kept_over_ones_shown_before():
+    policy = LRUEvictionPolicy(maxResidentScreens=2)
+    screens = {name: SizedScreen(1) for name in "ABC"}
+    policy.screenShown("A", screens["A"])
+    policy.screenShown("B", screens["B"])
+    policy.screenBuilt("C", screens["C"])
+
+    #C is likely to be shown next, so A goes rather than C
+    assert policy.isReleased("A")
+    assert not screens["B"].released and not screens["C"].released
+    assert policy.residentScreens() == ["C", "B"]
+
+    #once B isn't being shown it goes before the prewarmed screen
+    policy.screenShown("C", screens["C"])
+    policy.screenShown("A", screens["A"])
+    assert policy.isReleased("B")
+    assert policy.residentScreens() == ["C", "A"]
+
+def test_screens_built_before_any_are_shown():
+    policy = LRUEvictionPolicy(maxResidentScreens=1)
+    a = SizedScreen(1)
+    b = SizedScreen(1)
+    policy.screenBuilt("A", a)
+    policy.screenBuilt("B", b)
+    assert policy.residentScreens() == ["B"]
+    assert a.released
@@ -0,0 +1,122 @@
+import numpy
+import pytest
+
+from uiglet.graphics.instanced import InstancedShape
+from uiglet.graphics.buffers import VertexBuffer
+from uiglet.graphics.primitives import Rectangle
+
+#author Ryan Bailey
+
+COUNT = 10
+
+def makeShape(count=COUNT, screenHeight=48):
+    return InstancedShape(Rectangle([255, 255, 255, 255], 0, 0, 4, 4, screenHeight), count, screenHeight)
+
+#records the [start, stop) range of every buffer update
+@pytest.fixture
+def uploads(monkeypatch):
+    uploads = []
+    update = VertexBuffer.update
+    def recordingUpdate(self, array, start, stop):
+        uploads.append((start, stop))
+        update(self, array, start, stop)
+    monkeypatch.setattr(VertexBuffer, "update", recordingUpdate)
+    return uploads
+
+#the [start, stop) range each selection should send, which has to cover every
+#instance it selects
+SELECTIONS = [
+    (None, (0, COUNT)),
+    (3, (3, 4)),
+    (-1, (COUNT - 1, COUNT)),
+    (numpy.int64(-COUNT), (0, 1)),
+    (slice(2, 5), (2, 5)),
+    (slice(1, 9, 3), (1, 8)),
+    (slice(None, None, -1), (0, COUNT)),
+    (slice(7, 2, -2), (3, 8)),
+    (slice(-2, None, -3), (2, 9)),
+    (slice(-1, -4, -1), (COUNT - 3, COUNT)),
+    ([6, 2, 4], (2, 7)),
+    (numpy.array([-1, 0]), (0, COUNT)),
+    (numpy.arange(COUNT) % 4 == 1, (1, 10)),
+]
+
+@pytest.mark.parametrize("selection, span", SELECTIONS)
+def test_only_the_selected_range_is_uploaded(window, uploads, selection, span):
+    shape = makeShape()
+    shape.draw()
+    assert uploads == []
+
+    shape.setRotations(45, selection)
+    shape.draw()
+    assert uploads == [span]
+
+    expected = numpy.zeros(COUNT)
+    expected[numpy.arange(COUNT)[selection if selection is not None else slice(None)]] = 45
+    assert shape.getRotations().tolist() == expected.tolist()
+    shape.delete()
+
+def test_empty_selections_upload_nothing(window, uploads):
+    shape = makeShape()
+    shape.draw()
+    for selection in [slice(4, 4), slice(2, 6, -1), [], numpy.zeros(COUNT, dtype=bool)]:
+        shape.setRotations(10, selection)
+    shape.draw()
+    assert uploads == []
+    shape.delete()
+
+def test_changes_between_draws_are_merged_per_attribute(window, uploads):
+    shape = makeShape()
+    shape.draw()
+
+    shape.setRotations(1, 2)
+    shape.setRotations(1, slice(6, 8))
+    shape.setRotations(1, [4])
+    shape.draw()
+    assert uploads == [(2, 8)]
+
+    #each attribute keeps its own range
+    uploads.clear()
+    shape.setRotations(1, 0)
+    shape.setColors([255, 0, 0, 255], 9)
+    shape.draw()
+    assert sorted(uploads) == [(0, 1), (9, 10)]
+
+    #nothing is sent again once it has been drawn
+    uploads.clear()
+    shape.draw()
+    assert uploads == []
+    shape.delete()
+
+def test_partial_uploads_are_drawn(window):
+    height = window.height
+    shape = makeShape(4, height)
+    shape.setPositions([5, 15, 25, 35], 10)
+    shape.draw()
+
+    shape.setColors([[255, 0, 0, 255], [0, 255, 0, 255]], [3, 1])
+    shape.translateRelative(0, 20, slice(3, None, -2))
+    window.clear()
+    shape.draw()
+    assert window.pixel(5, 10) == [255, 255, 255, 255]
+    assert window.pixel(15, 30) == [0, 255, 0, 255]
+    assert window.pixel(25, 10) == [255, 255, 255, 255]
+    assert window.pixel(35, 30) == [255, 0, 0, 255]
+    assert window.pixel(35, 10) == [0, 0, 0, 255]
+    shape.delete()
+
+def test_out_of_range_indices_raise_index_error():
+    shape = makeShape()
+    with pytest.raises(IndexError):
+        shape.setRotations(0, COUNT)
+    with pytest.raises(IndexError):
+        shape.setRotations(0, -COUNT - 1)
+
+    empty = makeShape(0)
+    for selection in [0, -1, numpy.int32(0)]:
+        with pytest.raises(IndexError):
+            empty.setRotations(0, selection)
+    #selecting everything in an empty shape is fine
+    empty.setRotations(0)
+    empty.setRotations(0, slice(None, None, -1))
+    assert len(empty) == 0
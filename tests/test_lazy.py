@@ -0,0 +1,55 @@
+import sys
+
+import pytest
+
+from uiglet.lazy import LazyModule
+
+#author Ryan Bailey
+
+@pytest.fixture
+def moduleName(tmp_path, monkeypatch):
+    #a module that hasn't been imported yet, which counts how many times it is run
+    (tmp_path/"lazytarget.py").write_text("imports = globals().get('imports', 0) + 1\n"
+                                          "VALUE = 42\n"
+                                          "def double(x):\n"
+                                          "    return x*2\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, "lazytarget", raising=False)
+    yield "lazytarget"
+    sys.modules.pop("lazytarget", None)
+
+def test_module_is_only_imported_when_an_attribute_is_used(moduleName):
+    module = LazyModule(moduleName)
+    assert moduleName not in sys.modules
+    assert repr(module) == "<LazyModule lazytarget>"
+
+    assert module.VALUE == 42
+    assert moduleName in sys.modules
+    assert module.double(3) == 6
+    assert sys.modules[moduleName].imports == 1
+
+def test_attributes_are_copied_on_first_use(moduleName):
+    module = LazyModule(moduleName)
+    assert "double" not in vars(module)
+    double = module.double
+    assert vars(module)["double"] is double
+    assert double is sys.modules[moduleName].double
+
+    #so later changes to the module aren't seen
+    sys.modules[moduleName].VALUE = 1
+    assert module.VALUE == 1
+    sys.modules[moduleName].VALUE = 2
+    assert module.VALUE == 1
+
+def test_missing_attributes_raise_attribute_error(moduleName):
+    module = LazyModule(moduleName)
+    with pytest.raises(AttributeError):
+        module.missing
+    assert not hasattr(module, "missing")
+    #the LazyModule's own fields never import the module
+    assert not hasattr(LazyModule("doesnt.exist"), "_LazyModule__other")
+
+def test_missing_modules_raise_when_first_used():
+    module = LazyModule("uiglet_no_such_module")
+    with pytest.raises(ImportError):
+        module.anything
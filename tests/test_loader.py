@@ -0,0 +1,144 @@
+import threading
+from time import perf_counter
+
+from uiglet.app import App
+from uiglet.screen import Screen
+from uiglet.loader import ScreenLoader, PREPARING, UPLOADING
+
+#author Ryan Bailey
+
+#a screen whose prepare waits until it is let through, and which counts how many
+#times it has been drawn and switched to
+class SlowScreen(Screen):
+    def __init__(self, steps=3):
+        super().__init__()
+        self.gate = threading.Event()
+        self.steps = steps
+        self.uploaded = 0
+        self.drawn = 0
+        self.shown = 0
+
+    def prepare(self, progress):
+        self.gate.wait(5)
+        progress(1)
+
+    def upload(self):
+        for i in range(self.steps):
+            self.uploaded += 1
+            yield (i + 1)/self.steps
+
+    def likelyNextScreens(self):
+        #only called by App.setScreen, once per switch
+        self.shown += 1
+        return ()
+
+    def draw(self):
+        self.drawn += 1
+
+def makeApp():
+    app = App(width=32, height=32, offscreen=True)
+    screens = {name: SlowScreen() for name in ["first", "a", "b"]}
+    for name, screen in screens.items():
+        app.addScreen(name, screen)
+    screens["first"].gate.set()
+    app.setScreen("first")
+    return (app, screens)
+
+#draws frames until the loader has nothing left to load
+def loadEverything(app):
+    deadline = perf_counter() + 5
+    while app.getLoader().busy():
+        assert perf_counter() < deadline
+        app.renderFrame()
+
+def drawnOnly(app, screens, name):
+    for screen in screens.values():
+        screen.drawn = 0
+    app.renderFrame()
+    return [other for other, screen in screens.items() if screen.drawn] == [name]
+
+def test_set_screen_async_switches_once_the_screen_is_loaded():
+    app, screens = makeApp()
+    progress = []
+    app.setScreenAsync("a", lambda stage, fraction: progress.append((stage, fraction)))
+    app.renderFrame()
+    #the current screen keeps being drawn while a loads
+    assert drawnOnly(app, screens, "first")
+
+    screens["a"].gate.set()
+    loadEverything(app)
+    assert screens["a"].isPrepared()
+    assert screens["a"].shown == 1
+    assert drawnOnly(app, screens, "a")
+    assert progress[0] == (PREPARING, 1)
+    assert progress[1:] == [(UPLOADING, 1/3), (UPLOADING, 2/3), (UPLOADING, 1)]
+    app.close()
+
+def test_set_screen_while_loading_isnt_undone_by_the_load():
+    app, screens = makeApp()
+    app.setScreenAsync("a")
+    screens["b"].gate.set()
+    app.setScreen("b")
+    assert drawnOnly(app, screens, "b")
+
+    screens["a"].gate.set()
+    loadEverything(app)
+    #a was still loaded, but b was asked for since
+    assert screens["a"].isPrepared()
+    assert screens["a"].shown == 0
+    assert drawnOnly(app, screens, "b")
+    app.close()
+
+def test_only_the_last_async_screen_is_switched_to():
+    app, screens = makeApp()
+    app.setScreenAsync("a")
+    app.setScreenAsync("b")
+    screens["a"].gate.set()
+    screens["b"].gate.set()
+    loadEverything(app)
+
+    assert screens["a"].shown == 0
+    assert screens["b"].shown == 1
+    assert drawnOnly(app, screens, "b")
+    app.close()
+
+def test_set_screen_finishes_a_load_in_flight_without_switching_twice():
+    app, screens = makeApp()
+    app.setScreenAsync("a")
+    screens["a"].gate.set()
+    app.setScreen("a")
+
+    assert screens["a"].uploaded == 3
+    assert screens["a"].shown == 1
+    assert not app.getLoader().busy()
+    assert drawnOnly(app, screens, "a")
+    app.close()
+
+def test_finish_doesnt_call_on_ready():
+    loader = ScreenLoader()
+    screen = SlowScreen()
+    ready = []
+    loader.load(screen, onReady=ready.append)
+    screen.gate.set()
+    loader.finish(screen)
+
+    assert screen.isPrepared()
+    assert screen.uploaded == 3
+    assert not loader.isLoading(screen)
+    assert ready == []
+    loader.shutdown()
+
+def test_update_calls_on_ready():
+    loader = ScreenLoader()
+    screen = SlowScreen()
+    ready = []
+    loader.load(screen, onReady=ready.append)
+    screen.gate.set()
+    deadline = perf_counter() + 5
+    while loader.busy():
+        assert perf_counter() < deadline
+        loader.update()
+
+    assert screen.isPrepared()
+    assert ready == [screen]
+    loader.shutdown()
@@ -0,0 +1,99 @@
+import pytest
+
+from uiglet.app import App
+from uiglet.screen import Screen
+from uiglet.graphics.capture import FrameCapture
+from uiglet.graphics.primitives import Rectangle
+from uiglet.errors import FrameCaptureError
+from uiglet.lazy import gl
+
+#author Ryan Bailey
+
+class SquareScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.square = None
+
+    def resize(self, width, height):
+        super().resize(width, height)
+        self.square = Rectangle([255, 0, 0, 255], 0, 0, 10, 10, height)
+
+    def draw(self):
+        self.square.draw()
+
+def makeApp(**arguments):
+    app = App(clearColor=(0, 0, 255, 255), offscreen=True, **arguments)
+    app.addScreen("square", SquareScreen())
+    app.setScreen("square")
+    return app
+
+def test_offscreen_app_without_a_size_uses_the_windows():
+    app = makeApp()
+    assert app.isOffscreen()
+    assert app.getFramebuffer().getSize() == (app.width, app.height)
+    app.close()
+
+def test_capture_reads_frames_top_row_first():
+    frames = []
+    app = makeApp(width=64, height=48)
+    app.setCapture(FrameCapture(64, 48, onFrame=lambda pixels, frame: frames.append((frame, pixels.copy()))))
+    for i in range(3):
+        app.renderFrame(1/60)
+    app.getCapture().flush()
+    app.close()
+
+    assert [frame for frame, pixels in frames] == [0, 1, 2]
+    pixels = frames[-1][1]
+    assert pixels.shape == (48, 64, 4)
+    #the square is in the top left corner, and everything else is the clear color
+    assert (pixels[:10, :10] == (255, 0, 0, 255)).all()
+    assert (pixels[10:, :] == (0, 0, 255, 255)).all()
+    assert (pixels[:, 10:] == (0, 0, 255, 255)).all()
+
+def test_capture_raises_if_a_frame_cant_be_mapped(monkeypatch):
+    frames = []
+    app = makeApp(width=64, height=48)
+    app.setCapture(FrameCapture(64, 48, onFrame=lambda pixels, frame: frames.append(frame)))
+    app.renderFrame()
+    monkeypatch.setattr(gl, "glMapBuffer", lambda target, access: None)
+    with pytest.raises(FrameCaptureError):
+        app.renderFrame()
+    monkeypatch.undo()
+    #the app's framebuffer isn't left bound
+    framebuffer = gl.GLint()
+    gl.glGetIntegerv(gl.GL_FRAMEBUFFER_BINDING, framebuffer)
+    assert framebuffer.value == 0
+
+    #the frame that couldn't be read is dropped, and capturing carries on
+    app.renderFrame()
+    app.getCapture().flush()
+    app.close()
+    assert frames == [1, 2]
+
+def test_replacing_a_capture_hands_over_its_frames_and_frees_it():
+    first = []
+    second = []
+    app = makeApp(width=64, height=48)
+    old = FrameCapture(64, 48, onFrame=lambda pixels, frame: first.append(frame))
+    app.setCapture(old)
+    app.renderFrame()
+    app.renderFrame()
+    assert old.resourceSize() > 0
+
+    new = FrameCapture(64, 48, onFrame=lambda pixels, frame: second.append(frame))
+    app.setCapture(new)
+    assert first == [0, 1]
+    assert old.resourceSize() == 0
+
+    #setting the same capture again doesn't flush it
+    app.renderFrame()
+    app.setCapture(new)
+    assert second == []
+    assert new.resourceSize() > 0
+
+    app.setCapture(None)
+    assert second == [0]
+    assert new.resourceSize() == 0
+    app.renderFrame()
+    assert first == [0, 1] and second == [0]
+    app.close()
@@ -0,0 +1,76 @@
+import time
+
+import pyglet
+
+from uiglet.app import App, REDRAW_WHEN_INVALID
+from uiglet.screen import Screen
+
+#author Ryan Bailey
+
+class CountingScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.updates = 0
+
+    def update(self, dt):
+        self.updates += 1
+
+    def draw(self):
+        pass
+
+def makeApp(**arguments):
+    app = App(width=32, height=32, offscreen=True, **arguments)
+    screen = CountingScreen()
+    app.addScreen("counting", screen)
+    app.setScreen("counting")
+    return (app, screen)
+
+#runs pyglet's loop for the app, calling each of steps (after, function) once after
+#seconds have passed, and stopping after the last
+def runFor(app, steps):
+    for after, function in steps:
+        pyglet.clock.schedule_once(lambda dt, function=function: function(), after)
+    pyglet.clock.schedule_once(lambda dt: pyglet.app.exit(), steps[-1][0] + 0.01)
+    app.run()
+
+def test_ticking_by_hand_doesnt_schedule_the_app():
+    app, screen = makeApp()
+    app.renderFrame(1/60)
+    assert screen.updates == 1
+    assert app.currentFps() == None
+
+    app.close()
+    time.sleep(0.1)
+    pyglet.clock.tick()
+    assert screen.updates == 1
+
+def test_closing_the_app_stops_it_being_ticked():
+    app, screen = makeApp()
+    fps = []
+    runFor(app, [(0.05, lambda: fps.append(app.currentFps()))])
+    assert fps == [60]
+    assert app.currentFps() == None
+
+    updates = screen.updates
+    app.close()
+    time.sleep(0.1)
+    pyglet.clock.tick()
+    assert screen.updates == updates
+
+def test_frame_rate_drops_while_unfocused_or_idle():
+    app, screen = makeApp(redrawMode=REDRAW_WHEN_INVALID, unfocusedFps=20, idleFps=10, idleTimeout=0.1)
+    fps = []
+    record = lambda: fps.append(app.currentFps())
+    runFor(app, [
+        (0.02, record),
+        (0.03, app.on_deactivate),
+        (0.04, record),
+        (0.05, app.on_activate),
+        (0.06, record),
+        #nothing has happened for longer than idleTimeout, so the next tick slows down
+        (0.3, record),
+        (0.31, lambda: app.on_mouse_motion(1, 1, 1, 1)),
+        (0.32, record),
+    ])
+    app.close()
+    assert fps == [60, 20, 60, 10, 60]
@@ -0,0 +1,68 @@
+import numpy
+
+from uiglet.graphics.polyline import Polyline
+
+#author Ryan Bailey
+
+SCREEN_HEIGHT = 100
+
+def makeLine(capacity, decimate=False):
+    return Polyline([255, 255, 255, 255], 2, capacity, SCREEN_HEIGHT, decimate=decimate)
+
+def test_append_past_capacity_keeps_the_newest_points_in_order():
+    line = makeLine(5)
+    for i in range(12):
+        line.append(i, i*2)
+        newest = numpy.arange(max(0, i - 4), i + 1)
+        assert len(line) == len(newest)
+        assert line.getPoints()[:, 0].tolist() == newest.tolist()
+        assert line.getPoints()[:, 1].tolist() == (SCREEN_HEIGHT - newest*2).tolist()
+
+def test_append_in_chunks_wraps_like_a_queue():
+    line = makeLine(7)
+    expected = []
+    x = 0
+    for size in [3, 1, 5, 0, 9, 2, 7, 4, 13, 1]:
+        xs = list(range(x, x + size))
+        x += size
+        line.append(xs, [0]*size)
+        expected = (expected + xs)[-7:]
+        assert line.getPoints()[:, 0].tolist() == expected
+
+#after the ring has wrapped the segments drawn have to join each point to the next
+#one, oldest to newest, which is what the index buffer being doubled over the ring is for
+def test_triangles_join_consecutive_points_after_wrapping():
+    line = makeLine(6)
+    for chunk in range(5):
+        line.append(numpy.arange(chunk*4, chunk*4 + 4), numpy.zeros(4))
+        points = line.getPoints()
+        #points go into the ring's slots in turn from slot 0, so this is the oldest's slot
+        start = (chunk*4 + 4 - len(points)) % 6
+        triangles = line.getTriangles().reshape(-1, 6)
+        assert len(triangles) == len(points) - 1
+        for segment, indices in enumerate(triangles):
+            slots = set((indices//2).tolist())
+            assert slots == {(start + segment) % 6, (start + segment + 1) % 6}
+
+def test_decimation_keeps_each_columns_first_lowest_highest_and_last_points():
+    random = numpy.random.default_rng(0)
+    xs = numpy.sort(random.uniform(0, 20, 2000)).astype(numpy.float32)
+    ys = random.uniform(0, 100, 2000).astype(numpy.float32)
+
+    line = makeLine(1000, decimate=True)
+    #appended in uneven chunks so that columns are split between appends
+    for chunk in numpy.array_split(numpy.arange(2000), [3, 50, 51, 400, 1234, 1999]):
+        line.append(xs[chunk], ys[chunk])
+
+    kept = line.getPoints()
+    assert (numpy.diff(kept[:, 0]) >= 0).all()
+    columns = numpy.floor(xs).astype(int)
+    keptColumns = numpy.floor(kept[:, 0]).astype(int)
+    for column in numpy.unique(columns):
+        inColumn = SCREEN_HEIGHT - ys[columns == column]
+        keptY = kept[keptColumns == column, 1]
+        assert 2 <= len(keptY) <= 4
+        assert keptY.min() == inColumn.min()
+        assert keptY.max() == inColumn.max()
+        assert keptY[0] == inColumn[0]
+        assert keptY[-1] == inColumn[-1]
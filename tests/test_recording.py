@@ -0,0 +1,101 @@
+import pytest
+import pyglet
+from pyglet.event import EventDispatcher
+
+from uiglet.app import App
+from uiglet.screen import Screen
+from uiglet import recording
+from uiglet.recording import InputRecorder, InputReplayer, readRecording, FORMATS, HEADER, RECORD, MAGIC, MOUSE_MOTION
+from uiglet.errors import RecordingFormatError
+
+#author Ryan Bailey
+
+#every field of an event that a screen can read
+FIELDS = ["type_", "position", "modifiers", "location", "vector", "rawEventCount",
+          "numberOfScrollClicks", "symbol", "leftButtonPressed", "rightButtonDragged"]
+
+class LoggingScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.log = []
+
+    def processInput(self, event):
+        self.log += [tuple((name, getattr(event, name)()) for name in FIELDS if hasattr(event, name))]
+
+    def draw(self):
+        pass
+
+def makeApp():
+    app = App(fullscreen=False, width=200, height=150)
+    screen = LoggingScreen()
+    app.addScreen("log", screen)
+    app.setScreen("log")
+    return (app, screen)
+
+#(pyglet event, arguments), as pyglet's loop would send them
+EVENTS = [("on_mouse_motion", (10, 20, 1, -2)),
+          ("on_mouse_press", (10, 20, pyglet.window.mouse.LEFT, 0)),
+          ("on_mouse_drag", (-5, 160, -15, 140, pyglet.window.mouse.RIGHT, pyglet.window.key.MOD_SHIFT)),
+          ("on_mouse_release", (-5, 160, pyglet.window.mouse.RIGHT, 0)),
+          ("on_mouse_scroll", (50, 60, 0.0, -1.5)),
+          ("on_key_press", (pyglet.window.key.A, pyglet.window.key.MOD_CTRL)),
+          ("on_draw", ()),
+          ("on_mouse_motion", (199, 149, 3, 4))]
+
+def test_replayed_events_match_the_recorded_ones(tmp_path):
+    path = str(tmp_path/"session.rec")
+    app, screen = makeApp()
+    recorder = InputRecorder(app, path)
+    for event, arguments in EVENTS:
+        EventDispatcher.dispatch_event(app, event, *arguments)
+    recorder.stop()
+    app.close()
+    assert recorder.records() == len(EVENTS)
+
+    width, height, records = readRecording(path)
+    assert (width, height) == (200, 150)
+    for (event, arguments), (kind, seconds, recorded) in zip(EVENTS, records):
+        assert FORMATS[kind][0] == event
+        assert recorded == arguments
+        assert [type(value) for value in recorded] == [type(value) for value in arguments]
+
+    replayApp, replayScreen = makeApp()
+    InputReplayer(replayApp, path).run()
+    replayApp.close()
+    assert replayScreen.log == screen.log
+    assert len(screen.log) == len(EVENTS) - 1
+
+def test_long_gaps_between_events_are_kept(tmp_path, monkeypatch):
+    path = str(tmp_path/"long.rec")
+    clock = [1000.0]
+    monkeypatch.setattr(recording.time, "perf_counter", lambda: clock[0])
+    app, screen = makeApp()
+    recorder = InputRecorder(app, path)
+    #more than 2**32 microseconds (about 71 minutes) between the events
+    for gap in [1.5, 3*60*60, 0.25]:
+        clock[0] += gap
+        EventDispatcher.dispatch_event(app, "on_mouse_motion", 1, 2, 3, 4)
+    recorder.stop()
+    app.close()
+
+    width, height, records = readRecording(path)
+    assert [round(seconds, 6) for kind, seconds, arguments in records] == [1.5, 1.5 + 3*60*60, 1.75 + 3*60*60]
+
+def test_reading_something_that_isnt_a_recording_raises(tmp_path):
+    motion = RECORD.pack(MOUSE_MOTION, 10) + FORMATS[MOUSE_MOTION][1].pack(1, 2, 3, 4)
+    files = {"empty": b"",
+             "text": b"not a recording at all",
+             "old": HEADER.pack(b"UIGLREC2", 200, 150) + motion,
+             "short header": HEADER.pack(MAGIC, 200, 150)[:-2],
+             "cut record": HEADER.pack(MAGIC, 200, 150) + motion[:-3],
+             "cut kind": HEADER.pack(MAGIC, 200, 150) + motion + motion[:2],
+             "unknown kind": HEADER.pack(MAGIC, 200, 150) + RECORD.pack(99, 10)}
+    for name, data in files.items():
+        path = tmp_path/name
+        path.write_bytes(data)
+        with pytest.raises(RecordingFormatError):
+            readRecording(str(path))
+
+    path = tmp_path/"good"
+    path.write_bytes(HEADER.pack(MAGIC, 200, 150) + motion)
+    assert readRecording(str(path)) == (200, 150, [(MOUSE_MOTION, 0.00001, (1, 2, 3, 4))])
@@ -0,0 +1,117 @@
+import numpy
+import pyglet
+from pyglet import gl
+
+from uiglet.app import App, ALWAYS_REDRAW, REDRAW_WHEN_INVALID
+from uiglet.screen import Screen
+from uiglet.graphics.primitives import Rectangle
+
+#author Ryan Bailey
+
+WIDTH = 64
+HEIGHT = 48
+
+#fills the window with color, and counts how many times it is drawn
+class FillScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.color = [255, 0, 0, 255]
+        self.draws = 0
+
+    def draw(self):
+        Rectangle(self.color, 0, 0, WIDTH, HEIGHT, HEIGHT).draw()
+        self.draws += 1
+
+def makeApp(redrawMode, scissorDamage=False):
+    app = App(redrawMode=redrawMode, scissorDamage=scissorDamage, width=WIDTH, height=HEIGHT, offscreen=True)
+    screen = FillScreen()
+    app.addScreen("fill", screen)
+    app.setScreen("fill")
+    return (app, screen)
+
+#what the app's framebuffer holds, with the bottom row first, like opengl coordinates
+def readFramebuffer(app):
+    pixels = numpy.empty((HEIGHT, WIDTH, 4), dtype=numpy.uint8)
+    framebuffer = app.getFramebuffer()
+    framebuffer.bind()
+    gl.glReadPixels(0, 0, WIDTH, HEIGHT, gl.GL_RGBA, gl.GL_UNSIGNED_BYTE, pixels.ctypes.data)
+    framebuffer.unbind()
+    return pixels
+
+def countFlips(monkeypatch):
+    flips = []
+    flip = pyglet.window.Window.flip
+    monkeypatch.setattr(pyglet.window.Window, "flip", lambda window: flips.append(window) or flip(window))
+    return flips
+
+def test_always_redraw_paints_and_flips_every_frame(monkeypatch):
+    flips = countFlips(monkeypatch)
+    app, screen = makeApp(ALWAYS_REDRAW)
+    for i in range(3):
+        app.renderFrame()
+    app.close()
+    assert screen.draws == 3
+    assert len(flips) == 3
+    assert app.renderedFrames() == 3 and app.skippedFrames() == 0
+
+def test_redraw_when_invalid_skips_the_paint_and_the_flip(monkeypatch):
+    flips = countFlips(monkeypatch)
+    app, screen = makeApp(REDRAW_WHEN_INVALID)
+    app.renderFrame() #the screen starts off invalid
+    app.renderFrame()
+    app.renderFrame()
+    assert screen.draws == 1
+    assert len(flips) == 1
+    assert app.renderedFrames() == 1 and app.skippedFrames() == 2
+
+    screen.invalidate()
+    app.renderFrame()
+    app.close()
+    assert screen.draws == 2
+    assert len(flips) == 2
+
+def test_scissor_covers_this_frames_and_last_frames_damage():
+    app, screen = makeApp(REDRAW_WHEN_INVALID, scissorDamage=True)
+    app.renderFrame()
+    assert (readFramebuffer(app) == (255, 0, 0, 255)).all()
+
+    #damage is (x, y, width, height) in opengl coordinates. the frame before was
+    #painted all over, so this one is too
+    screen.color = [0, 255, 0, 255]
+    screen.invalidate((2, 3, 4, 5))
+    app.renderFrame()
+    assert (readFramebuffer(app) == (0, 255, 0, 255)).all()
+
+    #from now on the box around this frame's damage and last frame's is painted
+    screen.color = [0, 0, 255, 255]
+    screen.invalidate((30, 20, 10, 6))
+    app.renderFrame()
+    pixels = readFramebuffer(app)
+    painted = numpy.zeros((HEIGHT, WIDTH), dtype=bool)
+    painted[3:26, 2:40] = True
+    assert (pixels[painted] == (0, 0, 255, 255)).all()
+    assert (pixels[~painted] == (0, 255, 0, 255)).all()
+
+    screen.color = [255, 255, 255, 255]
+    screen.invalidate((50, 40, 4, 4))
+    screen.invalidate((50, 30, 2, 2)) #damage in one frame adds up
+    app.renderFrame()
+    pixels = readFramebuffer(app)
+    app.close()
+    painted = numpy.zeros((HEIGHT, WIDTH), dtype=bool)
+    painted[20:44, 30:54] = True
+    assert (pixels[painted] == (255, 255, 255, 255)).all()
+    assert (pixels[~painted] != (255, 255, 255, 255)).any(axis=1).all()
+
+def test_invalidating_the_whole_screen_turns_the_scissor_off():
+    app, screen = makeApp(REDRAW_WHEN_INVALID, scissorDamage=True)
+    app.renderFrame()
+    screen.color = [0, 255, 0, 255]
+    screen.invalidate((0, 0, 4, 4))
+    app.renderFrame()
+    screen.color = [0, 0, 255, 255]
+    screen.invalidate()
+    app.renderFrame()
+    pixels = readFramebuffer(app)
+    app.close()
+    assert (pixels == (0, 0, 255, 255)).all()
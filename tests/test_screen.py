@@ -0,0 +1,134 @@
+from pyglet.window import mouse, key
+
+from uiglet.app import App
+from uiglet.screen import Screen
+from uiglet.widget import Widget
+from uiglet.events import (MouseClickEvent, MouseMotionEvent, KeyEvent, MOUSE_CLICK, MOUSE_RELEASE, MOUSE_MOTION,
+                           MOUSE_SCROLL, KEY_PRESS)
+
+#author Ryan Bailey
+
+#only uses subscribe
+class SubscribingScreen(Screen):
+    def draw(self):
+        pass
+
+#subscribes and also has a catch-all processInput
+class CatchAllScreen(Screen):
+    def __init__(self):
+        super().__init__()
+        self.caught = []
+
+    def processInput(self, event):
+        self.caught += [event.type_()]
+
+    def draw(self):
+        pass
+
+class Square(Widget):
+    def draw(self):
+        pass
+
+    def mousedOver(self, x, y):
+        left, bottom, width, height = self.boundingBox()
+        return left <= x < left + width and bottom <= y < bottom + height
+
+def recorder(log, name, consume=False):
+    def handler(event):
+        log.append(name)
+        return consume
+    return handler
+
+def test_events_only_go_to_handlers_of_their_type():
+    screen = SubscribingScreen()
+    log = []
+    screen.subscribe(MOUSE_CLICK, recorder(log, "click"))
+    screen.subscribe(KEY_PRESS, recorder(log, "key"))
+
+    screen.dispatch(MouseClickEvent(1, 1, mouse.LEFT, 0))
+    screen.dispatch(KeyEvent(key.A, 0))
+    #nothing is subscribed to motion, and there's no processInput to fall back to
+    screen.dispatch(MouseMotionEvent(1, 1, 1, 1))
+    assert log == ["click", "key"]
+
+def test_handlers_are_called_in_order_until_one_consumes_the_event():
+    screen = CatchAllScreen()
+    log = []
+    screen.subscribe(MOUSE_CLICK, recorder(log, "first"))
+    second = recorder(log, "second", consume=True)
+    screen.subscribe(MOUSE_CLICK, second)
+    screen.subscribe(MOUSE_CLICK, recorder(log, "third"))
+
+    screen.dispatch(MouseClickEvent(1, 1, mouse.LEFT, 0))
+    assert log == ["first", "second"]
+    assert screen.caught == []
+
+    screen.unsubscribe(MOUSE_CLICK, second)
+    log.clear()
+    screen.dispatch(MouseClickEvent(1, 1, mouse.LEFT, 0))
+    assert log == ["first", "third"]
+    #nothing consumed it, so processInput gets it too
+    assert screen.caught == [MOUSE_CLICK]
+
+def test_regions_limit_handlers_to_events_inside_them():
+    screen = CatchAllScreen()
+    log = []
+    screen.subscribe(MOUSE_CLICK, recorder(log, "rect", consume=True), (10, 10, 20, 20))
+    screen.subscribe(MOUSE_CLICK, recorder(log, "widget", consume=True), Square(50, 50, 10, 10))
+    screen.subscribe(KEY_PRESS, recorder(log, "key with region"), (0, 0, 100, 100))
+
+    for x, y in [(10, 10), (29, 29), (30, 30), (9, 15), (55, 55), (60, 55), (0, 0)]:
+        screen.dispatch(MouseClickEvent(x, y, mouse.LEFT, 0))
+    assert log == ["rect", "rect", "widget"]
+    assert screen.caught == [MOUSE_CLICK]*4
+
+    #key presses have no position so handlers with a region never get them
+    screen.dispatch(KeyEvent(key.A, 0))
+    assert log == ["rect", "rect", "widget"]
+    assert screen.caught[-1] == KEY_PRESS
+
+def test_handlers_can_subscribe_while_an_event_is_dispatched():
+    screen = SubscribingScreen()
+    log = []
+    def subscribeAnother(event):
+        log.append("first")
+        screen.subscribe(MOUSE_CLICK, recorder(log, "added"))
+        screen.unsubscribe(MOUSE_CLICK, subscribeAnother)
+    screen.subscribe(MOUSE_CLICK, subscribeAnother)
+    screen.subscribe(MOUSE_CLICK, recorder(log, "second"))
+
+    screen.dispatch(MouseClickEvent(1, 1, mouse.LEFT, 0))
+    assert log == ["first", "second"]
+    screen.dispatch(MouseClickEvent(1, 1, mouse.LEFT, 0))
+    assert log == ["first", "second", "second", "added"]
+
+def test_wants_event():
+    subscribing = SubscribingScreen()
+    assert not subscribing.wantsEvent(MOUSE_CLICK)
+    handler = recorder([], "click")
+    subscribing.subscribe(MOUSE_CLICK, handler)
+    assert subscribing.wantsEvent(MOUSE_CLICK)
+    assert not subscribing.wantsEvent(MOUSE_MOTION)
+    subscribing.unsubscribe(MOUSE_CLICK, handler)
+    assert not subscribing.wantsEvent(MOUSE_CLICK)
+
+    #a screen with processInput wants everything
+    catchAll = CatchAllScreen()
+    for eventType in [MOUSE_CLICK, MOUSE_RELEASE, MOUSE_MOTION, MOUSE_SCROLL, KEY_PRESS]:
+        assert catchAll.wantsEvent(eventType)
+
+def test_app_only_dispatches_events_the_screen_wants():
+    app = App(fullscreen=False, width=200, height=150)
+    screen = SubscribingScreen()
+    clicks = []
+    screen.subscribe(MOUSE_CLICK, lambda event: clicks.append(event.position()))
+    app.addScreen("subscribing", screen)
+    app.setScreen("subscribing")
+
+    app.on_mouse_motion(5, 5, 1, 1)
+    app.on_mouse_scroll(5, 5, 0, 1)
+    app.on_key_press(key.A, 0)
+    app.on_mouse_press(7, 8, mouse.LEFT, 0)
+    app.on_mouse_release(7, 8, mouse.LEFT, 0)
+    app.close()
+    assert clicks == [(7, 8)]
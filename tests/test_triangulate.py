@@ -0,0 +1,93 @@
+import math
+import numpy
+
+from uiglet.graphics.triangulate import triangulate, TriangulationCache
+
+#author Ryan Bailey
+
+#an L, turning right at one corner so that it is concave
+L_SHAPE = [(0, 0), (3, 0), (3, 1), (1, 1), (1, 3), (0, 3)]
+
+#two triangles that touch at (1, 1), drawn as one outline
+BOWTIE = [(0, 0), (2, 0), (1, 1), (2, 2), (0, 2), (1, 1)]
+
+#a square with a square hole, cut into it along a seam from the left edge
+KEYHOLE = [(0, 0), (4, 0), (4, 4), (0, 4), (0, 2), (1, 2), (1, 3), (3, 3), (3, 1), (1, 1), (1, 2), (0, 2)]
+
+#an L with extra vertices partway along its edges, starting at one that can't see
+#every other vertex
+COLLINEAR = [(2, 0), (3, 0), (3, 1), (2, 1), (1, 1), (1, 2), (1, 3), (0, 3), (0, 2), (0, 1), (0, 0), (1, 0)]
+
+def star(points, outer, inner):
+    angles = numpy.arange(points*2)*math.pi/points
+    radii = numpy.where(numpy.arange(points*2) % 2 == 0, outer, inner)
+    return numpy.stack((radii*numpy.cos(angles), radii*numpy.sin(angles)), axis=1)
+
+def shoelaceArea(vertices):
+    x, y = numpy.asarray(vertices, dtype=numpy.float64).T
+    return abs(numpy.dot(x, numpy.roll(y, -1)) - numpy.dot(numpy.roll(x, -1), y))/2
+
+#the area covered by the triangles, counting overlaps twice
+def triangleArea(vertices, indices):
+    a, b, c = numpy.asarray(vertices, dtype=numpy.float64)[numpy.asarray(indices).reshape(-1, 3)].transpose(1, 0, 2)
+    return numpy.abs((b[:, 0] - a[:, 0])*(c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1])*(c[:, 0] - a[:, 0])).sum()/2
+
+def checkCovers(vertices):
+    indices = triangulate(vertices)
+    assert len(indices) % 3 == 0
+    assert indices.min() >= 0 and indices.max() < len(vertices)
+    assert math.isclose(triangleArea(vertices, indices), shoelaceArea(vertices), rel_tol=1e-9)
+    return indices
+
+def test_convex():
+    checkCovers([(0, 0), (4, 0), (5, 2), (2, 5), (-1, 2)])
+
+def test_concave():
+    checkCovers(L_SHAPE)
+    checkCovers(L_SHAPE[::-1])
+
+def test_touching_bowtie():
+    indices = checkCovers(BOWTIE)
+    assert len(indices) == 6
+
+def test_hole_seam():
+    checkCovers(KEYHOLE)
+    checkCovers(KEYHOLE[::-1])
+
+def test_collinear():
+    checkCovers(COLLINEAR)
+
+def test_star():
+    for points in [5, 7, 12]:
+        checkCovers(star(points, 100, 40))
+
+def test_cache_hits_the_same_shape_anywhere():
+    cache = TriangulationCache()
+    first = cache.get(L_SHAPE)
+    assert cache.stats() == (0, 1)
+    assert cache.get(L_SHAPE) is first
+    #moved, and off by less than the key is rounded to
+    moved = numpy.array(L_SHAPE, dtype=numpy.float64) + (100.25, -40) + 1e-5
+    assert cache.get(moved) is first
+    assert cache.stats() == (2, 1)
+    assert not first.flags.writeable
+
+    cache.get(BOWTIE)
+    assert cache.stats() == (2, 2)
+    assert len(cache) == 2
+
+def test_cache_evicts_the_least_recently_used():
+    cache = TriangulationCache(maxSize=2)
+    cache.get(L_SHAPE)
+    cache.get(BOWTIE)
+    cache.get(L_SHAPE) #the bowtie is now the least recently used
+    cache.get(KEYHOLE)
+    assert len(cache) == 2
+    hits, misses = cache.stats()
+    cache.get(L_SHAPE)
+    assert cache.stats() == (hits + 1, misses)
+    cache.get(BOWTIE)
+    assert cache.stats() == (hits + 1, misses + 1)
+
+    cache.clear()
+    assert len(cache) == 0
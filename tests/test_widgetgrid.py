@@ -0,0 +1,150 @@
+import pytest
+
+from uiglet.widget import Widget
+from uiglet.widgetgrid import WidgetGrid
+from uiglet.errors import WidgetSizeError
+
+#author Ryan Bailey
+
+class Box(Widget):
+    def draw(self):
+        pass
+
+    def mousedOver(self, x, y):
+        left, bottom, width, height = self.boundingBox()
+        return left <= x <= left + width and bottom <= y <= bottom + height
+
+class Circle(Box):
+    #only the circle inside the bounding box counts as moused over
+    def mousedOver(self, x, y):
+        left, bottom, width, height = self.boundingBox()
+        centreX = left + width/2
+        centreY = bottom + height/2
+        return (x - centreX)**2 + (y - centreY)**2 <= (width/2)**2
+
+class Parent():
+    def __init__(self):
+        self.invalidated = []
+
+    def invalidate(self, rect=None):
+        self.invalidated += [rect]
+
+def bruteForceAt(widgets, x, y):
+    return [widget for widget in widgets if widget.mousedOver(x, y)]
+
+def bruteForceIn(widgets, x, y, width, height):
+    found = []
+    for widget in widgets:
+        left, bottom, widgetWidth, widgetHeight = widget.boundingBox()
+        if left <= x + width and x <= left + widgetWidth and bottom <= y + height and y <= bottom + widgetHeight:
+            found += [widget]
+    return found
+
+def makeWidgets():
+    return [
+        Box(0, 0, 10, 10),
+        Box(60, 60, 10, 10), #on the corner of four cells
+        Box(5, 5, 200, 20), #spans several columns
+        Circle(100, 100, 40, 40),
+        Box(-50, -50, 20, 20), #in negative cells
+        Box(63, 0, 1, 1), #ends exactly on a cell edge
+    ]
+
+def test_widgets_at_matches_testing_every_widget():
+    widgets = makeWidgets()
+    grid = WidgetGrid(cellSize=32)
+    for widget in widgets:
+        grid.add(widget)
+
+    for x in range(-60, 220, 3):
+        for y in range(-60, 150, 3):
+            assert grid.widgetsAt(x, y) == bruteForceAt(widgets, x, y)
+    #points on edges and corners of cells and widgets
+    for x, y in [(0, 0), (10, 10), (64, 0), (64, 1), (63, 1), (70, 70), (64, 64), (205, 25), (-30, -30)]:
+        assert grid.widgetsAt(x, y) == bruteForceAt(widgets, x, y)
+
+def test_widgets_at_checks_mousedover_and_keeps_draw_order():
+    grid = WidgetGrid()
+    circle = Circle(0, 0, 20, 20)
+    box = Box(0, 0, 20, 20)
+    grid.add(circle)
+    grid.add(box)
+
+    assert grid.widgetsAt(10, 10) == [circle, box]
+    #inside the bounding box but outside the circle
+    assert grid.widgetsAt(1, 1) == [box]
+    assert grid.widgetsAt(50, 50) == []
+
+def test_widgets_in_matches_testing_every_widget():
+    widgets = makeWidgets()
+    grid = WidgetGrid(cellSize=32)
+    for widget in widgets:
+        grid.add(widget)
+
+    for rect in [(0, 0, 64, 48), (-100, -100, 400, 400), (61, 61, 2, 2), (70, 70, 0, 0), (150, 0, 10, 10),
+                 (-40, -40, 5, 5), (300, 300, 10, 10), (11, 11, 48, 48), (64, 0, 0, 0)]:
+        assert grid.widgetsIn(*rect) == bruteForceIn(widgets, *rect)
+
+def test_widget_moved_updates_cells_and_invalidates_both_boxes():
+    parent = Parent()
+    grid = WidgetGrid(parent, cellSize=32)
+    widget = Box(0, 0, 10, 10)
+    other = Box(100, 100, 10, 10)
+    grid.add(widget)
+    grid.add(other)
+    parent.invalidated = []
+
+    widget.moveTo(200, 5)
+    assert grid.widgetsAt(5, 5) == []
+    assert grid.widgetsAt(205, 10) == [widget]
+    assert grid.widgetsIn(0, 0, 50, 50) == []
+    assert parent.invalidated == [(0, 0, 10, 10), (200, 5, 10, 10)]
+
+    #growing across more cells and then shrinking back
+    parent.invalidated = []
+    widget.resize(100, 100)
+    assert grid.widgetsAt(290, 100) == [widget]
+    assert grid.widgetsIn(250, 50, 1, 1) == [widget]
+    assert parent.invalidated == [(200, 5, 10, 10), (200, 5, 100, 100)]
+    widget.resize(10, 10)
+    assert grid.widgetsAt(290, 100) == []
+    assert grid.widgetsIn(250, 50, 1, 1) == []
+
+    #moving within the same cells
+    widget.moveTo(201, 6)
+    assert grid.widgetsAt(211, 16) == [widget]
+
+    #the other widget isn't affected and the order they were added is kept
+    widget.moveTo(100, 100)
+    assert grid.widgetsAt(105, 105) == [widget, other]
+
+def test_removed_widgets_are_not_found_or_moved():
+    parent = Parent()
+    grid = WidgetGrid(parent)
+    widget = Box(0, 0, 10, 10)
+    grid.add(widget)
+    grid.remove(widget)
+
+    assert grid.widgetsAt(5, 5) == []
+    assert grid.widgetsIn(0, 0, 100, 100) == []
+    assert len(grid) == 0
+    assert widget.getParent() == None
+
+    #moving the widget once it has been removed doesn't touch the grid
+    widget.moveTo(20, 20)
+    assert grid.widgetsAt(25, 25) == []
+
+def test_widgets_without_a_size_cant_be_added():
+    grid = WidgetGrid()
+    for widget in [Box(0, 0), Box(0, 0, 10, 0), Box(0, 0, 0, 10)]:
+        with pytest.raises(WidgetSizeError):
+            grid.add(widget)
+        assert widget not in grid
+    assert len(grid) == 0
+
+def test_widgets_cant_be_resized_to_nothing_in_a_grid():
+    grid = WidgetGrid()
+    widget = Box(0, 0, 10, 10)
+    grid.add(widget)
+    with pytest.raises(WidgetSizeError):
+        widget.resize(0, 10)
@@ -1,9 +1,15 @@
 #author Ryan Bailey
 
 class Widget():
-    def __init__(self, x, y):
+    #(x, y) is the bottom left corner of the widget, in the same coordinates as mouse
+    #events. width and height are optional, but widgets without them can't be put in
+    #a WidgetGrid
+    def __init__(self, x, y, width=0, height=0):
         self.__x = x
         self.__y = y
+        self.__width = width
+        self.__height = height
+        self.__parent = None
 
     def draw(self):
         raise NotImplementedError("The widget's draw function has not been implemented")
@@ -12,3 +18,44 @@ class Widget():
     #to be defined for each widget as every widget could be a different shape
     def mousedOver(self, x, y):
         raise NotImplementedError("The widget's mouseOver function has not been implemented")
+
+    def getPosition(self):
+        return (self.__x, self.__y)
+
+    #returns the (x, y, width, height) box around the widget
+    def boundingBox(self):
+        return (self.__x, self.__y, self.__width, self.__height)
+
+    #moves the widget and tells its parent, so that it can be found in its new
+    #position and redrawn
+    def moveTo(self, x, y):
+        oldBox = self.boundingBox()
+        self.__x = x
+        self.__y = y
+        if self.__parent != None:
+            self.__parent.widgetMoved(self, oldBox)
+
+    def resize(self, width, height):
+        oldBox = self.boundingBox()
+        self.__width = width
+        self.__height = height
+        if self.__parent != None:
+            self.__parent.widgetMoved(self, oldBox)
+
+    #the parent is whatever the widget is drawn on (a Screen or a WidgetGrid) and is
+    #told when the widget needs redrawing or has moved
+    def setParent(self, parent):
+        self.__parent = parent
+
+    def getParent(self):
+        return self.__parent
+
+    #call this when the widget's state changes and it needs to be redrawn
+    #rect is the (x, y, width, height) area that has changed. if it isn't given
+    #the widget's bounding box is used, or the whole screen if the widget has no size
+    def invalidate(self, rect=None):
+        if self.__parent == None:
+            return
+        if rect == None and self.__width > 0 and self.__height > 0:
+            rect = self.boundingBox()
+        self.__parent.invalidate(rect)
@@ -0,0 +1,157 @@
+from .errors import WidgetSizeError
+
+#author Ryan Bailey
+
+#holds the widgets on a screen in a uniform grid of square cells so that finding
+#the widgets under the mouse only has to look at the widgets in one cell, rather
+#than calling mousedOver on every widget on the screen.
+
+#each widget is put in every cell that its bounding box (see Widget.boundingBox)
+#touches. when a widget moves (Widget.moveTo/resize) it tells the grid, which only
+#updates the cells it has left or entered.
+
+#typical use from a Screen:
+#   self.widgets = WidgetGrid(self)
+#   self.widgets.add(button)
+#   ...
+#   for widget in self.widgets.widgetsAt(*event.location()):
+class WidgetGrid():
+    #parent is told when widgets need redrawing (see Screen.invalidate)
+    #cellSize should be around the size of a typical widget
+    def __init__(self, parent=None, cellSize=64):
+        self.__parent = parent
+        self.__cellSize = cellSize
+
+        self.__cells = {} #(column, row) --> {widget: None}, used as an ordered set
+        self.__cellRanges = {} #widget --> (firstColumn, firstRow, lastColumn, lastRow)
+        self.__order = {} #widget --> when it was added, so results come back in draw order
+        self.__added = 0
+
+    def add(self, widget):
+        if widget in self.__order:
+            return
+        self.__checkSize(widget.boundingBox())
+
+        self.__order[widget] = self.__added
+        self.__added += 1
+        self.__cellRanges[widget] = self.__cellRange(widget.boundingBox())
+        self.__addToCells(widget, self.__cellRanges[widget])
+
+        widget.setParent(self)
+        widget.invalidate()
+
+    def remove(self, widget):
+        if widget not in self.__order:
+            return
+
+        self.__removeFromCells(widget, self.__cellRanges.pop(widget))
+        del self.__order[widget]
+
+        widget.invalidate()
+        widget.setParent(None)
+
+    def __contains__(self, widget):
+        return widget in self.__order
+
+    def __len__(self):
+        return len(self.__order)
+
+    #iterates over the widgets in the order they were added
+    def __iter__(self):
+        return iter(list(self.__order))
+
+    #draws every widget, in the order they were added
+    #if a Culler is given, only the widgets in its viewport are drawn, and they are
+    #found from the grid's cells rather than by testing every widget
+    def draw(self, culler=None):
+        if culler == None:
+            for widget in self.__order:
+                widget.draw()
+            return
+
+        visible = self.widgetsIn(*culler.getViewport())
+        for widget in visible:
+            widget.draw()
+        culler.count(len(visible), len(self.__order) - len(visible))
+
+    #returns a list of the widgets whose mousedOver returns True for (x, y),
+    #in the order they were added (so the one drawn on top is last)
+    def widgetsAt(self, x, y):
+        cell = self.__cells.get((int(x//self.__cellSize), int(y//self.__cellSize)))
+        if cell == None:
+            return []
+
+        widgets = []
+        for widget in cell:
+            left, bottom, width, height = widget.boundingBox()
+            if left <= x <= left + width and bottom <= y <= bottom + height and widget.mousedOver(x, y):
+                widgets += [widget]
+        return self.__sorted(widgets)
+
+    #returns a list of the widgets whose bounding boxes overlap the rectangle,
+    #in the order they were added
+    def widgetsIn(self, x, y, width, height):
+        found = {}
+        for cell in self.__cellsIn(self.__cellRange((x, y, width, height))):
+            for widget in self.__cells.get(cell, ()):
+                if widget in found:
+                    continue
+                left, bottom, widgetWidth, widgetHeight = widget.boundingBox()
+                if left <= x + width and x <= left + widgetWidth and bottom <= y + height and y <= bottom + widgetHeight:
+                    found[widget] = None
+        return self.__sorted(found)
+
+    #called by widgets in the grid when they move or change size
+    def widgetMoved(self, widget, oldBox):
+        self.__checkSize(widget.boundingBox())
+        oldRange = self.__cellRanges[widget]
+        newRange = self.__cellRange(widget.boundingBox())
+        if newRange != oldRange:
+            oldCells = set(self.__cellsIn(oldRange))
+            newCells = set(self.__cellsIn(newRange))
+            for cell in oldCells - newCells:
+                self.__removeFromCell(widget, cell)
+            for cell in newCells - oldCells:
+                self.__cells.setdefault(cell, {})[widget] = None
+            self.__cellRanges[widget] = newRange
+
+        self.invalidate(oldBox)
+        widget.invalidate()
+
+    #called by widgets in the grid when they need redrawing
+    def invalidate(self, rect=None):
+        if self.__parent != None:
+            self.__parent.invalidate(rect)
+
+    #widgets with no area are never found by widgetsAt, so they aren't allowed in the grid
+    def __checkSize(self, box):
+        if box[2] <= 0 or box[3] <= 0:
+            raise WidgetSizeError("(WidgetGrid) widgets need a width and height greater than 0 to be put in a grid, not " + str(box[2]) + "x" + str(box[3]))
+
+    def __sorted(self, widgets):
+        return sorted(widgets, key=self.__order.__getitem__)
+
+    def __cellRange(self, box):
+        x, y, width, height = box
+        size = self.__cellSize
+        return (int(x//size), int(y//size), int((x + width)//size), int((y + height)//size))
+
+    def __cellsIn(self, cellRange):
+        firstColumn, firstRow, lastColumn, lastRow = cellRange
+        for column in range(firstColumn, lastColumn + 1):
+            for row in range(firstRow, lastRow + 1):
+                yield (column, row)
+
+    def __addToCells(self, widget, cellRange):
+        for cell in self.__cellsIn(cellRange):
+            self.__cells.setdefault(cell, {})[widget] = None
+
+    def __removeFromCells(self, widget, cellRange):
+        for cell in self.__cellsIn(cellRange):
+            self.__removeFromCell(widget, cell)
+
+    def __removeFromCell(self, widget, cell):
+        widgets = self.__cells[cell]
+        del widgets[widget]
+        if not widgets:
+            del self.__cells[cell]